@@ -0,0 +1,177 @@
+"""
+CPU 추론 가속 모드 (opt-in)
+
+- INFERENCE_ACCEL=int8: Linear/LSTM 에 dynamic int8 quantization
+  (XTTS GPT 는 transformers Conv1D 를 쓰므로 먼저 동등한 nn.Linear 로 바꾼 뒤 양자화, HiFi-GAN 디코더는 fp32 유지)
+- INFERENCE_COMPILE=compile | torchscript: ECAPA 임베딩 모델을 torch.compile / torch.jit.script
+- 정확도 게이트: 바꾸기 전 fp32 출력과 비교해 기준 미달이면 원래 모델로 되돌림
+    ECAPA  임베딩 cosine >= ACCEL_MIN_COSINE
+    XTTS   조건 잠재벡터 cosine >= ACCEL_MIN_COSINE,
+           같은 시드로 합성한 프리뷰의 화자 유사도(ECAPA cosine) >= ACCEL_MIN_PREVIEW_SIMILARITY
+결과는 report 에 모델별로 남기고 /ready 에 함께 노출
+"""
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from .core.config import settings
+
+# 모델별 가속 적용 결과 (readiness / 벤치마크에서 조회)
+report: Dict[str, dict] = {}
+
+
+def enabled() -> bool:
+    return settings.INFERENCE_ACCEL != "off" or settings.INFERENCE_COMPILE != "off"
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a, b = np.asarray(a, dtype=np.float32).ravel(), np.asarray(b, dtype=np.float32).ravel()
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12))
+
+
+def _probe_signals(sr: int = 16000) -> List[np.ndarray]:
+    """게이트용 고정 입력: 서로 다른 기본 주파수의 모음 비슷한 신호 2개 (3초)"""
+    t = np.arange(3 * sr) / sr
+    rng = np.random.default_rng(0)
+    signals = []
+    for f0 in (120.0, 210.0):
+        voiced = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 20))
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)  # 음절 단위 진폭 변화
+        sig = voiced * envelope + 0.01 * rng.standard_normal(len(t))
+        signals.append((0.5 * sig / np.abs(sig).max()).astype(np.float32))
+    return signals
+
+
+def _model_mb(module) -> float:
+    """파라미터 + 버퍼 크기 (양자화된 packed weight 포함)"""
+    import torch
+    total = sum(t.numel() * t.element_size() for t in module.state_dict().values() if isinstance(t, torch.Tensor))
+    for m in module.modules():
+        packed = getattr(m, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            w, b = packed._weight_bias()
+            total += w.numel() * w.element_size() + (b.numel() * b.element_size() if b is not None else 0)
+    return round(total / 1024 / 1024, 1)
+
+
+def _conv1d_to_linear(module):
+    """transformers Conv1D(weight [in, out]) 를 같은 연산의 nn.Linear 로 교체 (dynamic quantization 대상)"""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+    return module
+
+
+def _quantize(module):
+    import torch
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8)
+
+
+def _compile(module):
+    import torch
+    if settings.INFERENCE_COMPILE == "compile":
+        return torch.compile(module, dynamic=True)
+    if settings.INFERENCE_COMPILE == "torchscript":
+        return torch.jit.script(module)
+    return module
+
+
+# --- ECAPA ---
+
+def accelerate_encoder(encoder):
+    """SpeechBrain EncoderClassifier 의 embedding_model 을 가속 버전으로 교체 (게이트 통과 시)"""
+    if not enabled():
+        return encoder
+    from .embedding_service import encode_padded
+
+    probes = _probe_signals()
+    reference = encode_padded(encoder, probes)
+    original = encoder.mods.embedding_model
+    entry = {"quant": settings.INFERENCE_ACCEL, "compile": settings.INFERENCE_COMPILE, "fp32MB": _model_mb(original)}
+    try:
+        started = time.time()
+        model = _quantize(original) if settings.INFERENCE_ACCEL == "int8" else original
+        entry["acceleratedMB"] = _model_mb(model)
+        try:
+            model = _compile(model)
+        except Exception as e:
+            # speechbrain 모듈은 script 가 안 되는 경우가 있음 -> 컴파일 없이 진행
+            entry["compileError"] = str(e)
+            print(f"⚠️  ECAPA {settings.INFERENCE_COMPILE} failed, continuing without it: {e}")
+        encoder.mods.embedding_model = model
+        accelerated = encode_padded(encoder, probes)
+        entry["prepareSeconds"] = round(time.time() - started, 2)
+        entry["minCosine"] = round(min(_cosine(r, a) for r, a in zip(reference, accelerated)), 5)
+        entry["passed"] = entry["minCosine"] >= settings.ACCEL_MIN_COSINE
+    except Exception as e:
+        entry.update(passed=False, error=str(e))
+
+    if not entry["passed"]:
+        encoder.mods.embedding_model = original
+        print(f"⚠️  ECAPA acceleration rejected by accuracy gate: {entry}")
+    else:
+        print(f"⚡ ECAPA accelerated: {entry}")
+    report["ecapa"] = entry
+    return encoder
+
+
+# --- XTTS ---
+
+def accelerate_tts(tts):
+    """XTTS GPT 를 int8 dynamic quantization (게이트 통과 시). 컴파일은 생성 루프 특성상 적용하지 않음"""
+    if settings.INFERENCE_ACCEL != "int8":
+        return tts
+    import torch
+    import librosa
+    from . import tts_preview
+    from .audio import get_encoder
+    from .embedding_service import encode_padded
+
+    model = tts.synthesizer.tts_model
+    probe = _probe_signals()[0]
+    text = settings.WARMUP_SYNTH_TEXT or "안녕하세요."
+
+    def run():
+        latents = tts_preview._compute_conditioning_latents_local(probe, 16000)
+        torch.manual_seed(0)
+        wav = tts_preview._synthesize_local(latents, text, settings.PREVIEW_LANG)
+        return latents, wav
+
+    ref_latents, ref_wav = run()
+    # Conv1D -> Linear 변환은 연산이 같으므로 원본에 바로 적용 (게이트 실패 시에도 fp32 그대로)
+    original = _conv1d_to_linear(model.gpt)
+    entry = {"quant": "int8", "fp32MB": _model_mb(original)}
+    try:
+        started = time.time()
+        model.gpt = _quantize(original)
+        entry["acceleratedMB"] = _model_mb(model.gpt)
+        latents, wav = run()
+        entry["prepareSeconds"] = round(time.time() - started, 2)
+        entry["latentCosine"] = round(min(_cosine(r, a) for r, a in zip(ref_latents, latents)), 5)
+        # 합성 결과는 샘플링이라 파형이 달라지므로, 같은 화자로 들리는지(ECAPA cosine)와 길이로 비교
+        to16k = lambda w: librosa.resample(w, orig_sr=tts_preview.XTTS_OUTPUT_SAMPLE_RATE, target_sr=16000)
+        ref_emb, acc_emb = encode_padded(get_encoder(), [to16k(ref_wav), to16k(wav)])
+        entry["previewSimilarity"] = round(_cosine(ref_emb, acc_emb), 4)
+        entry["previewDurationRatio"] = round(len(wav) / max(1, len(ref_wav)), 3)
+        entry["passed"] = (entry["latentCosine"] >= settings.ACCEL_MIN_COSINE
+                           and entry["previewSimilarity"] >= settings.ACCEL_MIN_PREVIEW_SIMILARITY)
+    except Exception as e:
+        entry.update(passed=False, error=str(e))
+
+    if not entry["passed"]:
+        model.gpt = original
+        print(f"⚠️  XTTS acceleration rejected by accuracy gate: {entry}")
+    else:
+        print(f"⚡ XTTS accelerated: {entry}")
+    report["xtts"] = entry
+    return tts
+
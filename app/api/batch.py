@@ -0,0 +1,335 @@
+"""
+여러 음성 파일을 하나의 스케줄 단위로 학습하는 배치 API (마이그레이션 / 백필용)
+
+POST /train 을 파일마다 부르는 대신, 배치 전체를 스케줄러 작업 하나로 넣고 내부에서 파이프라인으로 처리
+- 다운로드: BATCH_DOWNLOAD_CONCURRENCY 만큼 넓게 병렬
+- ECAPA 임베딩: 여러 항목이 동시에 임베딩 배처에 요청 -> 항목을 가로질러 한 배치로 추출
+- XTTS 잠재벡터/프리뷰 합성: 배치 안에서는 한 번에 하나씩 (스케줄러 inference 슬롯도 함께 사용)
+- S3 업로드: 항목마다 준비되는 대로 바로 (여러 항목을 모아 올려도 처리량이 늘지 않아 묶지 않음)
+항목마다 일반 Job 과 같은 jobId / 진행률 / 콜백을 가지며, 원하면 배치 전체에 대한 집계 콜백 하나만 보냄
+항목별 취소(/jobs/{jobId}/cancel) 와 제한 시간(JOB_TIMEOUT_SECONDS, STAGE_TIMEOUT_*)은 항목이 시작할 때부터 적용
+배치가 아직 대기열에 있으면 취소한 항목은 바로 CANCELLED (모든 항목이 취소되면 배치도 대기열에서 뺌)
+"""
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from ..deps import require_xauth
+from ..core.config import settings
+from ..http_client import map_concurrent
+from ..ingest import ingest_urls
+from ..jobstore import ACTIVE_STATUSES, get_job_store
+from ..readiness import readiness
+from ..metrics import StageTimer
+from ..scheduler import get_scheduler, QueueFullError
+from ..storage import upload_many, public_url
+from ..callbacks import enqueue_callback
+from ..cancellation import CANCELLED, JobAborted, bind, get_job_controls
+from ..workspace import get_workspace_manager
+from .endpoints import (TrainStartReq, _abort_job, _build_voice, _cache_model, _cancel_requested, _complete_job,
+                        _embed, _fail_job, _index_voice, _lookup_cached, _model_keys, _preprocess,
+                        _preview_text_lang, _progress, _remember_result, _request_cancel, _start_timer,
+                        _upload_items, _upload_summary)
+
+router = APIRouter(tags=["train"])
+# 핸들러는 Job 저장소(SQLite)를 쓰므로 일반 def (스레드풀에서 실행, endpoints.py 와 같음)
+
+
+class TrainBatchReq(BaseModel):
+    items: List[TrainStartReq] = Field(..., description="Voice files to train")
+    priority: int = Field(0, description="Scheduling priority of the whole batch (lower runs first)")
+    aggregateCallback: bool = Field(False, description="Send one callback for the whole batch "
+                                                       "(to SPRING_BATCH_CALLBACK_URL) instead of one per item")
+
+class TrainBatchItemResp(BaseModel):
+    voiceFileId: str
+    jobId: str
+    status: str = "TRAINING"
+    attached: bool = False  # 이미 진행 중인 같은 voiceFileId 의 Job 에 합류 (이 배치에서 처리하지 않음)
+
+class TrainBatchResp(BaseModel):
+    batchId: str
+    jobs: List[TrainBatchItemResp]
+
+
+class _BatchItem:
+    """배치 안의 항목 하나 (파이프라인 단계 사이에 넘기는 상태)"""
+
+    def __init__(self, job_id: str, req: TrainStartReq):
+        self.job_id = job_id
+        self.voice_file_id = req.voiceFileId
+        self.voice_file_url = req.voiceFileUrl
+        self.started = time.time()
+        self.timer = None
+        self.control = None  # 취소 / 제한 시간
+        self.workspace = None
+        self.cleanup = ExitStack()  # 작업 공간 정리 + 취소/제한 시간 감시 해제
+        self.cache_key = None
+        self.embedding = None
+        self.model_file = None
+        self.preview_wav = None
+        self.result: Optional[dict] = None  # 콜백 payload (완료/실패)
+
+
+class _BatchPipeline:
+    def __init__(self, batch_id: str, items: List[_BatchItem], aggregate: bool):
+        self.batch_id = batch_id
+        self.items = items
+        self.notify = not aggregate  # 집계 콜백이면 항목별 콜백은 보내지 않음
+        self.preview_text, self.lang = _preview_text_lang()
+        self._downloads = threading.BoundedSemaphore(max(1, settings.BATCH_DOWNLOAD_CONCURRENCY))
+        self._xtts = threading.Lock()
+
+    @contextmanager
+    def _xtts_slot(self):
+        """배치 안에서 XTTS 는 한 번에 하나 + 다른 Job 과 공유하는 inference 슬롯"""
+        with self._xtts, get_scheduler().stage("inference"):
+            yield
+
+    def run(self):
+        started = time.time()
+        # 대기 중에 취소된 항목(result 가 이미 있음)은 건너뜀
+        pending = [item for item in self.items if item.result is None]
+        print(f"📦 Batch {self.batch_id}: {len(pending)} items ({len(self.items) - len(pending)} cancelled while queued)")
+        # 항목마다 다운로드 -> 전처리 -> 임베딩 -> XTTS -> 업로드 순으로 흐름
+        # 동시에 진행 중인 항목 수(BATCH_PIPELINE_WORKERS)가 메모리에 올라가는 디코딩 오디오 양의 상한
+        map_concurrent(self._run_item, pending, max_workers=settings.BATCH_PIPELINE_WORKERS)
+        failed = sum(1 for item in self.items if (item.result or {}).get("status") != "DONE")
+        print(f"📦 Batch {self.batch_id} finished in {time.time() - started:.1f}s "
+              f"({len(self.items) - failed} done, {failed} failed)")
+        if not self.notify:
+            self._send_aggregate(time.time() - started, failed)
+
+    def _on_abort(self, item: _BatchItem, aborted: JobAborted):
+        item.result = _abort_job(item.job_id, item.voice_file_id, aborted, item.started, item.timer,
+                                 notify=self.notify)
+
+    def _run_item(self, item: _BatchItem):
+        jobs = get_job_store()
+        item.started = time.time()  # 제한 시간/소요 시간은 배치 안에서 항목이 시작한 때부터
+        controls = get_job_controls()
+        try:
+            # 여기서 실패해도 아래 except 가 항목을 ERROR 로 끝냄 (TRAINING 으로 남지 않게)
+            item.timer = _start_timer(item.job_id, item.started)
+            item.control = controls.register(item.job_id, lambda aborted: self._on_abort(item, aborted),
+                                             remote_check=lambda: _cancel_requested(item.job_id))
+            item.cleanup.callback(controls.unregister, item.job_id)
+            with bind(item.control):
+                item.workspace = item.cleanup.enter_context(get_workspace_manager().workspace(item.job_id))
+                # 1) 다운로드
+                _progress(item.job_id, 5, "downloading audio file")
+                with item.timer.stage("download", self._downloads):
+                    clips = ingest_urls([item.voice_file_url])
+                jobs.update(item.job_id, downloads=[clip.download for clip in clips], timings=item.timer.as_dict())
+
+                item.cache_key, reused, cached_emb = _lookup_cached(item.job_id, item.voice_file_id, clips,
+                                                                    self.preview_text, self.lang, item.timer)
+                if reused is not None:
+                    if item.control.finish():
+                        item.result = _complete_job(item.job_id, item.voice_file_id, *reused, True, item.started,
+                                                    item.timer, notify=self.notify)
+                        _index_voice(item.voice_file_id, cached_emb)
+                    return
+
+                # 2~5) 전처리 -> 임베딩(다른 항목과 함께 배치) -> XTTS (배치 내 직렬)
+                signals = _preprocess(item.job_id, clips, None, False, item.timer)
+                item.embedding = _embed(item.job_id, item.voice_file_id, signals, item.timer)
+                item.model_file, item.preview_wav = _build_voice(
+                    item.job_id, item.voice_file_id, signals, item.embedding, item.workspace.model, item.workspace.out,
+                    self.preview_text, self.lang, item.timer, inference_gate=self._xtts_slot,
+                )
+                # 6) 업로드 -> 완료
+                self._upload_and_finish(item)
+        except Exception as e:
+            # JobAborted 포함: 취소/제한 시간이면 종료 기록은 이미 됨
+            if item.control is None or item.control.finish():
+                item.result = _fail_job(item.job_id, item.voice_file_id, str(e), item.started,
+                                        item.timer or StageTimer(), notify=self.notify)
+        finally:
+            item.cleanup.close()
+
+    def _upload_and_finish(self, item: _BatchItem):
+        jobs = get_job_store()
+        _progress(item.job_id, 92, "uploading to cloud")
+        with item.timer.stage("upload", get_scheduler().stage("upload")):
+            # 모델 파일 (private) + 프리뷰 wav (public) 동시 업로드
+            uploads = upload_many(_upload_items(item.voice_file_id, item.model_file, item.preview_wav))
+        jobs.update(item.job_id, uploads=_upload_summary(uploads))
+        _cache_model(item.voice_file_id, item.model_file)
+        _, preview_key = _model_keys(item.voice_file_id)
+        _remember_result(item.cache_key, item.voice_file_id, uploads, item.embedding)
+        if item.control.finish():
+            item.result = _complete_job(item.job_id, item.voice_file_id, uploads[0]["uri"],
+                                        public_url(settings.S3_BUCKET_PREVIEW, preview_key), False,
+                                        item.started, item.timer, notify=self.notify)
+            _index_voice(item.voice_file_id, item.embedding)
+
+    def _send_aggregate(self, duration: float, failed: int):
+        """배치 전체 결과를 콜백 하나로 (항목별 payload 는 단건 콜백과 같은 형식)"""
+        try:
+            enqueue_callback(self.batch_id, {
+                "batchId": self.batch_id,
+                "status": "DONE" if not failed else ("ERROR" if failed == len(self.items) else "PARTIAL"),
+                "total": len(self.items),
+                "succeeded": len(self.items) - failed,
+                "failed": failed,
+                "durationSeconds": int(duration),
+                "callbacks": [item.result for item in self.items if item.result is not None],
+            }, url=settings.SPRING_BATCH_CALLBACK_URL)
+        except Exception as cb_err:
+            print(f"❌ Failed to enqueue aggregate callback for batch {self.batch_id}: {cb_err}")
+
+
+# 이 프로세스의 대기열에 있는 (아직 시작하지 않은) 배치. 시작하면 빠짐
+_queued: Dict[str, _BatchPipeline] = {}
+_queued_lock = threading.Lock()
+
+
+def _run_batch(batch_id: str):
+    with _queued_lock:
+        pipeline = _queued.pop(batch_id, None)
+    if pipeline is not None:  # None: 대기 중에 모든 항목이 취소됨
+        pipeline.run()
+
+
+def cancel_queued_item(job_id: str, batch_id: str, reason: str) -> bool:
+    """
+    이 프로세스 대기열에 있는 배치의 항목이면 바로 CANCELLED 기록 후 True
+    (배치가 이미 시작했거나 다른 프로세스의 대기열에 있으면 False)
+    남은 항목이 없으면 배치를 대기열에서 빼고, 집계 콜백이면 그 자리에서 전송
+    """
+    with _queued_lock:
+        pipeline = _queued.get(batch_id)
+        items = pipeline.items if pipeline is not None else []
+        item = next((i for i in items if i.job_id == job_id and i.result is None), None)
+        if item is None:
+            return False
+        # 배치가 시작하면서 이 항목을 집어 가지 않도록 락 안에서 기록
+        item.result = _abort_job(job_id, item.voice_file_id, JobAborted(CANCELLED, reason), None, None,
+                                 notify=pipeline.notify)
+        if any(i.result is None for i in pipeline.items):
+            return True
+        del _queued[batch_id]
+        get_scheduler().cancel(batch_id)
+    print(f"📦 Batch {batch_id}: all {len(pipeline.items)} items cancelled while queued")
+    if not pipeline.notify:
+        pipeline._send_aggregate(0.0, len(pipeline.items))
+    return True
+
+
+@router.post("/train/batch", response_model=TrainBatchResp)
+def start_batch_training(req: TrainBatchReq, _: bool = Depends(require_xauth)):
+    """
+    여러 음성 파일 학습을 하나의 스케줄 단위로 등록
+    항목마다 jobId 를 돌려주며 /status/{jobId}, 배치 전체는 /train/batch/{batchId} 로 조회
+    """
+    if not req.items:
+        raise HTTPException(status_code=400, detail="items must not be empty")
+    if len(req.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"too many items (max {settings.BATCH_MAX_ITEMS})")
+    for i, item in enumerate(req.items):
+        if not item.voiceFileUrl.strip() or not item.voiceFileId.strip():
+            raise HTTPException(status_code=400, detail=f"items[{i}]: voiceFileId and voiceFileUrl are required")
+    if req.aggregateCallback and not settings.SPRING_BATCH_CALLBACK_URL:
+        raise HTTPException(status_code=400, detail="aggregateCallback requires SPRING_BATCH_CALLBACK_URL")
+
+    # 모델이 아직 로드/워밍업 중이면 받지 않음 (재시도)
+    if settings.READINESS_GATES_ADMISSION and not readiness.is_ready():
+        raise HTTPException(status_code=503, detail="models are still loading", headers={"Retry-After": "15"})
+
+    # 대기열 자리를 Job 생성 전에 확보 (만든 뒤 429 로 지우면 그 사이 합류한 요청이 사라진 Job 을 보게 됨)
+    scheduler = get_scheduler()
+    try:
+        scheduler.reserve()
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+    batch_id = "batch_" + uuid.uuid4().hex[:12]
+    jobs = get_job_store()
+    now = time.time()
+    owned: List[_BatchItem] = []
+    resp_items: List[TrainBatchItemResp] = []
+    try:
+        _create_items(jobs, req, batch_id, now, owned, resp_items)
+    finally:
+        # 중간에 실패해도 이미 만든 Job 은 지우지 않고 (합류한 요청이 있을 수 있음) 실행한 뒤 오류를 전달
+        # -> 재시도하면 그 Job 들에 합류
+        if owned:
+            with _queued_lock:
+                _queued[batch_id] = _BatchPipeline(batch_id, owned, req.aggregateCallback)
+            position = scheduler.submit(batch_id, _run_batch, batch_id, priority=req.priority, reserved=True)
+            print(f"🚀 Queued batch {batch_id} with {len(owned)} items (position {position})")
+        else:
+            scheduler.unreserve()
+
+    return TrainBatchResp(batchId=batch_id, jobs=resp_items)
+
+
+def _create_items(jobs, req: TrainBatchReq, batch_id: str, now: float,
+                  owned: List[_BatchItem], resp_items: List[TrainBatchItemResp]):
+    """항목별 Job 생성 (또는 진행 중인 Job 에 합류). 새로 만든 항목은 owned 에 추가"""
+    for item in req.items:
+        job_id = "job_" + uuid.uuid4().hex[:12]
+        # 진행 중인 같은 voiceFileId 가 있으면 (배치 안의 중복 포함) 그 Job 에 합류
+        job, created = jobs.create_or_attach({
+            "jobId": job_id,
+            "status": "TRAINING",
+            "progress": 0,
+            "message": "queued for batch training",
+            "voiceFileId": item.voiceFileId,
+            "userId": item.userId,
+            "walletAddress": item.walletAddress,
+            "originalFilename": item.originalFilename,
+            "batchId": batch_id,
+            "startedAt": now
+        })
+        resp_items.append(TrainBatchItemResp(voiceFileId=item.voiceFileId, jobId=job["jobId"],
+                                             status=job.get("status", "TRAINING"), attached=not created))
+        if created:
+            owned.append(_BatchItem(job_id, item))
+
+
+@router.get("/train/batch/{batch_id}")
+def get_batch_status(batch_id: str, _: bool = Depends(require_xauth)):
+    """배치 진행 상황 (상태별 개수, 평균 진행률, 항목별 상태)"""
+    total, rows = get_job_store().list(batch_id=batch_id, limit=settings.BATCH_MAX_ITEMS)
+    if not total:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    counts = {}
+    for job in rows:
+        counts[job.get("status")] = counts.get(job.get("status"), 0) + 1
+    running = sum(n for status, n in counts.items() if status in ACTIVE_STATUSES)
+    return {
+        "batchId": batch_id,
+        "total": total,
+        "counts": counts,
+        "done": running == 0,
+        "progress": round(sum(job.get("progress", 0) if job.get("status") in ACTIVE_STATUSES else 100
+                              for job in rows) / total, 1),
+        "queuePosition": get_scheduler().position(batch_id),
+        "jobs": [
+            {
+                "jobId": job.get("jobId"),
+                "voiceFileId": job.get("voiceFileId"),
+                "status": job.get("status"),
+                "progress": job.get("progress", 0),
+                "message": job.get("message", "")
+            }
+            for job in rows
+        ]
+    }
+
+
+@router.post("/train/batch/{batch_id}/cancel")
+def cancel_batch(batch_id: str, _: bool = Depends(require_xauth)):
+    """배치에서 아직 끝나지 않은 항목을 모두 취소 (항목별 결과는 /jobs/{jobId}/cancel 과 같음)"""
+    total, rows = get_job_store().list(batch_id=batch_id, limit=settings.BATCH_MAX_ITEMS)
+    if not total:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    cancelled = {job["jobId"]: _request_cancel(job) for job in rows if job.get("status") in ACTIVE_STATUSES}
+    return {"batchId": batch_id, "cancelled": len(cancelled), "jobs": cancelled}
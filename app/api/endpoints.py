@@ -1,23 +1,32 @@
-import time, uuid, threading
+import os, time, uuid
 from typing import List, Optional
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel, Field
 import numpy as np
-import requests
+import soundfile as sf
 
 from ..deps import require_xauth
-from ..audio import download_files, preprocess_to_16k_mono, compute_speaker_embedding, save_model_npz
-from ..tts_preview import synth_preview
-from ..storage import upload_to_s3, public_url
+from ..audio import preprocess_signal, compute_speaker_embedding, save_voice_model, ENCODER_SOURCE, MODEL_VERSION
+from ..artifact import MODEL_FILENAME
+from ..ingest import ingest_urls
+from ..tts_preview import compute_conditioning_latents, get_voice_latents, synth_with_latents, XTTS_MODEL_NAME
+from ..storage import upload_many, copy_in_s3, public_url, remote_sha256
+from ..result_cache import cache_key, get_result_cache
 from ..core.config import settings
-from ..deps import require_xauth
+from ..scheduler import get_scheduler, QueueFullError
+from ..jobstore import ACTIVE_STATUSES, get_job_store
+from ..cancellation import CANCELLED, JobAborted, checkpoint, get_job_controls
+from ..readiness import readiness
+from ..voice_index import get_voice_index
+from ..callbacks import enqueue_callback, get_outbox
+from ..workspace import get_workspace_manager
+from ..metrics import StageTimer, AUDIO_SECONDS, JOB_SECONDS, JOBS_TOTAL, observe_synthesis
 
 # 💡 수정: 백엔드 AiService.java의 호출 경로에 맞게 prefix를 "/train"으로 변경
 router = APIRouter(tags=["train"])
-
-# In-memory job store
-JOBS: dict[str, dict] = {}  # job_id -> info
+# Job 저장소 / 아웃박스(SQLite, 락 대기 최대 30초)를 쓰는 핸들러는 일반 def 로 둠
+# -> FastAPI 가 스레드풀에서 실행하므로 락을 기다려도 이벤트 루프(다른 요청, SSE)가 멈추지 않음
 
 # Java AiService 호환 스펙
 class TrainStartReq(BaseModel):
@@ -27,154 +36,389 @@ class TrainStartReq(BaseModel):
     walletAddress: str = Field(..., description="User wallet address")
     originalFilename: Optional[str] = Field(None, description="Original filename")
     duration: Optional[float] = Field(None, description="Duration in seconds")
+    priority: int = Field(0, description="Scheduling priority (lower runs first)")
 
 class TrainStartResp(BaseModel):
     jobId: str  # Java에서 jobId로 받음
     status: str = "TRAINING"
 
-DATA_ROOT = Path("/data")
+def _preview_text_lang():
+    preview_text = os.getenv("PREVIEW_TEXT_KO", "안녕하세요, 오디온입니다. 이 목소리는 데모로 생성된 프리뷰입니다.")
+    lang = os.getenv("PREVIEW_LANG", "ko")
+    return preview_text, lang
 
-def _train_worker(job_id: str, voice_file_id: str, voice_file_url: str, user_id: str, wallet_address: str, original_filename: Optional[str]):
+def _model_keys(voice_file_id: str):
+    return f"models/{voice_file_id}/{MODEL_FILENAME}", f"preview/{voice_file_id}/preview.wav"
+
+def _progress(job_id: str, progress: int, message: str):
+    """진행률 갱신. 먼저 취소/제한 시간을 확인해 이미 종료된 Job 의 상태를 덮어쓰지 않음"""
+    checkpoint()
+    get_job_store().update(job_id, progress=progress, message=message)
+
+def _preprocess(job_id: str, clips: list, prep_dir: Path, persist: bool, timer: StageTimer) -> list:
+    """2) 전처리(무음 제거)"""
+    _progress(job_id, 25, "preprocessing audio")
+    with timer.stage("preprocess", get_scheduler().stage("preprocess")):
+        signals = [
+            preprocess_signal(clip.audio, clip.name, persist_dir=prep_dir if persist else None)
+            for clip in clips
+        ]
+        signals = [sig for sig in signals if sig is not None]
+    
+    if not signals:
+        raise RuntimeError("Audio too short after trimming silence")
+    AUDIO_SECONDS.labels("train").inc(sum(len(sig) for sig in signals) / 16000)
+    return signals
+
+def _embed(job_id: str, voice_file_id: str, signals: list, timer: StageTimer) -> np.ndarray:
+    """3) 임베딩 추출(=경량 학습) + (선택) 중복 목소리 검사"""
+    _progress(job_id, 55, "extracting voice features")
+    # 추론 stage 제한을 걸지 않음: 배처가 여러 Job 의 요청을 모아 한 번에 처리
+    embed_stats = {}
+    with timer.stage("embed"):
+        emb = compute_speaker_embedding(signals, stats=embed_stats)  # np.array (256-d)
+    get_job_store().update(job_id, embedding=embed_stats)
+    _check_similar(job_id, voice_file_id, emb, timer)
+    return emb
+
+def _check_similar(job_id: str, voice_file_id: str, emb: np.ndarray, timer: StageTimer):
+    """(선택) 이미 학습된 목소리와 같은 목소리인지 검사. 결과 캐시 적중 때도 캐시된 임베딩으로 검사"""
+    if not settings.VOICE_DUPLICATE_CHECK:
+        return
+    with timer.stage("similarity"):
+        matches = [
+            {"voiceFileId": vid, "score": round(score, 4)}
+            for vid, score in get_voice_index().search(emb, k=5, exclude=voice_file_id)
+            if score >= settings.VOICE_DUPLICATE_THRESHOLD
+        ]
+    get_job_store().update(job_id, similarVoices=matches)
+    if matches:
+        print(f"⚠️  Job {job_id} voice matches existing voices: {matches}")
+        if settings.VOICE_DUPLICATE_ACTION == "reject":
+            raise RuntimeError(f"voice matches existing voice {matches[0]['voiceFileId']} "
+                               f"(similarity {matches[0]['score']})")
+
+def _build_voice(job_id: str, voice_file_id: str, signals: list, emb: np.ndarray, model_dir: Path,
+                 out_dir: Path, preview_text: str, lang: str, timer: StageTimer, inference_gate=None):
     """
-    1) 다운로드 -> 2) 전처리 -> 3) 임베딩 추출(=학습) -> 4) 모델 저장 -> 5) 프리뷰 생성 -> 6) S3 업로드 -> 7) 콜백
+    4) 모델 저장 (.avm, ECAPA 임베딩 + XTTS 조건 잠재벡터) -> 5) 프리뷰 생성
+    inference_gate: XTTS 추론 슬롯 context manager 를 만드는 함수 (기본: 스케줄러 inference stage)
+    반환: (model_file, preview_wav)
     """
-    import os
-    import time
-    import requests
+    scheduler = get_scheduler()
+    inference_gate = inference_gate or (lambda: scheduler.stage("inference"))
+    _progress(job_id, 65, "saving voice model")
+    ref_audio = signals[0]  # 가장 첫 샘플 하나로 참조
+    with timer.stage("latents", inference_gate()):
+        xtts_latents = compute_conditioning_latents(ref_audio)
+    with timer.stage("save"):
+        model_file = save_voice_model(emb, model_dir, xtts_latents=xtts_latents)
+
+    # 5) 프리뷰 생성(xtts_v2, 저장된 잠재벡터 재사용)
+    _progress(job_id, 80, "generating preview")
+    preview_wav = out_dir / "preview.wav"
+    with timer.stage("preview", inference_gate()):
+        synth_with_latents(xtts_latents, preview_wav, preview_text, lang=lang)
+    observe_synthesis("preview", timer.timings["preview"], sf.info(str(preview_wav)).duration)
+    return model_file, preview_wav
+
+def _upload_items(voice_file_id: str, model_file: Path, preview_wav: Path):
+    """6) S3 업로드 대상: 모델 파일 (private) + 프리뷰 wav (public)"""
+    model_key, preview_key = _model_keys(voice_file_id)
+    return [
+        (model_file, settings.S3_BUCKET_MODELS, model_key, False),
+        (preview_wav, settings.S3_BUCKET_PREVIEW, preview_key, True),
+    ]
+
+def _upload_summary(uploads: list) -> list:
+    return [{k: u[k] for k in ("key", "bytes", "skipped", "seconds", "bytesPerSec")} for u in uploads]
+
+def _train_and_upload(job_id: str, voice_file_id: str, clips: list, model_dir: Path, prep_dir: Path,
+                      out_dir: Path, persist: bool, preview_text: str, lang: str, timer: StageTimer):
+    """
+    2) 전처리 -> 3) 임베딩 추출(=학습) -> 4) 모델 저장 -> 5) 프리뷰 생성 -> 6) S3 업로드
+    반환: (model_s3_uri, preview_public, uploads, emb)
+    """
+    jobs = get_job_store()
+    signals = _preprocess(job_id, clips, prep_dir, persist, timer)
+    emb = _embed(job_id, voice_file_id, signals, timer)
+    model_file, preview_wav = _build_voice(job_id, voice_file_id, signals, emb, model_dir, out_dir,
+                                           preview_text, lang, timer)
+
+    # 6) S3 업로드
+    _progress(job_id, 92, "uploading to cloud")
+    model_key, preview_key = _model_keys(voice_file_id)
+    with timer.stage("upload", get_scheduler().stage("upload")):
+        # 모델 파일 (private) + 프리뷰 wav (public) 동시 업로드
+        uploads = upload_many(_upload_items(voice_file_id, model_file, preview_wav))
+    jobs.update(job_id, uploads=_upload_summary(uploads))
+    model_s3_uri = uploads[0]["uri"]
+    preview_public = public_url(settings.S3_BUCKET_PREVIEW, preview_key)
+    _cache_model(voice_file_id, model_file)
+
+    return model_s3_uri, preview_public, uploads, emb
+
+def _remember_result(key: str, voice_file_id: str, uploads: list, emb: np.ndarray):
+    """업로드한 모델/프리뷰를 결과 캐시에 등록 (S3 객체의 sha256 도 함께, 재사용 전 확인용)"""
+    result_cache = get_result_cache()
+    if not result_cache:
+        return
+    model_up, preview_up = uploads
+    result_cache.put(key, voice_file_id, settings.S3_BUCKET_MODELS, model_up["key"], model_up["sha256"],
+                     settings.S3_BUCKET_PREVIEW, preview_up["key"], preview_up["sha256"], emb)
+
+def _index_voice(voice_file_id: str, emb: np.ndarray):
+    """
+    완료된 목소리만 유사도 인덱스에 추가 (_complete_job 뒤에 호출)
+    실패/취소된 Job 의 목소리가 인덱스에 남아 중복 검사에 걸리지 않게
+    """
+    try:
+        get_voice_index().add(voice_file_id, emb)
+    except Exception as e:
+        print(f"⚠️  Failed to add voice file {voice_file_id} to the similarity index: {e}")
+
+def _cache_model(voice_file_id: str, model_file: Path):
+    """
+    업로드가 끝난 모델을 로컬 모델 캐시로 (실패해도 S3 에 있으므로 Job 은 계속)
+    잠재벡터 캐시도 옮긴 파일 기준으로 채움 (첫 /synthesize 가 파일을 다시 읽지 않게)
+    """
+    try:
+        target = get_workspace_manager().keep_model(voice_file_id, model_file)
+        get_voice_latents(voice_file_id, target)
+    except Exception as e:
+        print(f"⚠️  Failed to cache model for voice file {voice_file_id} locally: {e}")
+
+def _cached_objects_intact(cached: dict) -> bool:
+    """
+    캐시 항목이 가리키는 S3 모델/프리뷰가 등록 때와 같은 내용인지 (sha256 메타데이터 비교)
+    voiceFileId 별 키라 그 voiceFileId 를 다른 오디오로 다시 학습하면 덮어써짐
+    """
+    return (remote_sha256(cached["modelBucket"], cached["modelKey"]) == cached["modelSha256"]
+            and remote_sha256(cached["previewBucket"], cached["previewKey"]) == cached["previewSha256"])
+
+def _reuse_cached(voice_file_id: str, cached: dict):
+    """
+    캐시된 결과를 이 voiceFileId 의 S3 위치로 연결
+    같은 voiceFileId 면 그대로, 다르면 서버 측 복사 (재업로드 없음)
+    """
+    model_key, preview_key = _model_keys(voice_file_id)
+    if cached["voiceFileId"] == voice_file_id:
+        model_s3_uri = f"s3://{cached['modelBucket']}/{cached['modelKey']}"
+    else:
+        model_s3_uri = copy_in_s3(cached["modelBucket"], cached["modelKey"], settings.S3_BUCKET_MODELS, model_key)
+        copy_in_s3(cached["previewBucket"], cached["previewKey"], settings.S3_BUCKET_PREVIEW, preview_key)
+    return model_s3_uri, public_url(settings.S3_BUCKET_PREVIEW, preview_key)
+
+def _lookup_cached(job_id: str, voice_file_id: str, clips: list, preview_text: str, lang: str, timer: StageTimer):
+    """
+    같은 오디오 + 같은 인코더/모델 버전으로 이미 학습한 적이 있으면 결과 재사용
+    재사용 전에 캐시된 임베딩으로 중복 목소리 검사 (같은 오디오를 다른 voiceFileId 로 올려도 검사를 건너뛰지 않음)
+    반환: (cache key, (model_s3_uri, preview_public) 또는 None, 캐시된 임베딩 또는 None)
+    """
+    result_cache = get_result_cache()
+    key = cache_key([clip.sha256 for clip in clips], ENCODER_SOURCE, MODEL_VERSION,
+                    XTTS_MODEL_NAME, preview_text, lang, settings.MODEL_ARTIFACT_QUANT,
+                    f"{settings.INFERENCE_ACCEL}/{settings.INFERENCE_COMPILE}")
+    cached = result_cache.get(key) if result_cache else None
+    if cached:
+        try:
+            with timer.stage("reuse"):
+                intact = _cached_objects_intact(cached)
+        except Exception as e:
+            print(f"⚠️  Could not verify cached result for job {job_id}, retraining: {e}")
+            return key, None, None
+        if not intact:
+            # 가리키던 S3 객체가 다른 학습 결과로 덮어써짐 -> 임베딩도 맞지 않으므로 항목 삭제 후 재학습
+            print(f"⚠️  Cached result for job {job_id} was overwritten in S3, retraining")
+            result_cache.invalidate(key)
+            return key, None, None
+        _check_similar(job_id, voice_file_id, cached["embedding"], timer)
+        try:
+            with timer.stage("reuse"):
+                reused = _reuse_cached(voice_file_id, cached)
+            print(f"♻️  Cache hit for job {job_id} (from voice file {cached['voiceFileId']})")
+            return key, reused, cached["embedding"]
+        except Exception as e:
+            print(f"⚠️  Cached result unusable for job {job_id}, retraining: {e}")
+            result_cache.invalidate(key)
+    return key, None, None
+
+def _complete_job(job_id: str, voice_file_id: str, model_s3_uri: str, preview_public: str, cache_hit: bool,
+                  training_start_time: float, timer: StageTimer, notify: bool = True) -> dict:
+    """7) 완료 기록 + 콜백 적재. 콜백 payload 반환 (배치 집계 콜백용)"""
+    # 학습 소요 시간 계산
+    training_duration = int(time.time() - training_start_time)
+
+    get_job_store().update(job_id, 
+        status="DONE", 
+        progress=100, 
+        message="reused cached training result" if cache_hit else "training completed successfully",
+        voiceFileId=voice_file_id,
+        modelPath=model_s3_uri, 
+        previewUrl=preview_public,
+        trainingDurationSeconds=training_duration,
+        cacheHit=cache_hit,
+        timings=timer.as_dict()
+    )
+    readiness.mark_job_done()
+    outcome = "cache_hit" if cache_hit else "done"
+    JOBS_TOTAL.labels(outcome).inc()
+    JOB_SECONDS.labels(outcome).observe(time.time() - training_start_time)
 
-    cb_url = os.getenv("SPRING_CALLBACK_URL")  # Spring Boot 콜백 URL
-    secret = os.getenv("X_AUTH_SHARED_SECRET", "CHANGE_ME")
-    timeout = int(os.getenv("CALLBACK_TIMEOUT", "10"))
+    # Spring Boot 콜백 (Java ModelTrainCompleteCallbackRequest 스펙에 맞춤)
+    payload = {
+        # 💡 수정: 백엔드가 VoiceFile ID를 modelId 필드로 받으므로, voice_file_id를 전달
+        "modelId": voice_file_id,
+        "status": "DONE",
+        "modelPath": model_s3_uri,
+        "previewUrl": preview_public,
+        "trainingDurationSeconds": training_duration,
+        "jobId": job_id,
+        "aiServerVersion": "1.0.0"
+    }
+    if notify:
+        # 아웃박스에 적재만 하고 워커 슬롯은 바로 반환 (전송/재시도는 callbacks 전송 워커)
+        try:
+            enqueue_callback(job_id, payload)
+        except Exception as cb_err:
+            print(f"❌ Failed to enqueue callback for job {job_id}: {cb_err}")
+    return payload
 
+def _fail_job(job_id: str, voice_file_id: str, error_msg: str, training_start_time: float, timer: StageTimer,
+              notify: bool = True) -> dict:
+    """실패 기록 + 실패 콜백 적재. 콜백 payload 반환"""
+    print(f"❌ Training failed for job {job_id}: {error_msg}")
     
-    cb_url = settings.SPRING_CALLBACK_URL
-    secret = settings.X_AUTH_SHARED_SECRET
-    timeout = settings.CALLBACK_TIMEOUT
-    b_models = settings.S3_BUCKET_MODELS
-    b_preview = settings.S3_BUCKET_PREVIEW
-
-    # 디렉터리 셋업
-    model_dir = DATA_ROOT / "models" / voice_file_id
-    raw_dir   = DATA_ROOT / "raw" / voice_file_id
-    prep_dir  = DATA_ROOT / "prep" / voice_file_id
-    out_dir   = DATA_ROOT / "out" / voice_file_id
-    for d in (model_dir, raw_dir, prep_dir, out_dir):
-        d.mkdir(parents=True, exist_ok=True)
+    get_job_store().update(job_id, 
+        status="ERROR", 
+        progress=0,
+        message=f"Training failed: {error_msg}",
+        voiceFileId=voice_file_id,
+        timings=timer.as_dict()
+    )
+    JOBS_TOTAL.labels("error").inc()
+    JOB_SECONDS.labels("error").observe(time.time() - training_start_time)
+    
+    payload = {
+        # 💡 수정: 실패 시에도 voice_file_id를 modelId로 전달
+        "modelId": voice_file_id,
+        "status": "ERROR",
+        "errorMessage": error_msg,
+        "jobId": job_id
+    }
+    if notify:
+        # 실패 콜백 (성공 콜백과 같은 아웃박스로 재시도 보장)
+        try:
+            enqueue_callback(job_id, payload)
+        except Exception as cb_err:
+            print(f"❌ Failed to enqueue error callback for job {job_id}: {cb_err}")
+    return payload
+
+def _abort_job(job_id: str, voice_file_id: str, aborted: JobAborted, training_start_time: Optional[float],
+               timer: Optional[StageTimer], notify: bool = True) -> dict:
+    """
+    취소 / 제한 시간 초과 기록 (CANCELLED | TIMEOUT) + 콜백 적재 + 스케줄러 워커 슬롯 반납. 콜백 payload 반환
+    training_start_time 이 None 이면 시작 전에 대기열에서 취소된 Job
+    """
+    fields = {"timings": timer.as_dict()} if timer is not None else {}
+    verb = "cancelled" if aborted.status == CANCELLED else "timed out"
+    get_job_store().update(job_id,
+        status=aborted.status,
+        progress=0,
+        message=f"Training {verb}: {aborted.reason}",
+        voiceFileId=voice_file_id,
+        **fields
+    )
+    JOBS_TOTAL.labels(aborted.status.lower()).inc()
+    if training_start_time is not None:
+        JOB_SECONDS.labels(aborted.status.lower()).observe(time.time() - training_start_time)
+
+    # Spring 은 DONE / ERROR 만 받으므로 ERROR 로 보내고 errorCode 로 구분
+    payload = {
+        "modelId": voice_file_id,
+        "status": "ERROR",
+        "errorCode": aborted.status,
+        "errorMessage": aborted.reason,
+        "jobId": job_id
+    }
+    if notify:
+        try:
+            enqueue_callback(job_id, payload)
+        except Exception as cb_err:
+            print(f"❌ Failed to enqueue {verb} callback for job {job_id}: {cb_err}")
+    # 작업 스레드가 아직 멈추지 않았어도 슬롯은 바로 다음 Job 에게
+    get_scheduler().release(job_id)
+    return payload
+
+def _cancel_requested(job_id: str) -> bool:
+    """다른 워커 프로세스로 들어온 취소 요청 (Job 저장소의 cancelRequested 플래그)"""
+    return bool((get_job_store().get(job_id) or {}).get("cancelRequested"))
+
+def _start_timer(job_id: str, training_start_time: float) -> StageTimer:
+    """단계별 소요 시간 (/status 의 timings, /metrics 의 histogram). 대기열 시간부터 기록"""
+    timer = StageTimer()
+    queued_at = (get_job_store().get(job_id) or {}).get("startedAt")
+    if queued_at:
+        timer.record("queue", max(0.0, training_start_time - queued_at))
+    return timer
+
+def _train_worker(job_id: str, voice_file_id: str, voice_file_url: str, user_id: str, wallet_address: str, original_filename: Optional[str]):
+    """
+    1) 다운로드 -> (결과 캐시 확인) -> 2~6) 학습/업로드 -> 7) 콜백
+    """
+    # 원본/전처리 오디오는 메모리에서만 다루고, 디버깅 설정일 때만 작업 공간에 남김 (끝나면 debug/ 로 이동)
+    persist = settings.INGEST_PERSIST_DEBUG
 
     training_start_time = time.time()
+    scheduler = get_scheduler()
+    jobs = get_job_store()
+    timer = _start_timer(job_id, training_start_time)
 
-    try:
-        # 1) 다운로드
-        JOBS[job_id].update(status="TRAINING", progress=5, message="downloading audio file")
-        wav_paths = download_files([voice_file_url], raw_dir)
-        
-        if not wav_paths:
-            raise RuntimeError("Failed to download audio file")
-
-        # 2) 전처리(16k mono + trim)
-        JOBS[job_id].update(progress=25, message="preprocessing audio")
-        prep_paths = preprocess_to_16k_mono(wav_paths, prep_dir)
-
-        # 3) 임베딩 추출(=경량 학습)
-        JOBS[job_id].update(progress=55, message="extracting voice features")
-        emb = compute_speaker_embedding(prep_paths)  # np.array (256-d)
-
-        # 4) 모델 저장 (npz)
-        JOBS[job_id].update(progress=65, message="saving voice model")
-        model_npz = save_model_npz(emb, model_dir)
-
-        # 5) 프리뷰 생성(xtts_v2)
-        JOBS[job_id].update(progress=80, message="generating preview")
-        preview_text = os.getenv("PREVIEW_TEXT_KO", "안녕하세요, 오디온입니다. 이 목소리는 데모로 생성된 프리뷰입니다.")
-        lang = os.getenv("PREVIEW_LANG", "ko")
-        ref_wav = prep_paths[0]  # 가장 첫 샘플 하나로 참조
-        preview_wav = out_dir / "preview.wav"
-        synth_preview(ref_wav, preview_wav, preview_text, lang=lang)
-
-        # 6) S3 업로드
-        JOBS[job_id].update(progress=92, message="uploading to cloud")
-        # 모델 파일 (private)
-        model_key = f"models/{voice_file_id}/model.npz"
-        model_s3_uri = upload_to_s3(model_npz, b_models, model_key, public=False)
-        
-        # 프리뷰 wav (public)
-        preview_key = f"preview/{voice_file_id}/preview.wav"
-        preview_s3_uri = upload_to_s3(preview_wav, b_preview, preview_key, public=True)
-        preview_public = public_url(b_preview, preview_key)
-
-        # 학습 소요 시간 계산
-        training_duration = int(time.time() - training_start_time)
-
-        # 7) 완료
-        JOBS[job_id].update(
-            status="DONE", 
-            progress=100, 
-            message="training completed successfully",
-            voiceFileId=voice_file_id,
-            modelPath=model_s3_uri, 
-            previewUrl=preview_public,
-            trainingDurationSeconds=training_duration
-        )
-
-        # Spring Boot 콜백 (Java ModelTrainCompleteCallbackRequest 스펙에 맞춤)
-        if cb_url:
-            payload = {
-                # 💡 수정: 백엔드가 VoiceFile ID를 modelId 필드로 받으므로, voice_file_id를 전달
-                "modelId": voice_file_id,
-                "status": "DONE",
-                "modelPath": model_s3_uri,
-                "previewUrl": preview_public,
-                "trainingDurationSeconds": training_duration,
-                "jobId": job_id,
-                "aiServerVersion": "1.0.0"
-            }
-            try:
-                response = requests.post(
-                    cb_url, 
-                    json=payload, 
-                    headers={"X-AUTH": secret}, 
-                    timeout=timeout
-                )
-                if response.status_code == 200:
-                    print(f"✅ Callback successful for job {job_id}")
+    # 취소 / 제한 시간 초과 시 바로 종료 기록 + 슬롯 반납 (이 스레드는 다음 checkpoint 에서 빠져나옴)
+    on_abort = lambda aborted: _abort_job(job_id, voice_file_id, aborted, training_start_time, timer)
+    with get_job_controls().track(job_id, on_abort, remote_check=lambda: _cancel_requested(job_id)) as control:
+        try:
+            # Job 전용 작업 공간 (성공/실패와 관계없이 끝나면 삭제)
+            with get_workspace_manager().workspace(job_id, keep=persist) as ws:
+                # 1) 다운로드
+                _progress(job_id, 5, "downloading audio file")
+                # 다운로드하면서 바로 디코딩 + 16k mono 리샘플 (디스크 미경유)
+                with timer.stage("download", scheduler.stage("download")):
+                    clips = ingest_urls([voice_file_url], persist_dir=ws.raw if persist else None)
+                jobs.update(job_id, downloads=[clip.download for clip in clips], timings=timer.as_dict())
+
+                preview_text, lang = _preview_text_lang()
+                key, reused, emb = _lookup_cached(job_id, voice_file_id, clips, preview_text, lang, timer)
+                cache_hit = reused is not None
+                if cache_hit:
+                    model_s3_uri, preview_public = reused
                 else:
-                    print(f"⚠️  Callback failed with status {response.status_code} for job {job_id}")
-            except Exception as e:
-                print(f"❌ Callback error for job {job_id}: {str(e)}")
+                    model_s3_uri, preview_public, uploads, emb = _train_and_upload(
+                        job_id, voice_file_id, clips, ws.model, ws.prep, ws.out, persist, preview_text, lang, timer
+                    )
+                    _remember_result(key, voice_file_id, uploads, emb)
 
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Training failed for job {job_id}: {error_msg}")
-        
-        JOBS[job_id].update(
-            status="ERROR", 
-            progress=0,
-            message=f"Training failed: {error_msg}",
-            voiceFileId=voice_file_id
-        )
-        
-        # 실패 콜백
-        if cb_url:
-            payload = {
-                # 💡 수정: 실패 시에도 voice_file_id를 modelId로 전달
-                "modelId": voice_file_id,
-                "status": "ERROR",
-                "errorMessage": error_msg,
-                "jobId": job_id
-            }
-            try:
-                requests.post(
-                    cb_url, 
-                    json=payload, 
-                    headers={"X-AUTH": secret}, 
-                    timeout=timeout
-                )
-            except Exception:
-                pass  # 콜백 실패해도 조용히 넘어감
+            # 이미 취소/제한 시간으로 종료됐으면 결과를 기록하지 않음 (업로드된 결과는 캐시에 남아 재시도 때 재사용)
+            if control.finish():
+                _complete_job(job_id, voice_file_id, model_s3_uri, preview_public, cache_hit, training_start_time, timer)
+                _index_voice(voice_file_id, emb)
+
+        except Exception as e:
+            # JobAborted 포함: 종료 기록은 abort 쪽에서 이미 함
+            if control.finish():
+                _fail_job(job_id, voice_file_id, str(e), training_start_time, timer)
 
 @router.post("/train", response_model=TrainStartResp)
-async def start_training(req: TrainStartReq, _: bool = Depends(require_xauth)):
-    """Java AiService와 호환되는 학습 시작 엔드포인트"""
+def start_training(
+    req: TrainStartReq,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    _: bool = Depends(require_xauth)
+):
+    """
+    Java AiService와 호환되는 학습 시작 엔드포인트
+    같은 voiceFileId 가 이미 학습 중이거나 같은 Idempotency-Key 로 제출된 Job 이 있으면
+    새 Job 을 만들지 않고 기존 jobId 를 반환 (결과/콜백은 한 번)
+    """
     
     if not req.voiceFileUrl or not req.voiceFileUrl.strip():
         raise HTTPException(status_code=400, detail="voiceFileUrl is required")
@@ -182,39 +426,59 @@ async def start_training(req: TrainStartReq, _: bool = Depends(require_xauth)):
     if not req.voiceFileId or not req.voiceFileId.strip():
         raise HTTPException(status_code=400, detail="voiceFileId is required")
 
+    # 모델이 아직 로드/워밍업 중이면 받지 않음 (Spring 이 재시도)
+    if settings.READINESS_GATES_ADMISSION and not readiness.is_ready():
+        raise HTTPException(status_code=503, detail="models are still loading", headers={"Retry-After": "15"})
+
+    # 대기열 자리를 Job 생성 전에 확보 (만든 뒤 429 로 지우면 그 사이 합류한 요청이 사라진 Job 을 보게 됨)
+    scheduler = get_scheduler()
+    try:
+        scheduler.reserve()
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
     # 고유한 Job ID 생성
     job_id = "job_" + uuid.uuid4().hex[:12]
     
-    # Job 상태 초기화
-    JOBS[job_id] = {
+    # Job 상태 초기화 (진행 중인 같은 요청이 있으면 합류)
+    jobs = get_job_store()
+    try:
+        job, created = jobs.create_or_attach({
         "jobId": job_id,
         "status": "TRAINING", 
         "progress": 0, 
-        "message": "initializing training",
+        "message": "queued for training",
         "voiceFileId": req.voiceFileId,
         "userId": req.userId,
         "walletAddress": req.walletAddress,
         "originalFilename": req.originalFilename,
+        "idempotencyKey": idempotency_key,
         "startedAt": time.time()
-    }
+        })
+    except Exception:
+        scheduler.unreserve()
+        raise
+    if not created:
+        scheduler.unreserve()
+        print(f"🔁 Attached request for voice file {req.voiceFileId} to existing job {job['jobId']}")
+        return TrainStartResp(jobId=job["jobId"], status=job.get("status", "TRAINING"))
     
-    # 백그라운드에서 학습 시작
-    thread = threading.Thread(
-        target=_train_worker, 
-        args=(job_id, req.voiceFileId, req.voiceFileUrl, req.userId, req.walletAddress, req.originalFilename),
-        daemon=True
+    # 스케줄러 대기열에 등록 (워커 풀이 순서대로 실행, 자리는 위에서 확보)
+    position = scheduler.submit(
+        job_id, _train_worker,
+        job_id, req.voiceFileId, req.voiceFileUrl, req.userId, req.walletAddress, req.originalFilename,
+        priority=req.priority, reserved=True
     )
-    thread.start()
     
-    print(f"🚀 Started training job {job_id} for voice file {req.voiceFileId}")
+    print(f"🚀 Queued training job {job_id} for voice file {req.voiceFileId} (position {position})")
     
     return TrainStartResp(jobId=job_id, status="TRAINING")
 
 # 학습 상태 조회
 @router.get("/status/{job_id}")
-async def get_training_status(job_id: str, _: bool = Depends(require_xauth)):
+def get_training_status(job_id: str, _: bool = Depends(require_xauth)):
     """학습 상태 조회"""
-    job = JOBS.get(job_id)
+    job = get_job_store().get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
@@ -227,37 +491,115 @@ async def get_training_status(job_id: str, _: bool = Depends(require_xauth)):
         "modelPath": job.get("modelPath"),
         "previewUrl": job.get("previewUrl"),
         "startedAt": job.get("startedAt"),
-        "trainingDurationSeconds": job.get("trainingDurationSeconds")
+        "trainingDurationSeconds": job.get("trainingDurationSeconds"),
+        "cacheHit": job.get("cacheHit", False),
+        "timings": job.get("timings"),
+        "batchId": job.get("batchId"),
+        "similarVoices": job.get("similarVoices"),
+        "embedding": job.get("embedding"),
+        "queuePosition": get_scheduler().position(job_id),
+        "etaSeconds": get_scheduler().eta(job_id)
     }
 
 # 모든 Job 상태 조회 (관리용)
 @router.get("/jobs")
-async def list_all_jobs(_: bool = Depends(require_xauth)):
-    """모든 학습 Job 목록 조회 (관리용)"""
+def list_all_jobs(
+    status: Optional[str] = Query(None, description="Filter by status (TRAINING/DONE/ERROR/CANCELLED/TIMEOUT)"),
+    voiceFileId: Optional[str] = Query(None, description="Filter by voice file id"),
+    userId: Optional[str] = Query(None, description="Filter by user id"),
+    batchId: Optional[str] = Query(None, description="Filter by batch id"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    _: bool = Depends(require_xauth)
+):
+    """학습 Job 목록 조회 (관리용, 최신순 페이지네이션)"""
+    total, rows = get_job_store().list(
+        status=status, voice_file_id=voiceFileId, user_id=userId, limit=limit, offset=offset, batch_id=batchId
+    )
     return {
-        "totalJobs": len(JOBS),
+        "totalJobs": total,
+        "limit": limit,
+        "offset": offset,
         "jobs": [
             {
-                "jobId": job_id,
+                "jobId": job.get("jobId"),
                 "status": job.get("status"),
                 "progress": job.get("progress", 0),
                 "voiceFileId": job.get("voiceFileId"),
+                "userId": job.get("userId"),
                 "startedAt": job.get("startedAt")
             }
-            for job_id, job in JOBS.items()
+            for job in rows
         ]
     }
 
 # Job 삭제 (관리용)
 @router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str, _: bool = Depends(require_xauth)):
+def delete_job(job_id: str, _: bool = Depends(require_xauth)):
     """완료된 Job 삭제 (관리용)"""
-    if job_id not in JOBS:
+    jobs = get_job_store()
+    job = jobs.get(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
-    job = JOBS[job_id]
     if job.get("status") == "TRAINING":
-        raise HTTPException(status_code=400, detail="Cannot delete running job")
+        raise HTTPException(status_code=400, detail=f"Cannot delete running job (cancel it first: POST /jobs/{job_id}/cancel)")
     
-    del JOBS[job_id]
-    return {"message": f"Job {job_id} deleted successfully"}
\ No newline at end of file
+    jobs.delete(job_id)
+    return {"message": f"Job {job_id} deleted successfully"}
+
+def _request_cancel(job: dict) -> str:
+    """
+    Job 취소. 반환: 요청 직후의 상태
+    - 이 프로세스에서 실행 중: 바로 CANCELLED 기록 + 워커 슬롯 반납 (작업은 다음 checkpoint 에서 멈춤)
+    - 이 프로세스의 대기열에 있음: 대기열에서 빼고 CANCELLED
+    - 이 프로세스 대기열에 있는 배치의 항목: 배치에서 빼고 CANCELLED (남은 항목이 없으면 배치도 대기열에서 뺌)
+    - 그 밖 (다른 워커 프로세스에서 실행 중, 실행 중인 배치 안에서 아직 시작 전): cancelRequested 플래그만 남기고
+      CANCELLING. 맡은 쪽이 JOB_CANCEL_POLL_SECONDS 안에 확인해 종료
+    """
+    job_id = job["jobId"]
+    reason = "cancelled by request"
+    control = get_job_controls().get(job_id)
+    if control is not None:
+        if control.abort(CANCELLED, reason):
+            return CANCELLED
+        # 방금 완료/실패로 끝남
+        return (get_job_store().get(job_id) or {}).get("status", "UNKNOWN")
+    if get_scheduler().cancel(job_id):
+        _abort_job(job_id, job.get("voiceFileId"), JobAborted(CANCELLED, reason), None, None)
+        return CANCELLED
+    if job.get("batchId"):
+        from .batch import cancel_queued_item  # batch 가 이 모듈을 import 하므로 여기서
+        if cancel_queued_item(job_id, job["batchId"], reason):
+            return CANCELLED
+    get_job_store().update(job_id, cancelRequested=True)
+    return "CANCELLING"
+
+# Job 취소
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, _: bool = Depends(require_xauth)):
+    """대기 중이거나 실행 중인 학습 Job 취소 (CANCELLED 로 종료, 실패 콜백과 같은 형식으로 콜백)"""
+    job = get_job_store().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.get("status") not in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already finished ({job.get('status')})")
+    return {"jobId": job_id, "status": _request_cancel(job)}
+
+# 콜백 아웃박스 조회 (관리용)
+@router.get("/callbacks")
+def list_callbacks(
+    status: Optional[str] = Query(None, description="PENDING / DELIVERED / DEAD"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    _: bool = Depends(require_xauth)
+):
+    """Spring 콜백 전송 상태 조회 (DEAD 는 최대 재시도 초과)"""
+    return {"callbacks": get_outbox().list(status=status, limit=limit, offset=offset)}
+
+# DEAD 콜백 재전송 (관리용)
+@router.post("/callbacks/{callback_id}/retry")
+def retry_callback(callback_id: int, _: bool = Depends(require_xauth)):
+    if not get_outbox().retry(callback_id):
+        raise HTTPException(status_code=404, detail=f"Dead callback {callback_id} not found")
+    return {"message": f"Callback {callback_id} requeued"}
@@ -0,0 +1,132 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..deps import require_xauth
+from ..core.config import settings
+from ..events import TooManySubscribersError, get_event_bus
+from ..jobstore import ACTIVE_STATUSES, get_job_store
+
+router = APIRouter(tags=["train"])
+
+# 프록시(nginx 등)가 스트림을 버퍼링하지 않도록
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _snapshot(job: dict) -> dict:
+    return {k: job.get(k) for k in ("jobId", "status", "progress", "message", "voiceFileId",
+                                    "modelPath", "previewUrl", "trainingDurationSeconds")}
+
+
+def _check_capacity():
+    """
+    구독자 수 상한이면 스트림을 시작하기 전에 503
+    (구독 자체는 스트림 생성기 안에서 -> 응답이 시작되기 전에 끊겨도 구독이 남지 않음)
+    """
+    if get_event_bus().full():
+        raise HTTPException(status_code=503, detail="too many event subscribers", headers={"Retry-After": "30"})
+
+
+def _subscribe_or_error(job_id: Optional[str] = None, transitions_only: bool = False):
+    """(구독, None) 또는 확인 이후 상한에 걸린 경우 (None, 보낼 error 이벤트)"""
+    try:
+        return get_event_bus().subscribe(job_id, transitions_only), None
+    except TooManySubscribersError as e:
+        return None, _sse("error", {"detail": str(e), "retryAfter": 30})
+
+
+@router.get("/status/{job_id}/events")
+async def job_events(job_id: str, request: Request, _: bool = Depends(require_xauth)):
+    """
+    Job 하나의 진행 이벤트 (Server-Sent Events)
+    snapshot(현재 상태) -> progress / status 이벤트 -> 종료 상태(DONE/ERROR)가 되면 스트림 종료
+    """
+    # Job 저장소(SQLite) 조회는 스레드풀에서 (락 대기가 이벤트 루프를 막지 않게)
+    if not await run_in_threadpool(get_job_store().get, job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    _check_capacity()
+
+    async def stream():
+        sub, error = _subscribe_or_error(job_id)
+        if sub is None:
+            yield error
+            return
+        try:
+            # 구독을 먼저 걸고 현재 상태를 다시 읽어야 그 사이의 이벤트를 놓치지 않음
+            job = await run_in_threadpool(get_job_store().get, job_id)
+            if job is None:
+                yield _sse("deleted", {"jobId": job_id})
+                return
+            last = _snapshot(job)
+            yield _sse("snapshot", last)
+            status = last["status"]
+            while status in ACTIVE_STATUSES:
+                events = await sub.get(settings.JOB_EVENTS_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if not events:
+                    # 이벤트가 없으면 공유 저장소를 다시 확인 (다른 워커 프로세스가 맡은 Job)
+                    current = await run_in_threadpool(get_job_store().get, job_id)
+                    if current is None:
+                        yield _sse("deleted", {"jobId": job_id})
+                        break
+                    current = _snapshot(current)
+                    if current != last:
+                        last = current
+                        status = current["status"]
+                        yield _sse("snapshot", current)
+                    else:
+                        yield ": keep-alive\n\n"
+                    continue
+                for event in events:
+                    status = event.get("status", status)
+                    yield _sse(event["type"], event, event["id"])
+                dropped = sub.take_dropped()
+                if dropped:
+                    yield _sse("lagged", {"jobId": job_id, "dropped": dropped})
+        finally:
+            get_event_bus().unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
+@router.get("/jobs/events")
+async def all_job_events(
+    request: Request,
+    transitions_only: bool = Query(False, alias="transitionsOnly", description="Only status transitions"),
+    _: bool = Depends(require_xauth)
+):
+    """모든 Job 의 진행 이벤트 (관리 화면용 SSE, 이 프로세스가 처리하는 Job 만)"""
+    _check_capacity()
+
+    async def stream():
+        sub, error = _subscribe_or_error(None, transitions_only)
+        if sub is None:
+            yield error
+            return
+        try:
+            yield _sse("stats", get_event_bus().stats())
+            while True:
+                events = await sub.get(settings.JOB_EVENTS_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                for event in events:
+                    yield _sse(event["type"], event, event["id"])
+                dropped = sub.take_dropped()
+                if dropped:
+                    yield _sse("lagged", {"dropped": dropped})
+        finally:
+            get_event_bus().unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=_SSE_HEADERS)
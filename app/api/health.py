@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+
+from ..readiness import readiness
+from ..metrics import CONTENT_TYPE_LATEST, render
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health")
+async def health():
+    """프로세스 생존 확인 (모델 로드 여부와 무관)"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """모델별 로드 상태/시간. 모두 준비되기 전에는 503"""
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@router.get("/metrics")
+def metrics():
+    """
+    Prometheus 스크레이프 (단계별 소요 시간, 대기열, 모델 로드 시간, 처리 오디오 길이, RTF)
+    아웃박스(SQLite) 조회와 디스크 사용량 계산이 있어 스레드풀에서 실행 (일반 def)
+    """
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,161 @@
+import struct
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ..deps import require_xauth
+from ..core.config import settings
+from ..scheduler import get_scheduler
+from ..storage import download_from_s3, file_sha256, is_not_found, remote_sha256
+from ..tts_preview import get_voice_latents, synth_stream, output_sample_rate
+from ..readiness import readiness
+from ..metrics import STAGE_SECONDS, observe_synthesis
+from ..artifact import MODEL_FILENAMES, find_model_file
+from ..workspace import get_workspace_manager
+
+router = APIRouter(tags=["synthesize"])
+
+# 최근 합성 요청의 TTFA / RTF 기록 (관리용 조회)
+_RECENT: deque = deque(maxlen=100)
+_recent_lock = threading.Lock()
+
+# 로컬 모델을 S3 와 마지막으로 비교한 시각 (voiceFileId -> time)
+_validated: dict = {}
+_validated_lock = threading.Lock()
+
+
+class SynthesizeReq(BaseModel):
+    voiceFileId: str = Field(..., description="Trained voice file UUID")
+    text: str = Field(..., min_length=1, max_length=5000, description="Text to synthesize")
+    language: str = Field(default_factory=lambda: settings.PREVIEW_LANG, description="Language code")
+    format: str = Field("wav", pattern="^(wav|pcm)$", description="wav (streamed header) or raw pcm s16le")
+
+
+def _wav_stream_header(sample_rate: int) -> bytes:
+    """길이를 모르는 스트리밍용 WAV 헤더 (RIFF/data 크기를 최대값으로 채움)"""
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def _to_pcm16(chunk: np.ndarray) -> bytes:
+    return (np.clip(chunk, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def _local_is_stale(voice_file_id: str, model_path: Path) -> bool:
+    """
+    로컬 모델이 S3 의 모델과 다른지 (다른 워커가 다시 학습한 경우)
+    SYNTH_MODEL_REVALIDATE_SECONDS 에 한 번만 S3 HEAD 로 sha256 메타데이터 비교. 확인할 수 없으면 그대로 사용
+    """
+    now = time.time()
+    with _validated_lock:
+        if now - _validated.get(voice_file_id, 0.0) < settings.SYNTH_MODEL_REVALIDATE_SECONDS:
+            return False
+        _validated[voice_file_id] = now
+    try:
+        remote = remote_sha256(settings.S3_BUCKET_MODELS, f"models/{voice_file_id}/{model_path.name}")
+    except Exception as e:
+        print(f"⚠️  Could not revalidate model {voice_file_id}: {e}")
+        return False
+    return remote is not None and remote != file_sha256(model_path)
+
+
+def _load_latents(voice_file_id: str):
+    """
+    캐시 -> 로컬 모델 -> S3 모델 순으로 XTTS 조건 잠재벡터 로드 (.avm 우선, 없으면 기존 .npz)
+    로컬 모델이 S3 보다 오래됐으면 다시 받음 (잠재벡터 캐시는 모델 파일 기준이라 함께 갱신)
+    S3 에 모델이 없을 때만 404. 권한/네트워크 등 다른 S3 오류는 502 (클라이언트가 재시도할 수 있게)
+    """
+    workspaces = get_workspace_manager()
+    model_dir = workspaces.model_dir(voice_file_id)
+    model_path = find_model_file(model_dir)
+    if model_path is not None and _local_is_stale(voice_file_id, model_path):
+        print(f"♻️  Local model for {voice_file_id} is outdated; downloading again")
+        model_path = None
+    if model_path is None:
+        for name in MODEL_FILENAMES:
+            try:
+                model_path = download_from_s3(settings.S3_BUCKET_MODELS, f"models/{voice_file_id}/{name}",
+                                              model_dir / name)
+                break
+            except Exception as e:
+                if is_not_found(e):
+                    continue
+                print(f"❌ Failed to download model {voice_file_id}/{name}: {e}")
+                raise HTTPException(status_code=502, detail=f"Could not load voice model {voice_file_id} from storage")
+        else:
+            raise HTTPException(status_code=404, detail=f"Voice model {voice_file_id} not found")
+        workspaces.touch(voice_file_id)
+        workspaces.added(model_path.stat().st_size)
+    else:
+        workspaces.touch(voice_file_id)  # LRU: 최근에 쓴 모델은 축출 대상에서 뒤로
+    latents = get_voice_latents(voice_file_id, model_path)
+    if latents is None:
+        raise HTTPException(status_code=409, detail="Voice model has no stored XTTS conditioning; retrain it")
+    return latents
+
+
+@router.post("/synthesize")
+def synthesize(req: SynthesizeReq, _: bool = Depends(require_xauth)):
+    """학습된 목소리로 임의 텍스트를 스트리밍 합성 (생성되는 대로 청크 전송)"""
+    if settings.READINESS_GATES_ADMISSION and not readiness.is_ready():
+        raise HTTPException(status_code=503, detail="models are still loading", headers={"Retry-After": "15"})
+    request_start = time.time()
+    latents = _load_latents(req.voiceFileId)
+    sr = output_sample_rate()
+
+    def generate():
+        first_audio_at = None
+        samples = 0
+        with get_scheduler().stage("synthesize"):
+            if req.format == "wav":
+                yield _wav_stream_header(sr)
+            for chunk in synth_stream(latents, req.text, lang=req.language,
+                                      stream_chunk_size=settings.SYNTH_STREAM_CHUNK_SIZE):
+                if first_audio_at is None:
+                    first_audio_at = time.time()
+                samples += len(chunk)
+                yield _to_pcm16(chunk)
+
+        elapsed = time.time() - request_start
+        audio_seconds = samples / sr
+        STAGE_SECONDS.labels("synthesize").observe(elapsed)
+        observe_synthesis("synthesize", elapsed, audio_seconds)
+        stats = {
+            "voiceFileId": req.voiceFileId,
+            "textChars": len(req.text),
+            "ttfaSeconds": round(first_audio_at - request_start, 3) if first_audio_at else None,
+            "audioSeconds": round(audio_seconds, 3),
+            "elapsedSeconds": round(elapsed, 3),
+            "rtf": round(elapsed / audio_seconds, 3) if audio_seconds else None,
+            "at": request_start,
+        }
+        with _recent_lock:
+            _RECENT.append(stats)
+        print(f"🔊 Synthesized {req.voiceFileId}: TTFA={stats['ttfaSeconds']}s RTF={stats['rtf']}")
+
+    media_type = "audio/wav" if req.format == "wav" else "audio/L16; rate=%d; channels=1" % sr
+    return StreamingResponse(generate(), media_type=media_type, headers={"X-Sample-Rate": str(sr)})
+
+
+@router.get("/synthesize/stats")
+async def synthesize_stats(_: bool = Depends(require_xauth)):
+    """최근 합성 요청들의 TTFA / RTF (관리용)"""
+    with _recent_lock:
+        recent = list(_RECENT)
+    ttfas = [r["ttfaSeconds"] for r in recent if r["ttfaSeconds"] is not None]
+    rtfs = [r["rtf"] for r in recent if r["rtf"] is not None]
+    return {
+        "count": len(recent),
+        "avgTtfaSeconds": round(float(np.mean(ttfas)), 3) if ttfas else None,
+        "avgRtf": round(float(np.mean(rtfs)), 3) if rtfs else None,
+        "recent": recent,
+    }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..deps import require_xauth
+from ..voice_index import get_voice_index
+
+router = APIRouter(tags=["voices"])
+
+
+@router.get("/voices/index")
+def voice_index_stats(_: bool = Depends(require_xauth)):
+    """인덱스에 들어 있는 목소리 수 / 검색 방식 (exact | ivf). 인덱스 갱신(DB 읽기)이 있어 스레드풀에서 실행"""
+    return get_voice_index().stats()
+
+
+@router.get("/voices/{voice_file_id}/similar")
+def similar_voices(
+    voice_file_id: str,
+    k: int = Query(5, ge=1, le=100),
+    min_score: float = Query(-1.0, alias="minScore", ge=-1.0, le=1.0),
+    _: bool = Depends(require_xauth)
+):
+    """학습된 목소리와 가장 비슷한 다른 목소리 top-k (cosine 유사도)"""
+    index = get_voice_index()
+    query = index.get(voice_file_id)
+    if query is None:
+        raise HTTPException(status_code=404, detail=f"Voice {voice_file_id} is not in the index")
+    matches = index.search(query, k=k, exclude=voice_file_id)
+    return {
+        "voiceFileId": voice_file_id,
+        "matches": [{"voiceFileId": vid, "score": round(score, 4)} for vid, score in matches if score >= min_score],
+    }
@@ -0,0 +1,244 @@
+"""
+목소리 모델 파일 포맷 (.avm, 2.0.0~)
+
+np.savez_compressed(zip) 대신 고정 헤더 + JSON 메타데이터 + 64바이트 정렬 텐서 블록으로 저장해
+np.memmap 으로 압축 해제/복사 없이 바로 읽는다.
+
+    0   8s   magic  b"AUDIONVM"
+    8   u16  format major
+    10  u16  format minor
+    12  u32  메타데이터(JSON) 길이
+    16  ...  메타데이터 JSON (model_version, encoder, tensors{name: dtype/shape/offset/quant})
+    ..  64바이트 정렬된 텐서 데이터
+
+- 텐서는 float16 또는 int8(마지막 축 기준 행별 scale, float32) 로 양자화해 저장
+- 읽을 때 load_voice_model() 은 기존 .npz (1.0.0 / 1.1.0) 도 같은 인터페이스로 돌려줌
+"""
+import json
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"AUDIONVM"
+FORMAT_VERSION = (1, 0)
+_HEADER = struct.Struct("<8sHHI")
+_ALIGN = 64
+
+MODEL_FILENAME = "model.avm"
+LEGACY_MODEL_FILENAME = "model.npz"
+# 읽을 때 찾는 순서 (새 포맷 우선)
+MODEL_FILENAMES = (MODEL_FILENAME, LEGACY_MODEL_FILENAME)
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _quantize(arr: np.ndarray, quant: str) -> Dict[str, np.ndarray]:
+    arr = np.asarray(arr, dtype=np.float32)
+    if quant == "float32":
+        return {"": arr.astype("<f4")}
+    if quant == "float16":
+        return {"": arr.astype("<f2")}
+    if quant == "int8":
+        # 마지막 축 기준 대칭 양자화 (행마다 absmax / 127)
+        scale = np.abs(arr).max(axis=-1, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        q = np.clip(np.rint(arr / scale), -127, 127).astype("i1")
+        return {"": q, ".scale": scale.astype("<f4")}
+    raise ValueError(f"unknown quantization {quant}")
+
+
+def write_voice_model(path: Path, tensors: Dict[str, np.ndarray], metadata: dict, quant: str = "float16") -> Path:
+    """tensors 를 quant 로 양자화해 .avm 으로 저장 (임시 파일에 쓰고 rename)"""
+    blobs = []
+    table = {}
+    for name, arr in tensors.items():
+        parts = _quantize(arr, quant)
+        for suffix, data in parts.items():
+            table[name + suffix] = {"dtype": data.dtype.str, "shape": list(data.shape),
+                                    "quant": quant if not suffix else "scale"}
+            blobs.append((name + suffix, np.ascontiguousarray(data)))
+        if ".scale" in parts:
+            table[name]["scale"] = name + ".scale"
+
+    # 오프셋은 메타데이터 길이에 따라 달라지므로, 오프셋 자릿수가 안정될 때까지 계산
+    meta = {**metadata, "tensors": table}
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, data in blobs:
+            table[name]["offset"] = offset
+            offset = _align(offset + data.nbytes)
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        needed = _align(_HEADER.size + len(meta_bytes))
+        if needed == data_start:
+            break
+        data_start = needed
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, *FORMAT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, data in blobs:
+            f.seek(table[name]["offset"])
+            f.write(data.tobytes())
+    tmp.replace(path)
+    return path
+
+
+class VoiceModel:
+    """
+    목소리 모델 파일 읽기 결과
+    .avm 은 memmap 위의 view(복사 없음), .npz 는 메모리로 읽은 배열
+    """
+
+    def __init__(self, path: Path, metadata: dict, raw: Dict[str, np.ndarray]):
+        self.path = path
+        self.metadata = metadata
+        self._raw = raw
+
+    @property
+    def model_version(self) -> str:
+        return self.metadata.get("model_version", "1.0.0")
+
+    def has(self, name: str) -> bool:
+        return name in self._raw
+
+    def raw(self, name: str) -> np.ndarray:
+        """저장된 그대로의 배열 (양자화된 dtype 일 수 있음)"""
+        return self._raw[name]
+
+    def tensor(self, name: str) -> np.ndarray:
+        """float32 로 복원한 배열"""
+        data = self._raw[name]
+        info = self.metadata.get("tensors", {}).get(name, {})
+        if info.get("quant") == "int8":
+            return data.astype(np.float32) * self._raw[info["scale"]]
+        return np.array(data, dtype=np.float32)  # 쓰기 가능한 사본 (torch.from_numpy 용)
+
+    @property
+    def embedding(self) -> np.ndarray:
+        return self.tensor("embedding")
+
+    @property
+    def xtts_latents(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """XTTS 조건 잠재벡터. 1.0.0 모델처럼 없으면 None"""
+        if not self.has("xtts_gpt_cond_latent"):
+            return None
+        return self.tensor("xtts_gpt_cond_latent"), self.tensor("xtts_speaker_embedding")
+
+
+def _load_avm(path: Path) -> VoiceModel:
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, major, minor, meta_len = _HEADER.unpack(mm[:_HEADER.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a voice model file")
+    if major != FORMAT_VERSION[0]:
+        raise ValueError(f"{path} has unsupported format version {major}.{minor}")
+    metadata = json.loads(mm[_HEADER.size:_HEADER.size + meta_len].tobytes().decode("utf-8"))
+    raw = {}
+    for name, info in metadata["tensors"].items():
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"], dtype=np.int64))
+        start = info["offset"]
+        raw[name] = mm[start:start + count * dtype.itemsize].view(dtype).reshape(info["shape"])
+    return VoiceModel(path, metadata, raw)
+
+
+def _load_npz(path: Path) -> VoiceModel:
+    with np.load(path) as data:
+        raw = {name: data[name] for name in data.files
+               if name in ("embedding", "xtts_gpt_cond_latent", "xtts_speaker_embedding")}
+        metadata = {
+            "model_version": str(data["model_version"]) if "model_version" in data.files else "1.0.0",
+            "encoder": str(data["encoder"]) if "encoder" in data.files else None,
+        }
+    return VoiceModel(path, metadata, raw)
+
+
+def load_voice_model(path: Path) -> VoiceModel:
+    """.avm / 기존 .npz 모두 읽음 (파일 앞부분 magic 으로 판별)"""
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC))
+    if head == MAGIC:
+        return _load_avm(path)
+    if head.startswith(b"PK"):
+        return _load_npz(path)
+    raise ValueError(f"{path} is not a voice model file")
+
+
+def find_model_file(model_dir: Path) -> Optional[Path]:
+    for name in MODEL_FILENAMES:
+        if (Path(model_dir) / name).exists():
+            return Path(model_dir) / name
+    return None
+
+
+# --- 일괄 변환 / 비교 리포트 ---
+
+def convert_npz(npz_path: Path, quant: str = "float16") -> Path:
+    """기존 model.npz 옆에 같은 내용의 model.avm 을 만듦 (모델 버전은 그대로 유지)"""
+    legacy = _load_npz(Path(npz_path))
+    tensors = {name: legacy.tensor(name) for name in legacy._raw}
+    metadata = {**legacy.metadata, "converted_from": LEGACY_MODEL_FILENAME}
+    return write_voice_model(Path(npz_path).with_name(MODEL_FILENAME), tensors, metadata, quant=quant)
+
+
+def _median_load_ms(path: Path, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model = load_voice_model(path)
+        model.embedding
+        model.xtts_latents
+        times.append((time.perf_counter() - started) * 1000)
+    return float(np.median(times))
+
+
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="Convert model.npz voice models to model.avm and report savings")
+    p.add_argument("models_root", type=Path, nargs="?", default=Path("/data/models"))
+    p.add_argument("--quant", choices=("float32", "float16", "int8"), default="float16")
+    p.add_argument("--repeats", type=int, default=20, help="loads per file when timing")
+    p.add_argument("--remove-npz", action="store_true", help="delete model.npz after a successful conversion")
+    args = p.parse_args(argv)
+
+    totals = {"files": 0, "npzBytes": 0, "avmBytes": 0, "npzLoadMs": 0.0, "avmLoadMs": 0.0, "maxAbsError": 0.0}
+    for npz_path in sorted(args.models_root.glob(f"*/{LEGACY_MODEL_FILENAME}")):
+        try:
+            avm_path = convert_npz(npz_path, quant=args.quant)
+        except Exception as e:
+            print(f"❌ {npz_path}: {e}")
+            continue
+        old, new = load_voice_model(npz_path), load_voice_model(avm_path)
+        for name in old._raw:
+            err = float(np.max(np.abs(old.tensor(name) - new.tensor(name)))) if old._raw[name].size else 0.0
+            totals["maxAbsError"] = max(totals["maxAbsError"], err)
+        totals["files"] += 1
+        totals["npzBytes"] += npz_path.stat().st_size
+        totals["avmBytes"] += avm_path.stat().st_size
+        totals["npzLoadMs"] += _median_load_ms(npz_path, args.repeats)
+        totals["avmLoadMs"] += _median_load_ms(avm_path, args.repeats)
+        if args.remove_npz:
+            npz_path.unlink()
+
+    n = totals["files"]
+    if not n:
+        print(f"No {LEGACY_MODEL_FILENAME} files under {args.models_root}")
+        return
+    print(f"✅ Converted {n} models ({args.quant})")
+    print(f"   size: {totals['npzBytes'] / n / 1024:.1f} KiB -> {totals['avmBytes'] / n / 1024:.1f} KiB per model "
+          f"({1 - totals['avmBytes'] / totals['npzBytes']:.0%} smaller)")
+    print(f"   load: {totals['npzLoadMs'] / n:.3f} ms -> {totals['avmLoadMs'] / n:.3f} ms per model (median)")
+    print(f"   max abs dequantization error: {totals['maxAbsError']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
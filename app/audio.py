@@ -1,13 +1,19 @@
 import os
-import subprocess
-import torch
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple, Union
 import numpy as np
 import soundfile as sf
-import librosa
-import requests
-from speechbrain.pretrained import EncoderClassifier
+
+from .core.config import settings
+from . import accel, cancellation
+from .artifact import MODEL_FILENAME, load_voice_model, write_voice_model
+from .embedding_service import get_embedding_batcher
+from .vad import speech_windows, spread_order
+
+# 1.1.0: XTTS 조건 잠재벡터(xtts_gpt_cond_latent, xtts_speaker_embedding) 추가
+# 2.0.0: .npz 대신 memmap 으로 읽는 .avm 포맷 (float16/int8 양자화, app/artifact.py)
+MODEL_VERSION = "2.0.0"
+ENCODER_SOURCE = "speechbrain/spkrec-ecapa-voxceleb"
 
 _encoder = None
 
@@ -15,98 +21,139 @@ def get_encoder():
     """SpeechBrain 음성 인코더 (speaker embedding 추출용)"""
     global _encoder
     if _encoder is None:
-        _encoder = EncoderClassifier.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb",
+        # speechbrain/torch 는 무거우므로 실제로 모델을 쓰는 프로세스에서만 import
+        from speechbrain.pretrained import EncoderClassifier
+        encoder = EncoderClassifier.from_hparams(
+            source=ENCODER_SOURCE,
             savedir="tmp_models/spkrec-ecapa-voxceleb"
         )
+        # INFERENCE_ACCEL / INFERENCE_COMPILE 이 켜져 있으면 정확도 게이트를 통과한 경우에만 교체
+        _encoder = accel.accelerate_encoder(encoder)
     return _encoder
 
-def download_files(urls: List[str], output_dir: Path) -> List[Path]:
-    """URL에서 파일들을 다운로드"""
-    downloaded = []
+def preprocess_signal(audio: np.ndarray, name: str, persist_dir: Optional[Path] = None) -> Optional[np.ndarray]:
+    """
+    이미 16kHz mono 로 디코딩된 버퍼의 무음 제거 (디스크 미경유)
+    persist_dir 가 주어지면 디버깅용으로 전처리 결과를 wav 로 남김
+    """
+    import librosa  # numba 초기화가 느리므로 실제 사용 시점에 import
+    # 무음 제거 (음성 활동 감지). trim 은 원본 버퍼의 view 를 돌려줌
+    audio_trimmed, _ = librosa.effects.trim(audio, top_db=20)
     
-    for url in urls:
-        try:
-            filename = url.split('/')[-1].split('?')[0] or "audio.wav"
-            output_path = output_dir / filename
-            
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            downloaded.append(output_path)
-            print(f"✅ Downloaded: {filename}")
-            
-        except Exception as e:
-            print(f"❌ Failed to download {url}: {str(e)}")
+    # 너무 짧으면 스킵 (최소 1초)
+    if len(audio_trimmed) < 16000:
+        print(f"⚠️  Audio too short after trimming: {name}")
+        return None
+    
+    if persist_dir is not None:
+        persist_dir.mkdir(parents=True, exist_ok=True)
+        sf.write(persist_dir / f"{Path(name).stem}_16k.wav", audio_trimmed, 16000)
     
-    return downloaded
+    return audio_trimmed
 
-def preprocess_to_16k_mono(input_paths: List[Path], output_dir: Path) -> List[Path]:
+def _use_windows(signals: List[np.ndarray]) -> bool:
+    mode = settings.EMBED_SEGMENT_MODE
+    if mode == "always":
+        return True
+    if mode == "auto":
+        return sum(len(s) for s in signals) / 16000 >= settings.EMBED_SEGMENT_MIN_SECONDS
+    return False
+
+def _embed_windowed(signals: List[np.ndarray], stats: dict) -> np.ndarray:
     """
-    오디오 파일들을 16kHz mono로 변환하고 무음 제거
+    VAD 로 말소리만 모아 고정 길이 윈도우로 자르고, 배치 단위로 임베딩해 누적 평균
+    누적 평균의 cosine 변화가 EMBED_CONVERGENCE_EPS 미만인 배치가 연속 PATIENCE 번이면 조기 종료
+    처리하는 오디오 길이는 EMBED_MAX_AUDIO_SECONDS 로 제한 (메모리/시간 상한)
     """
-    processed = []
-    
-    for input_path in input_paths:
-        try:
-            # 오디오 로드 (자동으로 16kHz로 리샘플링)
-            audio, sr = librosa.load(input_path, sr=16000, mono=True)
-            
-            # 무음 제거 (음성 활동 감지)
-            audio_trimmed, _ = librosa.effects.trim(audio, top_db=20)
-            
-            # 너무 짧으면 스킵 (최소 1초)
-            if len(audio_trimmed) < 16000:
-                print(f"⚠️  Audio too short after trimming: {input_path.name}")
-                continue
-            
-            # 출력 경로
-            output_path = output_dir / f"{input_path.stem}_16k.wav"
-            
-            # 저장
-            sf.write(output_path, audio_trimmed, 16000)
-            processed.append(output_path)
-            
-            print(f"✅ Preprocessed: {input_path.name} -> {output_path.name}")
-            
-        except Exception as e:
-            print(f"❌ Failed to preprocess {input_path}: {str(e)}")
-    
-    return processed
+    batcher = get_embedding_batcher()
+    window_s = settings.EMBED_WINDOW_SECONDS
+
+    # 클립별 윈도우를 녹음 전체에 고르게 퍼지는 순서로 나열하고, 클립 사이는 번갈아 가며 섞음
+    per_clip = []
+    for sig in signals:
+        windows = speech_windows(sig, 16000, window_s)
+        per_clip.append([windows[i] for i in spread_order(len(windows))])
+    ordered = []
+    for i in range(max((len(c) for c in per_clip), default=0)):
+        ordered.extend(c[i] for c in per_clip if i < len(c))
+    if not ordered:
+        raise RuntimeError("No speech detected in audio")
+
+    max_windows = max(1, int(settings.EMBED_MAX_AUDIO_SECONDS / window_s))
+    total, mean = None, None
+    used, stable, converged = 0, 0, False
+    for start in range(0, min(len(ordered), max_windows), settings.EMBED_WINDOW_BATCH):
+        cancellation.checkpoint()  # 윈도우 배치 사이에서 취소/제한 시간 확인
+        batch = ordered[start:min(start + settings.EMBED_WINDOW_BATCH, max_windows)]
+        embs = np.stack(batcher.embed_many(batch))
+        total = embs.sum(axis=0) if total is None else total + embs.sum(axis=0)
+        used += len(batch)
+        new_mean = total / np.linalg.norm(total)
+        if mean is not None and 1.0 - float(new_mean @ mean) < settings.EMBED_CONVERGENCE_EPS:
+            stable += 1
+        else:
+            stable = 0
+        mean = new_mean
+        if used >= settings.EMBED_MIN_WINDOWS and stable >= settings.EMBED_CONVERGENCE_PATIENCE:
+            converged = True
+            break
+
+    stats.update(
+        mode="windowed",
+        windows=len(ordered),
+        windowsUsed=used,
+        audioSecondsUsed=round(sum(len(w) for w in ordered[:used]) / 16000, 2),
+        converged=converged,
+    )
+    print(f"✅ Windowed embedding: {used}/{len(ordered)} windows"
+          f"{' (converged)' if converged else ''}")
+    return mean
 
-def compute_speaker_embedding(audio_paths: List[Path]) -> np.ndarray:
+def compute_speaker_embedding(audio_inputs: List[Union[Path, np.ndarray]],
+                              stats: Optional[dict] = None) -> np.ndarray:
     """
-    여러 오디오 파일들로부터 화자 임베딩 추출 (평균)
+    여러 오디오(파일 경로 또는 16kHz float32 버퍼)로부터 화자 임베딩 추출 (평균)
+    긴 입력은 EMBED_SEGMENT_MODE 에 따라 VAD 윈도우 단위로 나눠 추출 (stats 에 사용량 기록)
     """
-    encoder = get_encoder()
-    embeddings = []
-    
-    for audio_path in audio_paths:
+    stats = stats if stats is not None else {}
+    signals = []
+    for i, item in enumerate(audio_inputs):
+        label = item.name if isinstance(item, Path) else f"buffer #{i}"
         try:
             # SpeechBrain으로 임베딩 추출
-            signal, fs = sf.read(audio_path)
+            if isinstance(item, Path):
+                signal, fs = sf.read(item, dtype="float32")
+            else:
+                signal = item
             
             # 모노로 변환 (스테레오인 경우)
             if len(signal.shape) > 1:
                 signal = signal.mean(axis=1)
+            signals.append((label, signal))
+        except Exception as e:
+            print(f"⚠️  Failed to extract embedding from {label}: {str(e)}")
+
+    if signals and _use_windows([sig for _, sig in signals]):
+        return _embed_windowed([sig for _, sig in signals], stats)
+
+    stats.update(mode="whole", audioSecondsUsed=round(sum(len(sig) for _, sig in signals) / 16000, 2))
+    batcher = get_embedding_batcher()
+    futures = []
+    for label, signal in signals:
+        try:
+            # 다른 Job 의 요청과 함께 배치로 묶여 추출됨
+            futures.append((label, batcher.submit(signal)))
             
-            # 임베딩 추출 (batch_size=1)
-            embedding = encoder.encode_batch(
-                torch.tensor(signal).unsqueeze(0)
-            )
-            
-            # numpy로 변환
-            emb_np = embedding.squeeze().cpu().numpy()
-            embeddings.append(emb_np)
-            
-            print(f"✅ Extracted embedding from: {audio_path.name}")
-            
         except Exception as e:
-            print(f"⚠️  Failed to extract embedding from {audio_path}: {str(e)}")
+            print(f"⚠️  Failed to extract embedding from {label}: {str(e)}")
+    
+    embeddings = []
+    for label, fut in futures:
+        try:
+            embeddings.append(fut.result())
+            print(f"✅ Extracted embedding from: {label}")
+        except Exception as e:
+            print(f"⚠️  Failed to extract embedding from {label}: {str(e)}")
     
     if not embeddings:
         raise RuntimeError("No embeddings could be extracted from audio files")
@@ -119,27 +166,23 @@ def compute_speaker_embedding(audio_paths: List[Path]) -> np.ndarray:
     
     return mean_embedding
 
-def save_model_npz(embedding: np.ndarray, output_dir: Path) -> Path:
+def save_voice_model(embedding: np.ndarray, output_dir: Path,
+                     xtts_latents: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Path:
     """
-    화자 임베딩을 .npz 형식으로 저장
+    화자 임베딩(+ XTTS 조건 잠재벡터)을 .avm 형식으로 저장 (MODEL_ARTIFACT_QUANT 로 양자화)
     """
-    output_path = output_dir / "model.npz"
-    
-    # 메타데이터와 함께 저장
-    np.savez_compressed(
-        output_path,
-        embedding=embedding,
-        embedding_size=len(embedding),
-        model_version="1.0.0",
-        encoder="speechbrain/spkrec-ecapa-voxceleb"
+    tensors = {"embedding": embedding}
+    if xtts_latents is not None:
+        tensors["xtts_gpt_cond_latent"], tensors["xtts_speaker_embedding"] = xtts_latents
+    output_path = write_voice_model(
+        output_dir / MODEL_FILENAME,
+        tensors,
+        {"model_version": MODEL_VERSION, "encoder": ENCODER_SOURCE, "embedding_size": int(len(embedding))},
+        quant=settings.MODEL_ARTIFACT_QUANT,
     )
-    
     print(f"✅ Saved model: {output_path}")
     return output_path
 
-# PyTorch import (SpeechBrain이 필요로 함)
-try:
-    import torch
-except ImportError:
-    print("⚠️  PyTorch not found. Installing required for SpeechBrain...")
-    subprocess.check_call(["pip", "install", "torch", "torchaudio"])
\ No newline at end of file
+def load_xtts_latents(model_path: Path) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """모델 파일(.avm / .npz)에 저장된 XTTS 조건 잠재벡터. 1.0.0 모델처럼 없으면 None"""
+    return load_voice_model(model_path).xtts_latents
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .core.config import settings
+from .metrics import STAGE_SECONDS
+
+# 아웃박스 항목 상태
+PENDING = "PENDING"
+DELIVERED = "DELIVERED"
+DEAD = "DEAD"  # 최대 재시도 초과 (관리용 API 로 수동 재시도)
+
+
+class CallbackOutbox:
+    """
+    Spring 콜백 아웃박스 (SQLite)
+
+    학습 워커는 enqueue 만 하고 바로 돌아감. 실제 전송은 비동기 전송 워커가 담당
+    여러 프로세스가 같은 DB 를 공유해도 lease 로 한 항목을 한 워커만 전송
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id          TEXT NOT NULL,
+                payload         TEXT NOT NULL,
+                status          TEXT NOT NULL,
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_owner     TEXT,
+                lease_until     REAL,
+                last_error      TEXT,
+                created_at      REAL NOT NULL,
+                delivered_at    REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+        """)
+        # 이전 버전 DB 마이그레이션: 항목별 전송 URL (없으면 SPRING_CALLBACK_URL)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "url" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN url TEXT")
+        self._wakeup: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = None
+        self._slots: Optional[asyncio.Semaphore] = None  # 동시 전송 제한 (run_delivery 에서 생성)
+
+    def enqueue(self, job_id: str, payload: dict, url: Optional[str] = None) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (job_id, payload, status, next_attempt_at, created_at, url) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload, ensure_ascii=False), PENDING, now, now, url),
+            )
+        # 전송 워커를 깨움 (워커 스레드 -> 이벤트 루프)
+        if self._wakeup is not None:
+            loop, event = self._wakeup
+            loop.call_soon_threadsafe(event.set)
+        return cur.lastrowid
+
+    def claim_due(self, limit: int, lease_seconds: float) -> List[Tuple[int, str, dict, int, Optional[str]]]:
+        """전송할 차례가 된 항목을 lease 로 점유. (id, job_id, payload, attempts, url) 목록"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, job_id, payload, attempts, url FROM outbox "
+                    "WHERE status = ? AND next_attempt_at <= ? AND (lease_until IS NULL OR lease_until < ?) "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (PENDING, now, now, limit),
+                ).fetchall()
+                for row in rows:
+                    self._conn.execute("UPDATE outbox SET lease_owner = ?, lease_until = ? WHERE id = ?",
+                                       (self.owner, now + lease_seconds, row[0]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(r[0], r[1], json.loads(r[2]), r[3], r[4]) for r in rows]
+
+    def renew(self, ids: List[int], lease_seconds: float):
+        """전송 중인 항목의 lease 연장 (이미 전송/실패 처리된 항목은 건드리지 않음)"""
+        until = time.time() + lease_seconds
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET lease_until = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = ? AND lease_until IS NOT NULL",
+                [(until, i, self.owner, PENDING) for i in ids],
+            )
+
+    def mark_delivered(self, ids: List[int]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, delivered_at = ?, lease_until = NULL WHERE id = ?",
+                [(DELIVERED, time.time(), i) for i in ids],
+            )
+
+    def mark_failed(self, item_id: int, attempts: int, error: str):
+        """지수 백오프 + full jitter 로 다음 시도 예약. 최대 횟수를 넘으면 DEAD"""
+        if attempts >= settings.CALLBACK_MAX_ATTEMPTS:
+            status, next_at = DEAD, time.time()
+        else:
+            cap = min(settings.CALLBACK_BACKOFF_MAX_SECONDS, settings.CALLBACK_BACKOFF_BASE_SECONDS * (2 ** attempts))
+            status, next_at = PENDING, time.time() + random.uniform(0, cap)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, lease_until = NULL, "
+                "last_error = ? WHERE id = ?",
+                (status, attempts, next_at, error[:500], item_id),
+            )
+        return status
+
+    def list(self, status: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[dict]:
+        clause, params = ("WHERE status = ?", [status]) if status else ("", [])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, job_id, status, attempts, next_attempt_at, last_error, created_at, delivered_at "
+                f"FROM outbox {clause} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        keys = ("id", "jobId", "status", "attempts", "nextAttemptAt", "lastError", "createdAt", "deliveredAt")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def retry(self, item_id: int) -> bool:
+        """DEAD 항목을 다시 PENDING 으로 (시도 횟수 초기화)"""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ? WHERE id = ? AND status = ?",
+                (PENDING, time.time(), item_id, DEAD),
+            )
+        return cur.rowcount > 0
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (PENDING,)).fetchone()[0]
+
+    # --- 비동기 전송 워커 ---
+
+    async def run_delivery(self):
+        """
+        단일 비동기 전송 워커. 커넥션 풀을 재사용하는 httpx.AsyncClient 로 전송
+        SPRING_CALLBACK_BATCH_URL 이 있으면 여러 완료 건을 한 요청으로 묶어 보냄
+
+        동시 전송은 커넥션 수(CALLBACK_CONCURRENCY) 만큼만 (나머지는 풀 대기 시간 초과 대신 차례를 기다림)
+        꺼낸 항목이 모두 끝날 때까지 lease 를 주기적으로 연장 -> 전송 도중 다른 워커가 다시 가져가지 않음
+        """
+        import httpx
+
+        event = asyncio.Event()
+        self._wakeup = (asyncio.get_running_loop(), event)
+        headers = {"X-AUTH": settings.X_AUTH_SHARED_SECRET}
+        limits = httpx.Limits(max_connections=settings.CALLBACK_CONCURRENCY,
+                              max_keepalive_connections=settings.CALLBACK_CONCURRENCY)
+        self._slots = asyncio.Semaphore(max(1, settings.CALLBACK_CONCURRENCY))
+        lease = settings.CALLBACK_TIMEOUT * 3
+        async with httpx.AsyncClient(timeout=settings.CALLBACK_TIMEOUT, limits=limits, headers=headers) as client:
+            while True:
+                try:
+                    due = await asyncio.to_thread(self.claim_due, settings.CALLBACK_BATCH_SIZE, lease)
+                    if due:
+                        inflight = {item[0] for item in due}
+                        renewer = asyncio.create_task(self._renew_leases(inflight, lease))
+                        try:
+                            # 전송 URL 이 따로 지정된 항목(배치 집계 콜백 등)은 묶지 않고 개별 전송
+                            plain = [item for item in due if not item[4]]
+                            if settings.SPRING_CALLBACK_BATCH_URL and len(plain) > 1:
+                                singles = [item for item in due if item[4]]
+                                await asyncio.gather(self._send_batch(client, plain, inflight),
+                                                     *(self._send_one(client, item, inflight) for item in singles))
+                            else:
+                                await asyncio.gather(*(self._send_one(client, item, inflight) for item in due))
+                        finally:
+                            renewer.cancel()
+                        continue  # 밀린 항목이 더 있을 수 있으니 바로 다시 확인
+                except Exception as e:
+                    print(f"⚠️  Callback delivery loop error: {e}")
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=settings.CALLBACK_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _renew_leases(self, inflight: set, lease: float):
+        """lease 의 1/3 마다 아직 끝나지 않은 항목의 lease 연장"""
+        while inflight:
+            await asyncio.sleep(lease / 3)
+            try:
+                await asyncio.to_thread(self.renew, list(inflight), lease)
+            except Exception as e:
+                print(f"⚠️  Failed to renew callback leases: {e}")
+
+    async def _send_one(self, client, item, inflight: set):
+        item_id, job_id, payload, attempts, url = item
+        try:
+            async with self._slots:
+                started = time.perf_counter()
+                resp = await client.post(url or settings.SPRING_CALLBACK_URL, json=payload)
+            STAGE_SECONDS.labels("callback").observe(time.perf_counter() - started)
+            if 200 <= resp.status_code < 300:
+                await asyncio.to_thread(self.mark_delivered, [item_id])
+                inflight.discard(item_id)
+                print(f"✅ Callback successful for job {job_id}")
+                return
+            error = f"HTTP {resp.status_code}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        status = await asyncio.to_thread(self.mark_failed, item_id, attempts + 1, error)
+        inflight.discard(item_id)
+        print(f"⚠️  Callback failed for job {job_id} ({error}); {'dead-lettered' if status == DEAD else 'will retry'}")
+
+    async def _send_batch(self, client, items, inflight: set):
+        try:
+            async with self._slots:
+                started = time.perf_counter()
+                resp = await client.post(settings.SPRING_CALLBACK_BATCH_URL,
+                                         json={"callbacks": [payload for _, _, payload, _, _ in items]})
+            STAGE_SECONDS.labels("callback").observe(time.perf_counter() - started)
+            if 200 <= resp.status_code < 300:
+                await asyncio.to_thread(self.mark_delivered, [item[0] for item in items])
+                inflight.difference_update(item[0] for item in items)
+                print(f"✅ Batch callback successful for {len(items)} jobs")
+                return
+            error = f"HTTP {resp.status_code}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        for item_id, job_id, _, attempts, _ in items:
+            await asyncio.to_thread(self.mark_failed, item_id, attempts + 1, error)
+            inflight.discard(item_id)
+        print(f"⚠️  Batch callback failed for {len(items)} jobs ({error})")
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_outbox() -> CallbackOutbox:
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = CallbackOutbox(Path(settings.CALLBACK_OUTBOX_PATH))
+    return _outbox
+
+
+def enqueue_callback(job_id: str, payload: dict, url: Optional[str] = None):
+    """
+    콜백 URL 이 설정된 경우에만 아웃박스에 적재 (학습 워커는 Spring 응답을 기다리지 않음)
+    url 을 주면 SPRING_CALLBACK_URL 대신 그 주소로 전송
+    """
+    if settings.SPRING_CALLBACK_URL:
+        get_outbox().enqueue(job_id, payload, url=url)
@@ -0,0 +1,245 @@
+"""
+학습 Job 취소 + 단계별/전체 제한 시간
+
+- POST /jobs/{job_id}/cancel 이나 제한 시간 초과 시 Job 을 바로 CANCELLED / TIMEOUT 으로 기록하고
+  (콜백 포함) 스케줄러 워커 슬롯을 반납 -> 대기 중인 다른 Job 이 바로 시작
+- 실행 중인 작업은 협조적으로 멈춤: 단계 시작, 다운로드 청크, 임베딩 윈도우 배치, 문장 합성, 업로드 청크마다
+  checkpoint 가 JobAborted 를 던짐
+- 모델 추론 한 번처럼 중간에 끊을 수 없는 호출은 그 스레드가 호출이 끝날 때까지 계속 돌지만,
+  슬롯은 이미 반납했으므로 새 Job 이 기다리지 않음 (그 스레드는 다음 checkpoint 에서 빠져나와 종료)
+- 감시 스레드가 주기적으로 제한 시간을 확인 -> checkpoint 에 닿지 못하고 멈춘 단계도 제때 종료 처리
+- 다른 워커 프로세스가 실행 중인 Job 은 Job 저장소의 cancelRequested 플래그로 전달 (JOB_CANCEL_POLL_SECONDS 마다 확인)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from .core.config import settings
+
+CANCELLED = "CANCELLED"
+TIMEOUT = "TIMEOUT"
+
+
+class JobAborted(Exception):
+    """취소 / 제한 시간 초과로 중단된 Job (종료 기록은 이미 끝남)"""
+
+    def __init__(self, status: str, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+def stage_timeouts() -> Dict[str, float]:
+    """단계별 제한 시간 (초, 0 이면 제한 없음). 스케줄러 stage 슬롯 대기 시간은 포함하지 않음"""
+    return {
+        "download": settings.STAGE_TIMEOUT_DOWNLOAD,
+        "preprocess": settings.STAGE_TIMEOUT_PREPROCESS,
+        "embed": settings.STAGE_TIMEOUT_EMBED,
+        "latents": settings.STAGE_TIMEOUT_LATENTS,
+        "preview": settings.STAGE_TIMEOUT_PREVIEW,
+        "upload": settings.STAGE_TIMEOUT_UPLOAD,
+    }
+
+
+class JobControl:
+    """
+    실행 중인 Job 하나의 취소 상태 + 제한 시간
+
+    종료 기록은 finish()(정상 완료/실패) 와 abort()(취소/제한 시간) 중 먼저 온 쪽 하나만 함
+    """
+
+    def __init__(self, job_id: str, on_abort: Callable[[JobAborted], None], timeout: float = 0.0,
+                 remote_check: Optional[Callable[[], bool]] = None, poll_interval: float = 2.0):
+        self.job_id = job_id
+        self.started = time.time()
+        self.timeout = timeout
+        self.deadline = self.started + timeout if timeout else None
+        self.stage_name: Optional[str] = None
+        self.stage_timeout = 0.0
+        self.stage_deadline: Optional[float] = None
+        self.aborted: Optional[JobAborted] = None
+        self._on_abort = on_abort
+        self._remote_check = remote_check
+        self._poll_interval = poll_interval
+        self._polled_at = 0.0
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def enter_stage(self, name: str, timeout: float):
+        self.stage_name = name
+        self.stage_timeout = timeout
+        self.stage_deadline = time.time() + timeout if timeout else None
+
+    def exit_stage(self):
+        self.stage_name, self.stage_deadline = None, None
+
+    def finish(self) -> bool:
+        """정상 완료/실패를 기록해도 되는지 (이미 취소/제한 시간으로 종료됐으면 False)"""
+        with self._lock:
+            if self._finished:
+                return False
+            self._finished = True
+            return True
+
+    def abort(self, status: str, reason: str) -> bool:
+        """Job 을 status(CANCELLED | TIMEOUT) 로 종료. 이미 종료됐으면 False"""
+        with self._lock:
+            if self._finished:
+                return False
+            self._finished = True
+            self.aborted = JobAborted(status, reason)
+        print(f"🛑 Job {self.job_id} {status.lower()}: {reason}")
+        try:
+            self._on_abort(self.aborted)
+        except Exception as e:
+            print(f"⚠️  Failed to record {status.lower()} for job {self.job_id}: {e}")
+        return True
+
+    def poll(self) -> Optional[JobAborted]:
+        """제한 시간 / 다른 프로세스의 취소 요청을 확인하고, 해당하면 종료 처리. 종료됐으면 그 사유"""
+        if self.aborted is None and not self._finished:
+            now = time.time()
+            if self.deadline is not None and now > self.deadline:
+                self.abort(TIMEOUT, f"job exceeded time limit ({self.timeout:g}s)")
+            elif self.stage_deadline is not None and now > self.stage_deadline:
+                self.abort(TIMEOUT, f"stage '{self.stage_name}' exceeded time limit ({self.stage_timeout:g}s)")
+            elif self._remote_check is not None and now - self._polled_at >= self._poll_interval:
+                self._polled_at = now
+                try:
+                    requested = self._remote_check()
+                except Exception as e:
+                    print(f"⚠️  Cancel check failed for job {self.job_id}: {e}")
+                    requested = False
+                if requested:
+                    self.abort(CANCELLED, "cancelled by request")
+        return self.aborted
+
+    def check(self):
+        """checkpoint: 종료됐으면 JobAborted"""
+        aborted = self.poll()
+        if aborted is not None:
+            raise aborted
+
+
+class JobControls:
+    """프로세스 안에서 실행 중인 Job 들의 JobControl + 제한 시간 감시 스레드"""
+
+    # 감시 스레드 확인 주기 (checkpoint 에 닿지 못하는 단계의 제한 시간 정밀도)
+    watch_interval = 1.0
+
+    def __init__(self, job_timeout: float, poll_interval: float):
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self._controls: Dict[str, JobControl] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def register(self, job_id: str, on_abort: Callable[[JobAborted], None],
+                 remote_check: Optional[Callable[[], bool]] = None) -> JobControl:
+        """Job 실행 시작. 전체 제한 시간은 지금부터 (대기열 시간 제외)"""
+        control = JobControl(job_id, on_abort, self.job_timeout, remote_check, self.poll_interval)
+        with self._lock:
+            self._controls[job_id] = control
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch_loop, name="job-deadlines", daemon=True)
+                self._watcher.start()
+        return control
+
+    def unregister(self, job_id: str):
+        with self._lock:
+            self._controls.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[JobControl]:
+        with self._lock:
+            return self._controls.get(job_id)
+
+    @contextmanager
+    def track(self, job_id: str, on_abort: Callable[[JobAborted], None],
+              remote_check: Optional[Callable[[], bool]] = None):
+        """register + 현재 스레드에 연결 (블록이 끝나면 해제)"""
+        control = self.register(job_id, on_abort, remote_check)
+        try:
+            with bind(control):
+                yield control
+        finally:
+            self.unregister(job_id)
+
+    def _watch_loop(self):
+        while True:
+            time.sleep(self.watch_interval)
+            with self._lock:
+                controls = list(self._controls.values())
+            for control in controls:
+                control.poll()
+
+
+# --- 현재 스레드의 Job (checkpoint 가 인자 없이 찾을 수 있게) ---
+
+_local = threading.local()
+
+
+def current() -> Optional[JobControl]:
+    return getattr(_local, "control", None)
+
+
+@contextmanager
+def bind(control: Optional[JobControl]):
+    previous = current()
+    _local.control = control
+    try:
+        yield control
+    finally:
+        _local.control = previous
+
+
+def checkpoint(control: Optional[JobControl] = None):
+    """취소 / 제한 시간 확인 지점. Job 밖(합성 API 등)에서는 아무것도 하지 않음"""
+    control = control or current()
+    if control is not None:
+        control.check()
+
+
+@contextmanager
+def stage(name: str):
+    """단계 제한 시간 적용 (StageTimer.stage 가 슬롯을 얻은 뒤 호출). 시작할 때 checkpoint"""
+    control = current()
+    if control is None:
+        yield
+        return
+    control.check()
+    control.enter_stage(name, stage_timeouts().get(name, 0.0))
+    try:
+        yield
+    finally:
+        control.exit_stage()
+
+
+def guard(chunks: Iterable, control: Optional[JobControl] = None) -> Iterator:
+    """
+    청크마다 checkpoint. Job 은 호출한 스레드에서 찾으므로 다른 스레드(ffmpeg 입력 스레드 등)가
+    소비해도 됨
+    """
+    control = control or current()
+    if control is None:
+        return iter(chunks)
+    return _guarded(chunks, control)
+
+
+def _guarded(chunks: Iterable, control: JobControl) -> Iterator:
+    for chunk in chunks:
+        control.check()
+        yield chunk
+
+
+_controls = None
+_controls_lock = threading.Lock()
+
+def get_job_controls() -> JobControls:
+    """프로세스 단위 JobControls 싱글톤"""
+    global _controls
+    if _controls is None:
+        with _controls_lock:
+            if _controls is None:
+                _controls = JobControls(settings.JOB_TIMEOUT_SECONDS, settings.JOB_CANCEL_POLL_SECONDS)
+    return _controls
@@ -29,10 +29,143 @@ class Settings(BaseSettings):
     
     # 콜백 설정
     CALLBACK_TIMEOUT: int = Field(default=10)
+    SPRING_CALLBACK_BATCH_URL: str = Field(default="")          # 설정 시 여러 완료 건을 한 요청으로 묶어 전송
+    CALLBACK_OUTBOX_PATH: str = Field(default="/data/callbacks.db")  # 콜백 아웃박스 (재시작해도 유지)
+    CALLBACK_MAX_ATTEMPTS: int = Field(default=8)                # 초과 시 DEAD (관리 API 로 재전송)
+    CALLBACK_BACKOFF_BASE_SECONDS: float = Field(default=1.0)    # 지수 백오프 시작 값 (full jitter)
+    CALLBACK_BACKOFF_MAX_SECONDS: float = Field(default=300.0)   # 백오프 상한
+    CALLBACK_CONCURRENCY: int = Field(default=8)                 # 동시 전송 / keep-alive 커넥션 수
+    CALLBACK_BATCH_SIZE: int = Field(default=50)                 # 한 번에 꺼내는 최대 항목 수
+    CALLBACK_POLL_SECONDS: float = Field(default=5.0)            # 새 항목이 없을 때 재확인 주기
+    SPRING_BATCH_CALLBACK_URL: str = Field(default="")          # /train/batch 집계 콜백 (aggregateCallback)
     
     # 프리뷰 설정
     PREVIEW_TEXT_KO: str = Field(default="안녕하세요, 오디온입니다. 이 목소리는 데모로 생성된 프리뷰입니다.")
     PREVIEW_LANG: str = Field(default="ko")
 
+    # 학습 스케줄러 설정
+    TRAIN_WORKERS: int = Field(default=4)          # 동시에 실행되는 학습 작업 수
+    TRAIN_QUEUE_MAX: int = Field(default=100)      # 대기열 최대 길이 (초과 시 429)
+    STAGE_CONCURRENCY_DOWNLOAD: int = Field(default=4)
+    STAGE_CONCURRENCY_PREPROCESS: int = Field(default=2)
+    STAGE_CONCURRENCY_INFERENCE: int = Field(default=1)  # ECAPA/XTTS 추론은 좁게
+    STAGE_CONCURRENCY_UPLOAD: int = Field(default=4)
+    STAGE_CONCURRENCY_SYNTH: int = Field(default=1)  # /synthesize 동시 스트리밍 수
+
+    # 배치 학습 (/train/batch)
+    BATCH_MAX_ITEMS: int = Field(default=1000)            # 배치 하나의 최대 항목 수
+    BATCH_PIPELINE_WORKERS: int = Field(default=32)       # 동시에 진행 중인 항목 수 (메모리의 디코딩 오디오 상한)
+    BATCH_DOWNLOAD_CONCURRENCY: int = Field(default=16)   # 배치 내부 동시 다운로드 수
+
+    # 학습 Job 제한 시간 (초, 0 이면 제한 없음). 넘기면 TIMEOUT 으로 종료하고 워커 슬롯 반납
+    JOB_TIMEOUT_SECONDS: float = Field(default=1800.0)    # Job 전체 (대기열 시간 제외)
+    STAGE_TIMEOUT_DOWNLOAD: float = Field(default=300.0)  # 단계별 (stage 슬롯 대기 시간 제외)
+    STAGE_TIMEOUT_PREPROCESS: float = Field(default=120.0)
+    STAGE_TIMEOUT_EMBED: float = Field(default=600.0)
+    STAGE_TIMEOUT_LATENTS: float = Field(default=300.0)
+    STAGE_TIMEOUT_PREVIEW: float = Field(default=300.0)
+    STAGE_TIMEOUT_UPLOAD: float = Field(default=300.0)
+    JOB_CANCEL_POLL_SECONDS: float = Field(default=2.0)   # 다른 워커 프로세스에 들어온 취소 요청 확인 주기
+    TRAIN_MAX_ABANDONED_WORKERS: int = Field(default=4)   # 슬롯을 반납하고 아직 끝나지 않은 스레드 상한 (넘으면 반납하지 않고 끝날 때까지 대기)
+
+    # Job 저장소 설정
+    JOB_STORE_BACKEND: str = Field(default="sqlite")  # "sqlite" | "memory"
+    JOB_STORE_PATH: str = Field(default="/data/jobs.db")
+    JOB_STORE_FLUSH_INTERVAL: float = Field(default=0.5)  # 진행률 일괄 기록 주기(초)
+    JOB_TTL_SECONDS: float = Field(default=7 * 24 * 3600)  # 종료된 Job 보관 기간
+    JOB_OWNER_STALE_SECONDS: float = Field(default=90.0)  # heartbeat 가 이보다 오래 끊기면 중단된 Job 으로 간주 (최소: 락 대기 상한 30초의 2배)
+
+    # Job 진행 이벤트 스트림 (SSE)
+    JOB_EVENTS_BUFFER: int = Field(default=64)              # 구독자별 버퍼 (가득 차면 오래된 진행률 이벤트부터 버림)
+    JOB_EVENTS_MAX_SUBSCRIBERS: int = Field(default=1000)   # 프로세스당 동시 구독자 상한 (초과 시 503)
+    JOB_EVENTS_HEARTBEAT_SECONDS: float = Field(default=15.0)  # keep-alive 주기 (이때 저장소 상태도 재확인)
+
+    # ECAPA 임베딩 마이크로 배칭
+    EMBED_MAX_BATCH: int = Field(default=16)
+    EMBED_MAX_WAIT_MS: float = Field(default=20.0)
+
+    # 긴 녹음의 윈도우 단위 임베딩 (VAD 로 말소리만 잘라 배치 추출 + 수렴 시 조기 종료)
+    EMBED_SEGMENT_MODE: str = Field(default="auto")          # off | auto (긴 입력만) | always
+    EMBED_SEGMENT_MIN_SECONDS: float = Field(default=30.0)   # auto 일 때 이 길이 이상이면 윈도우 모드
+    EMBED_WINDOW_SECONDS: float = Field(default=3.0)
+    EMBED_WINDOW_BATCH: int = Field(default=8)               # 한 번에 임베딩하는 윈도우 수
+    EMBED_MIN_WINDOWS: int = Field(default=8)                # 조기 종료 전 최소 윈도우 수
+    EMBED_CONVERGENCE_EPS: float = Field(default=1e-3)       # 누적 평균의 (1 - cosine) 변화 임계값
+    EMBED_CONVERGENCE_PATIENCE: int = Field(default=2)       # 연속으로 임계값 미만인 배치 수
+    EMBED_MAX_AUDIO_SECONDS: float = Field(default=120.0)    # 임베딩에 쓰는 오디오 길이 상한
+
+    # XTTS 조건 잠재벡터 LRU 캐시 크기(MB)
+    XTTS_LATENT_CACHE_MB: int = Field(default=256)
+
+    # /synthesize 스트리밍: 청크당 GPT 토큰 수 (작을수록 첫 오디오가 빠름)
+    SYNTH_STREAM_CHUNK_SIZE: int = Field(default=20)
+    # 로컬 모델 캐시를 S3 의 모델과 비교하는 주기(초). 다른 워커가 다시 학습한 모델을 이 시간 안에 반영
+    SYNTH_MODEL_REVALIDATE_SECONDS: float = Field(default=30.0)
+
+    # 다운로드/전처리 결과를 작업 공간에 남기고 Job 이 끝나면 {DATA_DIR}/debug 로 옮길지 (디버깅용)
+    INGEST_PERSIST_DEBUG: bool = Field(default=False)
+
+    # 작업 공간 / 로컬 디스크 관리
+    DATA_DIR: str = Field(default="/data")                    # work/ (Job 작업 공간), models/ (로컬 모델 캐시)
+    WORKSPACE_QUOTA_MB: int = Field(default=10240)            # 로컬 모델 캐시 + 작업 공간 상한 (0 = 무제한, 초과 시 LRU 축출)
+    WORKSPACE_TMPFS: bool = Field(default=False)              # 작업 공간을 tmpfs 에 만들지
+    WORKSPACE_TMPFS_DIR: str = Field(default="/dev/shm/audion-work")
+    WORKSPACE_TMPFS_MAX_MB: int = Field(default=256)          # tmpfs 사용 상한 (넘을 것 같으면 그 Job 은 디스크)
+    WORKSPACE_JOB_RESERVE_MB: int = Field(default=32)         # Job 하나가 tmpfs 에 쓸 것으로 보는 크기
+
+    # 다운로드 설정 (공용 커넥션 풀, 타임아웃, 재시도/이어받기, 병렬 구간 다운로드)
+    HTTP_POOL_SIZE: int = Field(default=16)
+    DOWNLOAD_CONNECT_TIMEOUT: float = Field(default=5.0)
+    DOWNLOAD_READ_TIMEOUT: float = Field(default=30.0)
+    DOWNLOAD_MAX_RETRIES: int = Field(default=3)
+    DOWNLOAD_BACKOFF_SECONDS: float = Field(default=0.5)
+    DOWNLOAD_CONCURRENCY: int = Field(default=4)  # Job 하나에 URL 이 여러 개일 때
+    DOWNLOAD_PARALLEL_THRESHOLD: int = Field(default=32 * 1024 * 1024)  # 이 크기 이상이면 구간 병렬
+    DOWNLOAD_PARALLEL_PARTS: int = Field(default=4)
+
+    # 동일 오디오 재학습 방지용 결과 캐시
+    RESULT_CACHE_ENABLED: bool = Field(default=True)
+    RESULT_CACHE_PATH: str = Field(default="/data/result_cache.db")
+    RESULT_CACHE_MAX_ENTRIES: int = Field(default=10000)
+
+    # 추론 실행 위치: "inprocess" (uvicorn 프로세스 안) | "process" (별도 모델 서버 프로세스 풀)
+    INFERENCE_MODE: str = Field(default="inprocess")
+    INFERENCE_WORKERS: int = Field(default=2)
+    INFERENCE_THREADS_PER_WORKER: int = Field(default=0)  # 0 이면 CPU 코어 수 / 워커 수
+    INFERENCE_TIMEOUT: float = Field(default=600.0)
+
+    # CPU 추론 가속 (opt-in). 정확도 게이트를 통과하지 못하면 fp32 로 되돌림
+    INFERENCE_ACCEL: str = Field(default="off")              # off | int8 (Linear/LSTM dynamic quantization)
+    INFERENCE_COMPILE: str = Field(default="off")            # off | compile | torchscript (ECAPA 만)
+    ACCEL_MIN_COSINE: float = Field(default=0.99)            # fp32 대비 임베딩/잠재벡터 cosine 하한
+    ACCEL_MIN_PREVIEW_SIMILARITY: float = Field(default=0.85)  # fp32 대비 프리뷰 화자 유사도 하한
+
+    # 기동 시 모델 사전 로드 + 워밍업, 준비 전에는 학습 요청을 받지 않음(503)
+    WARMUP_ON_STARTUP: bool = Field(default=True)
+    WARMUP_SYNTH_TEXT: str = Field(default="안녕하세요.")  # 빈 문자열이면 합성 워밍업 생략
+    READINESS_GATES_ADMISSION: bool = Field(default=True)
+    WARMUP_RETRY_BASE_SECONDS: float = Field(default=5.0)   # 로드/워밍업 실패 시 재시도 대기 (지수 백오프 시작 값)
+    WARMUP_RETRY_MAX_SECONDS: float = Field(default=120.0)  # 재시도 대기 상한 (준비될 때까지 계속 재시도)
+
+    # S3 업로드 (multipart/동시 전송, 변경 없는 파일은 건너뜀)
+    S3_ENDPOINT_URL: str = Field(default="")  # moto 등 로컬 S3 대체 서버 주소
+    S3_MAX_POOL_CONNECTIONS: int = Field(default=32)
+    S3_MULTIPART_THRESHOLD_MB: int = Field(default=8)
+    S3_MULTIPART_CHUNK_MB: int = Field(default=8)
+    S3_MAX_CONCURRENCY: int = Field(default=8)
+    S3_SKIP_UNCHANGED: bool = Field(default=True)
+
+    # 목소리 모델 파일(.avm) 텐서 저장 정밀도: float16 | int8 (행별 scale) | float32
+    MODEL_ARTIFACT_QUANT: str = Field(default="float16")
+
+    # 목소리 임베딩 유사도 인덱스 (중복/사칭 탐지)
+    VOICE_INDEX_DIR: str = Field(default="/data/voice_index")
+    VOICE_INDEX_DTYPE: str = Field(default="float32")              # float32 | float16 (새 인덱스 생성 시에만 적용)
+    VOICE_INDEX_IVF_THRESHOLD: int = Field(default=1_000_000)     # 이 행 수부터 IVF 로 후보를 좁혀 검색
+    VOICE_INDEX_NPROBE: int = Field(default=16)                   # IVF 검색 시 스캔할 리스트 수
+    VOICE_DUPLICATE_CHECK: bool = Field(default=False)            # 학습 중 기존 목소리와 유사도 검사
+    VOICE_DUPLICATE_THRESHOLD: float = Field(default=0.7)         # cosine 유사도가 이 값 이상이면 같은 목소리로 판단
+    VOICE_DUPLICATE_ACTION: str = Field(default="flag")           # flag: Job 에 기록만 | reject: 학습 실패 처리
+
 
 settings = Settings()
\ No newline at end of file
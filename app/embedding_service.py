@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+from .core.config import settings
+from . import model_server
+
+
+def encode_padded(encoder, signals: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    길이가 다른 신호들을 0 으로 패딩해 한 번에 인코딩
+    SpeechBrain 의 상대 길이(wav_lens)로 패딩 구간을 마스킹
+    """
+    import torch
+    max_len = max(len(s) for s in signals)
+    batch = np.zeros((len(signals), max_len), dtype=np.float32)
+    for i, s in enumerate(signals):
+        batch[i, :len(s)] = s
+    wav_lens = torch.tensor([len(s) / max_len for s in signals], dtype=torch.float32)
+
+    with torch.inference_mode():
+        out = encoder.encode_batch(torch.from_numpy(batch), wav_lens=wav_lens)  # [B, 1, D]
+    out = out.squeeze(1).cpu().numpy()
+    return [out[i] for i in range(len(signals))]
+
+
+class EmbeddingBatcher:
+    """
+    여러 Job 의 ECAPA 임베딩 요청을 모아 한 번의 forward 로 처리하는 마이크로 배처
+
+    - 첫 요청이 들어온 뒤 max_wait_ms 동안(또는 max_batch 개가 찰 때까지) 요청을 모음
+    - forward_fn(신호 리스트) 한 번으로 배치 전체를 처리 (encode_padded 또는 모델 서버)
+    - 결과는 요청별 Future 로 돌려줌 (batch_size=1 결과와 신호별 cosine 0.999 이상, python -m bench.embed_parity 로 확인)
+    """
+
+    def __init__(self, forward_fn: Callable[[List[np.ndarray]], List[np.ndarray]],
+                 max_batch: int = 16, max_wait_ms: float = 20.0):
+        self.forward_fn = forward_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, signal: np.ndarray) -> Future:
+        fut: Future = Future()
+        self._queue.put((np.asarray(signal, dtype=np.float32), fut))
+        return fut
+
+    def embed(self, signal: np.ndarray) -> np.ndarray:
+        return self.submit(signal).result()
+
+    def embed_many(self, signals: List[np.ndarray]) -> List[np.ndarray]:
+        futures = [self.submit(s) for s in signals]
+        return [f.result() for f in futures]
+
+    def _collect(self) -> list:
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            try:
+                embeddings = self.forward_fn([sig for sig, _ in items])
+                for (_, fut), emb in zip(items, embeddings):
+                    fut.set_result(emb)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """프로세스 단위 임베딩 배처 싱글톤"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                if model_server.enabled():
+                    forward = model_server.get_model_pool().embed_batch
+                else:
+                    from .audio import get_encoder
+                    forward = lambda signals: encode_padded(get_encoder(), signals)
+                _batcher = EmbeddingBatcher(
+                    forward,
+                    max_batch=settings.EMBED_MAX_BATCH,
+                    max_wait_ms=settings.EMBED_MAX_WAIT_MS,
+                )
+    return _batcher
@@ -0,0 +1,164 @@
+"""
+Job 진행 이벤트 pub/sub (프로세스 내부)
+
+JobStore.update() 가 바뀐 필드를 publish 하면, /status/{job_id}/events 와 /jobs/events (SSE)
+구독자에게 바로 전달한다. 폴링 없이 진행률/상태 전이를 받을 수 있다.
+
+- 발행은 학습 워커 스레드, 구독은 이벤트 루프 (call_soon_threadsafe 로 깨움)
+- 구독자마다 버퍼 크기 제한. 가득 차면 오래된 진행률 이벤트부터 버리고(상태 전이는 최대한 유지)
+  버린 개수를 dropped 로 셈 -> 느린 클라이언트가 메모리를 쌓지 못함
+- 다른 uvicorn 워커 프로세스의 Job 이벤트는 오지 않음. SSE 스트림이 heartbeat 마다
+  공유 Job 저장소를 다시 읽어 상태 변화를 보충함
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+from .core.config import settings
+
+
+class TooManySubscribersError(Exception):
+    """구독자 수 상한 초과 (→ 503)"""
+
+
+class Subscription:
+    """구독자 하나의 이벤트 버퍼 (job_id 가 None 이면 모든 Job)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, job_id: Optional[str], transitions_only: bool,
+                 max_buffer: int):
+        self.loop = loop
+        self.job_id = job_id
+        self.transitions_only = transitions_only
+        self.max_buffer = max(1, max_buffer)
+        self.dropped = 0
+        self._reported = 0
+        self.closed = False
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: dict):
+        """발행 스레드에서 호출"""
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._drop_one()
+            self._buffer.append(event)
+        try:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            self.closed = True  # 이벤트 루프가 이미 닫힘
+
+    def _drop_one(self):
+        for i, old in enumerate(self._buffer):
+            if old["type"] == "progress":
+                del self._buffer[i]
+                break
+        else:
+            self._buffer.popleft()
+        self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """마지막 호출 이후 버려진 이벤트 수 (클라이언트에 lagged 로 알림)"""
+        with self._lock:
+            new, self._reported = self.dropped - self._reported, self.dropped
+        return new
+
+    async def get(self, timeout: float) -> List[dict]:
+        """쌓인 이벤트를 모두 꺼냄. timeout 동안 없으면 빈 목록 (heartbeat 용)"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            self._wakeup.clear()
+            events = list(self._buffer)
+            self._buffer.clear()
+        return events
+
+
+class JobEventBus:
+    def __init__(self, max_buffer: int, max_subscribers: int):
+        self.max_buffer = max_buffer
+        self.max_subscribers = max_subscribers
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._by_job: Dict[str, Set[Subscription]] = {}
+        self._all: Set[Subscription] = set()
+        self.published = 0
+        self._dropped_closed = 0  # 이미 끊긴 구독자가 버린 이벤트 수
+
+    def subscribe(self, job_id: Optional[str] = None, transitions_only: bool = False) -> Subscription:
+        """이벤트 루프 안에서 호출"""
+        sub = Subscription(asyncio.get_running_loop(), job_id, transitions_only, self.max_buffer)
+        with self._lock:
+            if self._count_locked() >= self.max_subscribers:
+                raise TooManySubscribersError(f"too many event subscribers ({self.max_subscribers})")
+            if job_id is None:
+                self._all.add(sub)
+            else:
+                self._by_job.setdefault(job_id, set()).add(sub)
+        return sub
+
+    def full(self) -> bool:
+        """구독자 수 상한에 도달했는지 (SSE 응답을 시작하기 전에 503 으로 거절하는 용도)"""
+        with self._lock:
+            return self._count_locked() >= self.max_subscribers
+
+    def unsubscribe(self, sub: Subscription):
+        sub.closed = True
+        with self._lock:
+            self._dropped_closed += sub.dropped
+            if sub.job_id is None:
+                self._all.discard(sub)
+            else:
+                subs = self._by_job.get(sub.job_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_job[sub.job_id]
+
+    def publish(self, job_id: str, fields: dict):
+        """Job 변경분 발행. 구독자가 없으면 바로 반환 (JobStore.update 경로의 비용 최소화)"""
+        if not self._all and job_id not in self._by_job:
+            return
+        with self._lock:
+            targets = list(self._all) + list(self._by_job.get(job_id, ()))
+        if not targets:
+            return
+        event = {
+            "id": next(self._seq),
+            "type": "status" if "status" in fields else "progress",
+            "jobId": job_id,
+            "at": time.time(),
+            **fields,
+        }
+        self.published += 1
+        for sub in targets:
+            if sub.closed or (sub.transitions_only and event["type"] != "status"):
+                continue
+            sub.push(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subs = list(self._all) + [s for group in self._by_job.values() for s in group]
+            dropped = self._dropped_closed + sum(s.dropped for s in subs)
+        return {"subscribers": len(subs), "published": self.published, "dropped": dropped}
+
+    def _count_locked(self) -> int:
+        return len(self._all) + sum(len(group) for group in self._by_job.values())
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_event_bus() -> JobEventBus:
+    """프로세스 단위 이벤트 버스 싱글톤"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = JobEventBus(settings.JOB_EVENTS_BUFFER, settings.JOB_EVENTS_MAX_SUBSCRIBERS)
+    return _bus
@@ -0,0 +1,227 @@
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .core.config import settings
+
+# 스트림 도중 끊겼을 때 이어받기를 시도할 예외들
+_RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+# 병렬 구간 하나를 메모리에 담아 둘 상한. 넘으면 임시 파일로 넘김 (구간 수 x 이 값이 메모리 상한)
+_PART_SPOOL_BYTES = 4 * 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    프로세스 공용 HTTP 세션 (커넥션 풀 재사용으로 S3 TCP+TLS 핸드셰이크 절약)
+    연결 실패/5xx 는 urllib3 Retry 가 백오프로 재시도
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=settings.DOWNLOAD_MAX_RETRIES,
+                    backoff_factor=settings.DOWNLOAD_BACKOFF_SECONDS,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "HEAD"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.HTTP_POOL_SIZE,
+                    pool_maxsize=settings.HTTP_POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _timeout() -> Tuple[float, float]:
+    return (settings.DOWNLOAD_CONNECT_TIMEOUT, settings.DOWNLOAD_READ_TIMEOUT)
+
+
+class DownloadStats:
+    """다운로드 1건의 전송량/속도 (Job 레코드에 기록)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.bytes = 0
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.resumes = 0
+        self.parts = 1
+        self._lock = threading.Lock()
+
+    def add(self, n: int):
+        with self._lock:
+            self.bytes += n
+
+    def as_dict(self) -> dict:
+        elapsed = (self.finished or time.time()) - self.started
+        return {
+            "url": self.url.split('?')[0],
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "bytesPerSec": int(self.bytes / elapsed) if elapsed > 0 else None,
+            "resumes": self.resumes,
+            "parts": self.parts,
+        }
+
+
+def _probe(url: str) -> Tuple[Optional[int], bool]:
+    """
+    첫 1바이트 Range GET 으로 크기와 Range 지원 여부 확인. 실패하면 (None, False)
+    (presigned S3 URL 은 GET 으로 서명돼 HEAD 가 403 이므로 HEAD 를 쓰지 않음)
+    - 206 + Content-Range "bytes 0-0/<전체>" -> (전체 크기, True)
+    - 200 (Range 무시) -> (Content-Length, False). 본문은 읽지 않고 닫음
+    """
+    try:
+        with get_session().get(url, stream=True, headers={"Range": "bytes=0-0"}, timeout=_timeout()) as resp:
+            if resp.status_code == 206:
+                total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+                return (int(total), True) if total.isdigit() else (None, False)
+            if resp.status_code >= 400:
+                return None, False
+            length = resp.headers.get("Content-Length")
+            return (int(length) if length else None), False
+    except requests.RequestException:
+        return None, False
+
+
+class _DownloadAborted(Exception):
+    """소비 측이 다운로드를 그만둬 병렬 구간 수신을 멈춤"""
+
+
+def _stream_range(url: str, start: int, end: Optional[int], stats: DownloadStats,
+                  chunk_size: int, stop: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    [start, end] 구간을 스트리밍. 중간에 끊기면 받은 위치부터 Range 로 이어받음
+    end 가 None 이면 끝까지 (start 가 0 이면 Range 헤더 없이 시작)
+    stop 이 설정되면 청크 사이에서 _DownloadAborted
+    """
+    offset = start
+    attempt = 0
+    while True:
+        headers = {}
+        if offset > 0 or end is not None:
+            headers["Range"] = f"bytes={offset}-{'' if end is None else end}"
+        try:
+            with get_session().get(url, stream=True, headers=headers, timeout=_timeout()) as resp:
+                resp.raise_for_status()
+                if "Range" in headers and resp.status_code != 206:
+                    if offset > start:
+                        raise RuntimeError("server does not support range requests; cannot resume")
+                    raise RuntimeError("server ignored range request")
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    if stop is not None and stop.is_set():
+                        raise _DownloadAborted(f"download of bytes {start}-{end} stopped at {offset}")
+                    if chunk:
+                        offset += len(chunk)
+                        stats.add(len(chunk))
+                        yield chunk
+            return
+        except _RESUMABLE_ERRORS as e:
+            attempt += 1
+            if attempt > settings.DOWNLOAD_MAX_RETRIES:
+                raise
+            stats.resumes += 1
+            delay = settings.DOWNLOAD_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            print(f"⚠️  Download interrupted at byte {offset} ({e}); resuming in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _fetch_part(url: str, start: int, end: int, stats: DownloadStats, chunk_size: int,
+                stop: threading.Event) -> tempfile.SpooledTemporaryFile:
+    """구간 하나를 스풀(작으면 메모리, 크면 임시 파일)에 받아 처음으로 되감아 반환"""
+    spool = tempfile.SpooledTemporaryFile(max_size=_PART_SPOOL_BYTES)
+    try:
+        for chunk in _stream_range(url, start, end, stats, chunk_size, stop):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
+
+
+def _discard_part(fut: Future):
+    """중단된 다운로드의 구간 스풀 정리 (이미 끝났으면 바로, 아직 받는 중이면 끝날 때)"""
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
+
+
+def iter_download(url: str, stats: Optional[DownloadStats] = None,
+                  chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    URL 본문을 청크로 yield (타임아웃 + 재시도 + 이어받기)
+    크기가 DOWNLOAD_PARALLEL_THRESHOLD 이상이고 Range 를 지원하면
+    여러 구간을 병렬로 받아 순서대로 yield
+    - 구간은 스풀에 받아 두므로 파일 전체가 메모리에 올라가지 않음
+    - 소비 측이 중간에 그만두면(close/예외) 남은 구간을 기다리지 않고 멈춤
+    """
+    stats = stats or DownloadStats(url)
+    length, ranges = _probe(url)
+    parts = settings.DOWNLOAD_PARALLEL_PARTS
+    try:
+        if ranges and length and length >= settings.DOWNLOAD_PARALLEL_THRESHOLD and parts > 1:
+            part_size = -(-length // parts)
+            bounds = [(s, min(s + part_size, length) - 1) for s in range(0, length, part_size)]
+            stats.parts = len(bounds)
+            stop = threading.Event()
+            pool = ThreadPoolExecutor(max_workers=len(bounds), thread_name_prefix="download-part")
+            futures = [pool.submit(_fetch_part, url, s, e, stats, chunk_size, stop) for s, e in bounds]
+            try:
+                for fut in futures:
+                    with fut.result() as spool:
+                        while True:
+                            chunk = spool.read(chunk_size)
+                            if not chunk:
+                                break
+                            yield chunk
+            finally:
+                stop.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                for fut in futures:
+                    fut.add_done_callback(_discard_part)
+        else:
+            yield from _stream_range(url, 0, None, stats, chunk_size)
+    finally:
+        stats.finished = time.time()
+
+
+def map_concurrent(fn, items: List, max_workers: Optional[int] = None) -> List:
+    """items 각각에 fn 을 병렬 적용. 결과는 입력 순서, 예외는 (None, exc) 로 반환"""
+    if len(items) <= 1:
+        results = []
+        for item in items:
+            try:
+                results.append((fn(item), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+    workers = min(len(items), max_workers or settings.DOWNLOAD_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, item) for item in items]
+        results = []
+        for fut in futures:
+            try:
+                results.append((fut.result(), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
@@ -0,0 +1,205 @@
+import hashlib
+import io
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from . import cancellation
+from .http_client import DownloadStats, iter_download, map_concurrent
+
+TARGET_SR = 16000
+_BLOCK_BYTES = 64 * 1024  # ffmpeg stdout 에서 한 번에 읽는 크기 (float32 16k 기준 약 1초)
+
+
+class IngestedAudio(NamedTuple):
+    name: str            # 원본 파일명 (URL 마지막 경로)
+    audio: np.ndarray    # float32, 16 kHz mono
+    num_bytes: int       # 다운로드한 원본 바이트 수
+    sha256: str          # 원본 바이트 해시 (학습 결과 캐시 키)
+    download: dict       # 전송 통계 (bytes, seconds, bytesPerSec, ...)
+
+
+class DecodeError(Exception):
+    """ffmpeg 파이프 디코딩 실패 (다운로드 오류와 구분: 이것만 버퍼 디코딩으로 재시도)"""
+
+
+class _Received:
+    """
+    받은 원본 바이트의 크기 + sha256 을 스트리밍 중에 누적 (청크를 쌓아 두지 않음)
+    persist_dir 가 있으면 디버깅용으로 바로 파일에 씀
+    """
+
+    def __init__(self, persist_dir: Optional[Path], name: str):
+        self.num_bytes = 0
+        self.digest = hashlib.sha256()
+        self._file = None
+        if persist_dir is not None:
+            persist_dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(persist_dir / name, "wb")
+
+    def add(self, chunk: bytes):
+        self.num_bytes += len(chunk)
+        self.digest.update(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _filename(url: str) -> str:
+    return url.split('/')[-1].split('?')[0] or "audio.wav"
+
+
+def _ffmpeg_cmd(src: str) -> List[str]:
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if src != "pipe:0":
+        cmd.append("-nostdin")
+    return cmd + ["-i", src, "-f", "f32le", "-ac", "1", "-ar", str(TARGET_SR), "pipe:1"]
+
+
+def _read_pcm(proc: subprocess.Popen) -> np.ndarray:
+    """ffmpeg stdout 의 float32 PCM 을 블록 단위로 읽어 하나의 버퍼로 (추가 복사 없음)"""
+    buf = bytearray()
+    while True:
+        block = proc.stdout.read(_BLOCK_BYTES)
+        if not block:
+            break
+        buf += block
+    usable = len(buf) - len(buf) % 4
+    return np.frombuffer(buf, dtype=np.float32, count=usable // 4)
+
+
+def decode_stream(chunks: Iterable[bytes], on_chunk: Callable[[bytes], None]) -> np.ndarray:
+    """
+    청크로 들어오는 인코딩된 오디오를 ffmpeg 파이프로 디코딩 + 16k mono 리샘플
+    다운로드와 디코딩이 동시에 진행됨. 받은 원본 청크는 on_chunk 로 넘기고 보관하지 않음
+    """
+    proc = subprocess.Popen(_ffmpeg_cmd("pipe:0"), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    feed_error: list = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                on_chunk(chunk)
+                proc.stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg 가 먼저 종료됨 -> 나머지는 크기/해시만 누적 (정상 종료였다면 해시가 본문 전체여야 함)
+            try:
+                for chunk in chunks:
+                    on_chunk(chunk)
+            except Exception as e:
+                feed_error.append(e)
+        except Exception as e:
+            feed_error.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except Exception:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    audio = _read_pcm(proc)
+    feeder.join()
+    stderr = proc.stderr.read().decode(errors="ignore")
+    proc.wait()
+
+    if feed_error:
+        raise feed_error[0]  # 다운로드 실패는 그대로 (잘린 본문으로 재시도하지 않음)
+    if proc.returncode != 0 or audio.size == 0:
+        raise DecodeError(f"ffmpeg pipe decode failed: {stderr.strip()[:200]}")
+    return audio
+
+
+def _download_buffered(url: str, name: str, persist_dir: Optional[Path],
+                       control: Optional[cancellation.JobControl]) -> Tuple[np.ndarray, _Received, DownloadStats]:
+    """전체를 메모리에 받은 뒤 디코딩 (ffmpeg 가 없거나 파이프로 디코딩할 수 없는 포맷일 때만)"""
+    stats = DownloadStats(url)
+    received = _Received(persist_dir, name)
+    data = bytearray()
+    try:
+        for chunk in cancellation.guard(iter_download(url, stats, chunk_size=_BLOCK_BYTES), control):
+            received.add(chunk)
+            data += chunk
+    finally:
+        received.close()
+    return _decode_buffered(data, Path(name).suffix), received, stats
+
+
+def _decode_buffered(data: bytes, suffix: str) -> np.ndarray:
+    """파이프 디코딩이 불가능한 경우 (예: moov atom 이 끝에 있는 m4a)"""
+    if shutil.which("ffmpeg"):
+        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+            tmp.write(data)
+            tmp.flush()
+            proc = subprocess.Popen(_ffmpeg_cmd(tmp.name), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            audio = _read_pcm(proc)
+            proc.wait()
+            if proc.returncode == 0 and audio.size:
+                return audio
+    # ffmpeg 가 없으면 libsndfile 로 메모리에서 디코딩
+    audio, sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if sr != TARGET_SR:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=TARGET_SR).astype(np.float32)
+    return audio
+
+
+def ingest_url(url: str, persist_dir: Optional[Path] = None,
+               control: Optional[cancellation.JobControl] = None) -> IngestedAudio:
+    """
+    URL -> (스트리밍 디코딩) -> float32 16k mono 버퍼
+    persist_dir 가 주어지면 디버깅용으로 원본 바이트를 디스크에 남김
+    Job 안이면 (control 또는 현재 스레드의 Job) 청크마다 취소/제한 시간 확인
+    """
+    name = _filename(url)
+    if not shutil.which("ffmpeg"):
+        audio, received, stats = _download_buffered(url, name, persist_dir, control)
+    else:
+        # 크기/해시는 받으면서 누적하고 원본 청크는 ffmpeg 에 넘긴 뒤 버림
+        stats = DownloadStats(url)
+        received = _Received(persist_dir, name)
+        chunks = cancellation.guard(iter_download(url, stats, chunk_size=_BLOCK_BYTES), control)
+        try:
+            audio = decode_stream(chunks, received.add)
+        except DecodeError as e:
+            # 드문 경우라 미리 버퍼링해 두지 않고 다시 받음
+            print(f"⚠️  Streaming decode failed for {name}, re-downloading to decode buffered: {e}")
+            received.close()
+            audio, received, stats = _download_buffered(url, name, persist_dir, control)
+        finally:
+            received.close()
+
+    download = stats.as_dict()
+    print(f"✅ Ingested: {name} ({received.num_bytes} bytes @ {download['bytesPerSec']} B/s "
+          f"-> {len(audio) / TARGET_SR:.1f}s @16k)")
+    return IngestedAudio(name=name, audio=audio, num_bytes=received.num_bytes, sha256=received.digest.hexdigest(),
+                         download=download)
+
+
+def ingest_urls(urls: List[str], persist_dir: Optional[Path] = None) -> List[IngestedAudio]:
+    """여러 URL 을 동시에 인제스트. 하나라도 실패하면 실패한 URL 목록과 함께 예외"""
+    results, failures = [], []
+    control = cancellation.current()  # 병렬 다운로드 스레드에는 Job 이 연결돼 있지 않으므로 넘겨줌
+    for url, (clip, error) in zip(urls, map_concurrent(lambda u: ingest_url(u, persist_dir, control), urls)):
+        if isinstance(error, cancellation.JobAborted):
+            raise error
+        if error is not None:
+            print(f"❌ Failed to ingest {url}: {str(error)}")
+            failures.append(f"{_filename(url)}: {error}")
+        else:
+            results.append(clip)
+    if failures:
+        raise RuntimeError("Failed to download audio file(s): " + "; ".join(failures))
+    return results
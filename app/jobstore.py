@@ -0,0 +1,491 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core.config import settings
+from .events import get_event_bus
+
+# 아직 끝나지 않은 상태 (TTL 정리 대상에서 제외)
+ACTIVE_STATUSES = ("TRAINING",)
+# 진행 중에만 의미가 있는 필드. 이미 종료된 Job 에 늦게 도착하면 버림 (최종 메시지/진행률 보존)
+_PROGRESS_FIELDS = ("progress", "message")
+
+
+def _applicable(current_status: Optional[str], fields: dict) -> dict:
+    if "status" in fields or current_status in ACTIVE_STATUSES:
+        return fields
+    return {k: v for k, v in fields.items() if k not in _PROGRESS_FIELDS}
+
+
+class JobStore(ABC):
+    """
+    학습 Job 저장소 인터페이스
+
+    - create/get/update/delete: 단건 조작
+    - list: 상태/voiceFileId/userId/batchId 필터 + 페이지네이션
+    - evict_expired: 종료된 Job 중 TTL 이 지난 것 정리
+    - create_or_attach: 같은 voiceFileId 의 진행 중 Job / 같은 멱등 키의 Job 이 있으면 그 Job 반환
+    """
+
+    @abstractmethod
+    def create(self, job: dict) -> None:
+        ...
+
+    @abstractmethod
+    def create_or_attach(self, job: dict) -> Tuple[dict, bool]:
+        """
+        (job, created) 반환. created=False 면 기존 Job 에 합류한 것
+        job["idempotencyKey"] 가 있으면 상태와 무관하게 같은 키의 Job 을 재사용
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def list(self, status: Optional[str] = None, voice_file_id: Optional[str] = None,
+             user_id: Optional[str] = None, limit: int = 50, offset: int = 0,
+             batch_id: Optional[str] = None) -> Tuple[int, List[dict]]:
+        ...
+
+    @abstractmethod
+    def evict_expired(self, ttl_seconds: float) -> int:
+        ...
+
+    def flush(self) -> None:
+        """버퍼링된 쓰기를 즉시 반영 (버퍼가 없는 구현은 no-op)"""
+
+    def _publish_created(self, job: dict):
+        get_event_bus().publish(job["jobId"], {k: job.get(k) for k in ("status", "progress", "message", "voiceFileId")})
+
+
+class MemoryJobStore(JobStore):
+    """단일 프로세스용 인메모리 저장소 (개발/벤치마크용)"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict) -> None:
+        if self.ttl_seconds:
+            self.evict_expired(self.ttl_seconds)
+        with self._lock:
+            self._jobs[job["jobId"]] = dict(job)
+        self._publish_created(job)
+
+    def create_or_attach(self, job: dict) -> Tuple[dict, bool]:
+        if self.ttl_seconds:
+            self.evict_expired(self.ttl_seconds)
+        key = job.get("idempotencyKey")
+        with self._lock:
+            for existing in self._jobs.values():
+                if (key and existing.get("idempotencyKey") == key) or (
+                    existing.get("voiceFileId") == job.get("voiceFileId")
+                    and existing.get("status") in ACTIVE_STATUSES
+                ):
+                    existing["attachedRequests"] = existing.get("attachedRequests", 0) + 1
+                    return dict(existing), False
+            self._jobs[job["jobId"]] = dict(job)
+        self._publish_created(job)
+        return dict(job), True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            applied = _applicable(job.get("status"), fields)
+            if not applied:
+                return
+            job.update(applied)
+            if "status" in fields and fields["status"] not in ACTIVE_STATUSES:
+                job.setdefault("finishedAt", time.time())
+            get_event_bus().publish(job_id, applied)
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            return self._jobs.pop(job_id, None) is not None
+
+    def list(self, status=None, voice_file_id=None, user_id=None, limit=50, offset=0, batch_id=None):
+        with self._lock:
+            rows = [
+                dict(j) for j in self._jobs.values()
+                if (status is None or j.get("status") == status)
+                and (voice_file_id is None or j.get("voiceFileId") == voice_file_id)
+                and (user_id is None or j.get("userId") == user_id)
+                and (batch_id is None or j.get("batchId") == batch_id)
+            ]
+        rows.sort(key=lambda j: j.get("startedAt") or 0, reverse=True)
+        return len(rows), rows[offset:offset + limit]
+
+    def evict_expired(self, ttl_seconds: float) -> int:
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, j in self._jobs.items()
+                if j.get("status") not in ACTIVE_STATUSES and (j.get("finishedAt") or 0) < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class SqliteJobStore(JobStore):
+    """
+    SQLite(WAL) 기반 영속 저장소
+
+    - 여러 uvicorn 워커 프로세스가 같은 DB 파일을 공유
+    - 진행률(progress/message)만 바뀌는 update 는 메모리에 모아 두었다가
+      flush_interval 마다 하나의 트랜잭션으로 일괄 기록
+    - status 가 바뀌는 update 는 즉시 기록 (상태 전이는 유실되면 안 됨)
+    - 프로세스마다 owner 토큰을 두고 주기적으로 heartbeat. heartbeat 가 끊긴
+      프로세스의 진행 중 Job 은 중단된 것으로 보고 ERROR 처리
+    - heartbeat 는 전용 스레드/연결에서 짧은 락 대기로 기록 -> flush 가 락을 기다리며 멈춰도 heartbeat 는 계속됨
+    - 이 프로세스에서 종료시킨 Job 의 최종 상태를 기억해 두고, 늦게 도착한 진행률은 구독자에게도 보내지 않음
+    """
+
+    # 종료 상태를 기억해 둘 최근 Job 수 (오래된 것부터 잊음. 잊은 Job 은 기록 시점에만 걸러짐)
+    finished_cache_size = 10000
+
+    # 일반 연결의 락 대기 상한(초). 중단 판정 기준(stale_seconds)은 이보다 충분히 길어야 함
+    busy_timeout = 30.0
+    # heartbeat 연결의 락 대기 상한(초). 실패하면 다음 주기에 다시 시도 (stale_seconds 안에 여러 번)
+    heartbeat_busy_timeout = 2.0
+
+    def __init__(self, path: Path, flush_interval: float = 0.5, ttl_seconds: Optional[float] = None,
+                 stale_seconds: float = 90.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.ttl_seconds = ttl_seconds
+        if stale_seconds < 2 * self.busy_timeout:
+            print(f"⚠️  JOB_OWNER_STALE_SECONDS={stale_seconds:g} is shorter than twice the SQLite busy timeout; "
+                  f"using {2 * self.busy_timeout:g}s so a stalled write is not taken for a dead worker")
+            stale_seconds = 2 * self.busy_timeout
+        self.stale_seconds = stale_seconds
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        self._pending: Dict[str, dict] = {}  # job_id -> 아직 기록되지 않은 필드
+        self._pending_lock = threading.Lock()
+        self._finished: "OrderedDict[str, str]" = OrderedDict()  # job_id -> 종료 상태 (_pending_lock 으로 보호)
+        self._init_schema()
+        self._flusher = threading.Thread(target=self._flush_loop, name="jobstore-flusher", daemon=True)
+        self._flusher.start()
+        self._heartbeater = threading.Thread(target=self._heartbeat_loop, name="jobstore-heartbeat", daemon=True)
+        self._heartbeater.start()
+
+    # --- 연결 / 스키마 ---
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 연결 (heartbeat 스레드는 짧은 락 대기로 따로 연결)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            is_heartbeat = threading.current_thread() is getattr(self, "_heartbeater", None)
+            timeout = self.heartbeat_busy_timeout if is_heartbeat else self.busy_timeout
+            conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id        TEXT PRIMARY KEY,
+                status        TEXT NOT NULL,
+                voice_file_id TEXT,
+                user_id       TEXT,
+                started_at    REAL,
+                finished_at   REAL,
+                data          TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status        ON jobs(status);
+            CREATE INDEX IF NOT EXISTS idx_jobs_voice_file_id ON jobs(voice_file_id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_user_id       ON jobs(user_id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_started_at    ON jobs(started_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_finished_at   ON jobs(finished_at);
+            CREATE TABLE IF NOT EXISTS owners (
+                owner        TEXT PRIMARY KEY,
+                heartbeat_at REAL NOT NULL
+            );
+        """)
+        # 이전 버전 DB 마이그레이션
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        if "idempotency_key" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN idempotency_key TEXT")
+        if "batch_id" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_idempotency_key ON jobs(idempotency_key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch_id ON jobs(batch_id)")
+        self._heartbeat()
+
+    # --- 조회 / 기록 ---
+
+    def create(self, job: dict) -> None:
+        self._insert(self._conn(), job)
+        self._publish_created(job)
+
+    def create_or_attach(self, job: dict) -> Tuple[dict, bool]:
+        conn = self._conn()
+        key = job.get("idempotencyKey")
+        placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+        # BEGIN IMMEDIATE: 다른 프로세스의 동시 제출과 직렬화
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = None
+            if key:
+                row = conn.execute(
+                    "SELECT job_id, data FROM jobs WHERE idempotency_key = ? ORDER BY started_at DESC LIMIT 1",
+                    (key,),
+                ).fetchone()
+            if row is None:
+                row = conn.execute(
+                    f"SELECT j.job_id, j.data FROM jobs j JOIN owners o ON o.owner = j.owner "
+                    f"WHERE j.voice_file_id = ? AND j.status IN ({placeholders}) AND o.heartbeat_at > ? "
+                    f"ORDER BY j.started_at DESC LIMIT 1",
+                    (job.get("voiceFileId"), *ACTIVE_STATUSES, time.time() - self.stale_seconds),
+                ).fetchone()
+            if row is not None:
+                existing = json.loads(row[1])
+                existing["attachedRequests"] = existing.get("attachedRequests", 0) + 1
+                conn.execute("UPDATE jobs SET data = ? WHERE job_id = ?",
+                             (json.dumps(existing, ensure_ascii=False), row[0]))
+                conn.execute("COMMIT")
+                return self._with_pending(row[0], existing), False
+            self._insert(conn, job)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._publish_created(job)
+        return dict(job), True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._with_pending(job_id, json.loads(row[0]))
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._pending_lock:
+            # 이미 종료된 Job 에 늦게 온 진행률은 기록도, 전달도 하지 않음
+            fields = _applicable(self._finished.get(job_id, "TRAINING"), fields)
+            if not fields:
+                return
+            if fields.get("status") not in (None, *ACTIVE_STATUSES):
+                self._finished[job_id] = fields["status"]
+                self._finished.move_to_end(job_id)
+                while len(self._finished) > self.finished_cache_size:
+                    self._finished.popitem(last=False)
+            merged = self._pending.setdefault(job_id, {})
+            merged.update(fields)
+            batch = {job_id: self._pending.pop(job_id)} if "status" in merged else None
+            # 구독자에게는 기록(flush) 전에 바로 전달. 락 안에서 보내야 종료 이벤트 뒤로 진행률이 끼어들지 않음
+            get_event_bus().publish(job_id, fields)
+        if batch is not None:
+            self._write(batch)  # 진행률만 바뀐 경우는 다음 flush 때 일괄 기록
+
+    def delete(self, job_id: str) -> bool:
+        with self._pending_lock:
+            self._pending.pop(job_id, None)
+            self._finished.pop(job_id, None)
+        cur = self._conn().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return cur.rowcount > 0
+
+    def list(self, status=None, voice_file_id=None, user_id=None, limit=50, offset=0, batch_id=None):
+        where, params = [], []
+        for col, val in (("status", status), ("voice_file_id", voice_file_id), ("user_id", user_id),
+                         ("batch_id", batch_id)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                params.append(val)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM jobs {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT job_id, data FROM jobs {clause} ORDER BY started_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return total, [self._with_pending(job_id, json.loads(data)) for job_id, data in rows]
+
+    def evict_expired(self, ttl_seconds: float) -> int:
+        cutoff = time.time() - ttl_seconds
+        placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+        cur = self._conn().execute(
+            f"DELETE FROM jobs WHERE status NOT IN ({placeholders}) AND finished_at < ?",
+            (*ACTIVE_STATUSES, cutoff),
+        )
+        return cur.rowcount
+
+    def flush(self) -> None:
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if batch:
+            self._write(batch)
+
+    # --- 내부 ---
+
+    def _insert(self, conn: sqlite3.Connection, job: dict):
+        conn.execute(
+            "INSERT INTO jobs (job_id, status, voice_file_id, user_id, started_at, finished_at, data, "
+            "owner, idempotency_key, batch_id) VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?, ?)",
+            (job["jobId"], job.get("status", "TRAINING"), job.get("voiceFileId"), job.get("userId"),
+             job.get("startedAt"), json.dumps(job, ensure_ascii=False), self.owner, job.get("idempotencyKey"),
+             job.get("batchId")),
+        )
+
+    def _heartbeat(self):
+        self._conn().execute("INSERT OR REPLACE INTO owners (owner, heartbeat_at) VALUES (?, ?)",
+                             (self.owner, time.time()))
+
+    def _fail_orphans(self) -> int:
+        """
+        heartbeat 가 끊긴 프로세스(재시작/크래시)가 맡고 있던 진행 중 Job 을 ERROR 로 + 실패 콜백 적재
+        조회와 기록을 한 트랜잭션으로 묶어 여러 프로세스가 같은 Job 을 중복으로 처리(콜백)하지 않게 함
+        """
+        from .callbacks import enqueue_callback
+
+        conn = self._conn()
+        cutoff = time.time() - self.stale_seconds
+        placeholders = ",".join("?" for _ in ACTIVE_STATUSES)
+        message = "worker process exited"
+        fields = {"status": "ERROR", "progress": 0, "message": f"Training interrupted: {message}"}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT j.job_id, j.voice_file_id FROM jobs j LEFT JOIN owners o ON o.owner = j.owner "
+                f"WHERE j.status IN ({placeholders}) AND (o.heartbeat_at IS NULL OR o.heartbeat_at < ?)",
+                (*ACTIVE_STATUSES, cutoff),
+            ).fetchall()
+            self._apply(conn, {job_id: dict(fields) for job_id, _ in rows})
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for job_id, voice_file_id in rows:
+            get_event_bus().publish(job_id, fields)
+            # _fail_job 과 같은 형식. errorCode 로 구분
+            try:
+                enqueue_callback(job_id, {
+                    "modelId": voice_file_id,
+                    "status": "ERROR",
+                    "errorCode": "ORPHANED",
+                    "errorMessage": message,
+                    "jobId": job_id
+                })
+            except Exception as cb_err:
+                print(f"❌ Failed to enqueue error callback for orphaned job {job_id}: {cb_err}")
+        conn.execute("DELETE FROM owners WHERE heartbeat_at < ?", (cutoff - self.stale_seconds,))
+        return len(rows)
+
+    def _with_pending(self, job_id: str, job: dict) -> dict:
+        with self._pending_lock:
+            pending = self._pending.get(job_id)
+            if pending:
+                job.update(pending)
+        return job
+
+    def _write(self, batch: Dict[str, dict]):
+        """여러 Job 의 변경분을 하나의 트랜잭션으로 기록"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._apply(conn, batch)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _apply(self, conn: sqlite3.Connection, batch: Dict[str, dict]):
+        """트랜잭션 안에서 변경분 반영"""
+        now = time.time()
+        for job_id, fields in batch.items():
+            row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                continue
+            job = json.loads(row[0])
+            # flush 가 꺼낸 진행률 묶음이 그 사이 기록된 종료 상태(DONE/ERROR 등)를 덮어쓰지 않게
+            job.update(_applicable(job.get("status", "TRAINING"), fields))
+            status = job.get("status", "TRAINING")
+            if status not in ACTIVE_STATUSES:
+                job.setdefault("finishedAt", now)
+            conn.execute(
+                "UPDATE jobs SET status = ?, voice_file_id = ?, user_id = ?, started_at = ?, "
+                "finished_at = ?, data = ? WHERE job_id = ?",
+                (status, job.get("voiceFileId"), job.get("userId"), job.get("startedAt"),
+                 job.get("finishedAt"), json.dumps(job, ensure_ascii=False), job_id),
+            )
+
+    def _heartbeat_loop(self):
+        """stale_seconds 동안 여러 번 (락 대기 heartbeat_busy_timeout) 시도하므로 한두 번 실패해도 중단으로 보이지 않음"""
+        while True:
+            time.sleep(self.stale_seconds / 6)
+            try:
+                self._heartbeat()
+            except Exception as e:
+                print(f"⚠️  Job store heartbeat failed (will retry): {e}")
+
+    def _flush_loop(self):
+        last_evict = time.time()
+        last_orphan_check = 0.0
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if time.time() - last_orphan_check > self.stale_seconds / 3:
+                    last_orphan_check = time.time()
+                    orphaned = self._fail_orphans()
+                    if orphaned:
+                        print(f"⚠️  Marked {orphaned} orphaned jobs as failed")
+                if self.ttl_seconds and time.time() - last_evict > 60:
+                    evicted = self.evict_expired(self.ttl_seconds)
+                    last_evict = time.time()
+                    if evicted:
+                        print(f"🧹 Evicted {evicted} expired jobs")
+            except Exception as e:
+                print(f"⚠️  Job store flush failed: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """설정(JOB_STORE_BACKEND)에 따른 저장소 싱글톤"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.JOB_STORE_BACKEND == "memory":
+                    _store = MemoryJobStore(ttl_seconds=settings.JOB_TTL_SECONDS)
+                else:
+                    _store = SqliteJobStore(
+                        Path(settings.JOB_STORE_PATH),
+                        flush_interval=settings.JOB_STORE_FLUSH_INTERVAL,
+                        ttl_seconds=settings.JOB_TTL_SECONDS,
+                        stale_seconds=settings.JOB_OWNER_STALE_SECONDS,
+                    )
+    return _store
@@ -1,10 +1,33 @@
+import asyncio
 from fastapi import FastAPI
-from .routers import train
+from .routers import train, synthesize, health, voices
 from .core.config import settings  # 이미 생성된 settings 사용
+from . import model_server
+from .readiness import readiness, start_warmup
+from .callbacks import get_outbox
+from .workspace import get_workspace_manager
 
 def create_app():
     app = FastAPI(title="AudIon AI Server", version="0.1.0")
     app.include_router(train.router)
+    app.include_router(synthesize.router)
+    app.include_router(health.router)
+    app.include_router(voices.router)
+
+    @app.on_event("startup")
+    async def on_startup():
+        # 모델 서버 모드면 기동 시점에 supervisor 를 띄워 모델 로드를 미리 시작
+        if model_server.enabled():
+            model_server.get_model_pool()
+        # 모델 로드/워밍업은 백그라운드에서 진행하고, 요청은 바로 받기 시작
+        start_warmup()
+        # 이전 프로세스가 비정상 종료하며 남긴 작업 공간 정리 + 디스크 할당량 확인 (백그라운드)
+        app.state.sweep_task = asyncio.create_task(asyncio.to_thread(get_workspace_manager().sweep_orphans))
+        # Spring 콜백 전송 워커 (재시작 전 쌓인 미전송 콜백도 이어서 전송)
+        if settings.SPRING_CALLBACK_URL:
+            app.state.callback_task = asyncio.create_task(get_outbox().run_delivery())
+        readiness.mark_listening()
+
     return app
 
 app = create_app()
\ No newline at end of file
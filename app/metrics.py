@@ -0,0 +1,128 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from . import cancellation
+from .core.config import settings
+from .events import get_event_bus
+from .readiness import readiness
+from .scheduler import get_scheduler
+from .workspace import get_workspace_manager
+
+# 단계별 소요 시간 버킷 (다운로드/업로드는 수십 초까지, 추론은 수 초 ~ 수 분)
+_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160, 320, 640)
+
+STAGE_SECONDS = Histogram(
+    "audion_stage_seconds", "Time spent doing the work of a training/synthesis stage",
+    ["stage"], buckets=_STAGE_BUCKETS,
+)
+STAGE_WAIT_SECONDS = Histogram(
+    "audion_stage_wait_seconds", "Time spent waiting for a stage concurrency slot",
+    ["stage"], buckets=_STAGE_BUCKETS,
+)
+JOB_SECONDS = Histogram(
+    "audion_job_seconds", "End-to-end training job duration (excluding queue wait)",
+    ["outcome"], buckets=_STAGE_BUCKETS,
+)
+JOBS_TOTAL = Counter("audion_jobs_total", "Finished training jobs", ["outcome"])
+AUDIO_SECONDS = Counter(
+    "audion_audio_seconds_total", "Seconds of audio processed",
+    ["kind"],  # train: 전처리 후 학습 입력, preview/synthesize: 합성 출력
+)
+RTF = Histogram(
+    "audion_synthesis_rtf", "Synthesis real-time factor (wall time / audio seconds)",
+    ["kind"], buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10),
+)
+QUEUE_DEPTH = Gauge("audion_queue_depth", "Training jobs waiting in the scheduler queue")
+IN_FLIGHT = Gauge("audion_jobs_in_flight", "Training jobs currently running")
+ABANDONED_WORKERS = Gauge(
+    "audion_abandoned_workers", "Worker threads still finishing a cancelled/timed-out job after releasing their slot"
+)
+MODEL_LOAD_SECONDS = Gauge("audion_model_load_seconds", "Model load time", ["model"])
+MODEL_WARMUP_SECONDS = Gauge("audion_model_warmup_seconds", "Model warm-up time", ["model"])
+MODEL_READY = Gauge("audion_model_ready", "1 if the model is loaded and warmed up", ["model"])
+CALLBACK_PENDING = Gauge("audion_callbacks_pending", "Spring callbacks waiting in the outbox")
+EVENT_SUBSCRIBERS = Gauge("audion_job_event_subscribers", "Open job progress event streams")
+DISK_BYTES = Gauge("audion_disk_usage_bytes", "Local disk usage by area", ["area"])
+DISK_FREE_BYTES = Gauge("audion_disk_free_bytes", "Free space on the data volume")
+DISK_QUOTA_BYTES = Gauge("audion_disk_quota_bytes", "Quota for local models + workspaces (0 = unlimited)")
+LOCAL_MODELS = Gauge("audion_local_models", "Voice models cached on local disk")
+MODEL_EVICTIONS = Gauge("audion_local_model_evictions", "Local voice models evicted over quota since start")
+EVENTS_DROPPED = Gauge("audion_job_events_dropped", "Job events dropped for slow subscribers since start")
+
+
+class StageTimer:
+    """
+    Job 하나의 단계별 소요 시간 기록
+
+    - stage(name, gate) 블록의 실행 시간을 histogram 에 남기고 timings[name] 에 누적
+    - gate(스케줄러 stage 세마포어 등)를 넘기면 슬롯 대기 시간은 waits[name] 으로 따로 기록
+    - 슬롯을 얻은 뒤 단계 제한 시간(STAGE_TIMEOUT_*) 적용 + 취소 checkpoint
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.waits: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.timings[name] = round(self.timings.get(name, 0.0) + seconds, 3)
+        STAGE_SECONDS.labels(name).observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str, gate=None):
+        requested = time.perf_counter()
+        with gate if gate is not None else nullcontext():
+            started = time.perf_counter()
+            waited = started - requested
+            if gate is not None:
+                self.waits[name] = round(self.waits.get(name, 0.0) + waited, 3)
+                STAGE_WAIT_SECONDS.labels(name).observe(waited)
+            try:
+                with cancellation.stage(name):
+                    yield
+            finally:
+                self.record(name, time.perf_counter() - started)
+
+    def as_dict(self) -> dict:
+        return {"stages": dict(self.timings), "waits": dict(self.waits)}
+
+
+def observe_synthesis(kind: str, elapsed: float, audio_seconds: Optional[float]):
+    """합성 결과의 오디오 길이와 RTF 기록"""
+    if not audio_seconds:
+        return
+    AUDIO_SECONDS.labels(kind).inc(audio_seconds)
+    RTF.labels(kind).observe(elapsed / audio_seconds)
+
+
+def render() -> bytes:
+    """/metrics 응답 본문. 게이지는 조회 시점 값으로 갱신"""
+    stats = get_scheduler().stats()
+    QUEUE_DEPTH.set(stats["queued"])
+    IN_FLIGHT.set(stats["running"])
+    ABANDONED_WORKERS.set(stats["abandoned"])
+    for name, model in readiness.snapshot()["models"].items():
+        MODEL_READY.labels(name).set(1 if model["state"] == "ready" else 0)
+        if model.get("loadSeconds") is not None:
+            MODEL_LOAD_SECONDS.labels(name).set(model["loadSeconds"])
+        if model.get("warmupSeconds") is not None:
+            MODEL_WARMUP_SECONDS.labels(name).set(model["warmupSeconds"])
+    events = get_event_bus().stats()
+    EVENT_SUBSCRIBERS.set(events["subscribers"])
+    EVENTS_DROPPED.set(events["dropped"])
+    disk = get_workspace_manager().stats()
+    DISK_BYTES.labels("models").set(disk["modelsBytes"])
+    DISK_BYTES.labels("workspaces").set(disk["scratchBytes"])
+    if disk["tmpfsBytes"] is not None:
+        DISK_BYTES.labels("tmpfs").set(disk["tmpfsBytes"])
+    DISK_FREE_BYTES.set(disk["diskFreeBytes"])
+    DISK_QUOTA_BYTES.set(disk["quotaBytes"] or 0)
+    LOCAL_MODELS.set(disk["modelCount"])
+    MODEL_EVICTIONS.set(disk["evictions"])
+    if settings.SPRING_CALLBACK_URL:
+        from .callbacks import get_outbox
+        CALLBACK_PENDING.set(get_outbox().pending_count())
+    return generate_latest()
+
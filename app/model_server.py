@@ -0,0 +1,244 @@
+"""
+추론 전용 모델 서버 프로세스 풀
+
+API(uvicorn) 프로세스는 torch/TTS 를 import 하지 않고, 요청만 IPC 로 넘긴다.
+
+    API 프로세스 ──(mp.Queue: 요청 메타데이터)──▶ supervisor ─fork─▶ worker × N
+                ◀──(mp.Queue: 결과)───────────────────────────────── worker
+                   오디오 입력은 shared_memory 로 전달 (큐에는 이름/shape 만)
+
+- supervisor 가 ECAPA/XTTS 를 한 번 로드한 뒤 fork 하므로 가중치는 copy-on-write 로 공유
+- fork 전에는 추론을 돌리지 않음 (OpenMP 스레드 풀이 생성된 뒤 fork 하면 교착 위험)
+- 각 worker 는 torch.set_num_threads(INFERENCE_THREADS_PER_WORKER) 로 코어를 나눠 씀
+"""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .core.config import settings
+
+_STREAM_END = "__end__"
+
+
+def enabled() -> bool:
+    """INFERENCE_MODE=process 면 모델 서버 풀로 추론"""
+    return settings.INFERENCE_MODE == "process"
+
+
+# --- 공유 메모리 오디오 버퍼 ---
+
+class _ShmArray:
+    """큐로 넘길 수 있는 공유 메모리 배열 참조 (이름 + shape + dtype)"""
+
+    def __init__(self, name: str, shape: tuple, dtype: str):
+        self.name, self.shape, self.dtype = name, shape, dtype
+
+
+def _to_shm(arr: np.ndarray):
+    arr = np.ascontiguousarray(arr)
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, _ShmArray(shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach(ref: _ShmArray):
+    shm = SharedMemory(name=ref.name)
+    # 생성한 쪽(API 프로세스)이 unlink 하므로 worker 의 resource_tracker 에서는 제외
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf)
+
+
+# --- worker / supervisor (모델 서버 쪽) ---
+
+def _handle(op: str, args: dict, emit) -> Any:
+    from .embedding_service import encode_padded
+    from .audio import get_encoder
+    from . import tts_preview
+
+    if op == "embed_batch":
+        attached = [_attach(ref) for ref in args["signals"]]
+        try:
+            return encode_padded(get_encoder(), [arr for _, arr in attached])
+        finally:
+            for shm, _ in attached:
+                shm.close()
+    if op == "latents":
+        ref = args["ref"]
+        if isinstance(ref, _ShmArray):
+            shm, arr = _attach(ref)
+            try:
+                return tts_preview._compute_conditioning_latents_local(arr, args["sr"])
+            finally:
+                shm.close()
+        return tts_preview._compute_conditioning_latents_local(ref, args["sr"])
+    if op == "synthesize":
+        return tts_preview._synthesize_local(args["latents"], args["text"], args["lang"])
+    if op == "synth_stream":
+        for chunk in tts_preview._synth_stream_local(args["latents"], args["text"], args["lang"],
+                                                     args["stream_chunk_size"]):
+            emit(chunk)
+        return None
+    raise ValueError(f"unknown op {op}")
+
+
+def _worker_main(req_q, resp_q, threads: int):
+    import torch
+    torch.set_num_threads(threads)
+    while True:
+        req_id, op, args = req_q.get()
+        try:
+            result = _handle(op, args, lambda chunk: resp_q.put((req_id, "chunk", chunk)))
+            resp_q.put((req_id, "ok", result))
+        except Exception as e:
+            resp_q.put((req_id, "error", f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"))
+
+
+def _supervisor_main(req_q, resp_q, workers: int, threads: int):
+    import torch
+    torch.set_num_threads(1)
+    from .audio import get_encoder
+    from .tts_preview import get_tts
+    from . import accel
+
+    started = time.time()
+    # 가속 모드의 정확도 게이트는 fork 전에 추론을 돌리지만, 스레드 1개라 OpenMP 풀은 생기지 않음
+    get_encoder()
+    get_tts()
+    print(f"🧠 Model server loaded models in {time.time() - started:.1f}s; forking {workers} workers")
+    resp_q.put((None, "ready", {"loadSeconds": round(time.time() - started, 2), "accel": dict(accel.report)}))
+
+    fork = mp.get_context("fork")
+    procs: List = [None] * workers
+    while True:
+        for i, p in enumerate(procs):
+            if p is None or not p.is_alive():
+                if p is not None:
+                    print(f"⚠️  Model worker {i} exited ({p.exitcode}); restarting")
+                procs[i] = fork.Process(target=_worker_main, args=(req_q, resp_q, threads),
+                                        name=f"model-worker-{i}", daemon=True)
+                procs[i].start()
+        time.sleep(1.0)
+
+
+# --- API 프로세스 쪽 클라이언트 ---
+
+class ModelServerPool:
+    """모델 서버 프로세스에 요청을 보내고 결과를 Future / 스트림으로 돌려받음"""
+
+    def __init__(self, workers: int, threads_per_worker: int, timeout: float):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.timeout = timeout
+        ctx = mp.get_context("spawn")  # API 프로세스 상태를 물려받지 않는 깨끗한 supervisor
+        self._req_q = ctx.Queue()
+        self._resp_q = ctx.Queue()
+        self._ids = itertools.count()
+        self._pending: Dict[int, Any] = {}  # req_id -> Future 또는 스트림용 queue.Queue
+        self._lock = threading.Lock()
+        self.ready = threading.Event()
+        self.load_seconds: Optional[float] = None
+        self.accel_report: Dict[str, dict] = {}
+        self._supervisor = ctx.Process(
+            target=_supervisor_main, args=(self._req_q, self._resp_q, workers, threads_per_worker),
+            name="model-server", daemon=True,
+        )
+        self._supervisor.start()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="model-server-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            req_id, kind, payload = self._resp_q.get()
+            if kind == "ready":
+                self.load_seconds = payload["loadSeconds"]
+                self.accel_report = payload.get("accel", {})
+                self.ready.set()
+                continue
+            with self._lock:
+                target = self._pending.get(req_id)
+                if kind != "chunk":
+                    self._pending.pop(req_id, None)
+            if target is None:
+                continue  # 타임아웃으로 포기한 요청
+            if isinstance(target, Future):
+                if kind == "ok":
+                    target.set_result(payload)
+                else:
+                    target.set_exception(RuntimeError(f"model server error: {payload}"))
+            else:
+                target.put((kind, payload))
+
+    def _send(self, op: str, args: dict, target) -> int:
+        req_id = next(self._ids)
+        with self._lock:
+            self._pending[req_id] = target
+        self._req_q.put((req_id, op, args))
+        return req_id
+
+    def call(self, op: str, shm_buffers: Optional[list] = None, **args) -> Any:
+        """요청 1건을 보내고 결과를 기다림. shm_buffers 는 응답 후 해제"""
+        fut: Future = Future()
+        req_id = self._send(op, args, fut)
+        try:
+            return fut.result(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            for shm in shm_buffers or []:
+                shm.close()
+                shm.unlink()
+
+    def stream(self, op: str, **args) -> Iterator[Any]:
+        """요청을 보내고 worker 가 emit 하는 청크를 받는 대로 yield"""
+        q: "queue.Queue" = queue.Queue()
+        req_id = self._send(op, args, q)
+        try:
+            while True:
+                kind, payload = q.get(timeout=self.timeout)
+                if kind == "chunk":
+                    yield payload
+                elif kind == "ok":
+                    return
+                else:
+                    raise RuntimeError(f"model server error: {payload}")
+        finally:
+            with self._lock:
+                self._pending.pop(req_id, None)
+
+    # --- 편의 메서드 ---
+
+    def embed_batch(self, signals: List[np.ndarray]) -> List[np.ndarray]:
+        buffers, refs = zip(*(_to_shm(np.asarray(s, dtype=np.float32)) for s in signals))
+        return self.call("embed_batch", shm_buffers=list(buffers), signals=list(refs))
+
+    def conditioning_latents(self, ref, sr: int):
+        if isinstance(ref, np.ndarray):
+            shm, shm_ref = _to_shm(ref.astype(np.float32, copy=False))
+            return self.call("latents", shm_buffers=[shm], ref=shm_ref, sr=sr)
+        return self.call("latents", ref=ref, sr=sr)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_model_pool() -> ModelServerPool:
+    """프로세스 단위 모델 서버 풀 싱글톤 (첫 호출 시 supervisor 기동)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                threads = settings.INFERENCE_THREADS_PER_WORKER or max(
+                    1, (os.cpu_count() or 1) // max(1, settings.INFERENCE_WORKERS)
+                )
+                _pool = ModelServerPool(settings.INFERENCE_WORKERS, threads, settings.INFERENCE_TIMEOUT)
+    return _pool
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from .core.config import settings
+from . import accel, model_server
+
+
+def _process_start_time() -> float:
+    """프로세스 시작 시각 (리눅스면 /proc 기준, 아니면 이 모듈 import 시각)"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat") as f:
+            btime = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return btime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return time.time()
+
+
+PROCESS_STARTED_AT = _process_start_time()
+
+
+class ModelReadiness:
+    """
+    모델별 로드 상태(pending/loading/ready/retrying)와 로드·워밍업 시간
+    + 기동 지표 (time-to-listen, time-to-first-job)
+    """
+
+    MODELS = ("ecapa", "xtts")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {name: {"state": "pending"} for name in self.MODELS}
+        self.listening_at: Optional[float] = None
+        self.first_job_at: Optional[float] = None
+
+    def set(self, name: str, **fields):
+        with self._lock:
+            self._models[name].update(fields)
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(m["state"] == "ready" for m in self._models.values())
+
+    def mark_listening(self):
+        self.listening_at = time.time()
+
+    def mark_job_done(self):
+        if self.first_job_at is None:
+            self.first_job_at = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {name: dict(m) for name, m in self._models.items()}
+        return {
+            "ready": all(m["state"] == "ready" for m in models.values()),
+            "models": models,
+            "timeToListenSeconds": round(self.listening_at - PROCESS_STARTED_AT, 2) if self.listening_at else None,
+            "timeToFirstJobSeconds": round(self.first_job_at - PROCESS_STARTED_AT, 2) if self.first_job_at else None,
+        }
+
+
+readiness = ModelReadiness()
+
+
+def _load(name: str, load_fn, warm_fn, after_fn=None) -> bool:
+    """모델 하나 로드 + 워밍업. 성공 여부 (실패하면 _warm_up 이 백오프 후 다시 호출)"""
+    readiness.set(name, state="loading")
+    try:
+        started = time.time()
+        load_fn()
+        loaded = time.time()
+        warm_fn()
+        readiness.set(
+            name, state="ready", error=None, retryAt=None,
+            loadSeconds=round(loaded - started, 2),
+            warmupSeconds=round(time.time() - loaded, 2),
+        )
+        if after_fn is not None:
+            after_fn()
+        print(f"🔥 {name} ready (load {loaded - started:.1f}s, warm-up {time.time() - loaded:.1f}s)")
+        return True
+    except Exception as e:
+        readiness.set(name, state="retrying", error=str(e))
+        print(f"❌ {name} warm-up failed: {e}")
+        return False
+
+
+def _warm_up():
+    """
+    더미 입력으로 한 번씩 추론해 지연 초기화(스레드 풀, 커널 선택 등)를 미리 끝냄
+    실패한 모델은 지수 백오프로 준비될 때까지 다시 시도 (/ready 에 시도 횟수, 다음 시도 시각, 마지막 오류)
+    """
+    steps = _steps()
+    pending = [step for step in steps if not _load(*step)]
+    _report_accel()
+    attempt = 1
+    while pending:
+        delay = min(settings.WARMUP_RETRY_MAX_SECONDS, settings.WARMUP_RETRY_BASE_SECONDS * (2 ** (attempt - 1)))
+        for name, *_ in pending:
+            readiness.set(name, state="retrying", attempts=attempt, retryAt=round(time.time() + delay, 1))
+        print(f"🔁 Retrying warm-up of {', '.join(step[0] for step in pending)} in {delay:.0f}s (attempt {attempt + 1})")
+        time.sleep(delay)
+        attempt += 1
+        pending = [step for step in pending if not _load(*step)]
+        if not pending:
+            _report_accel()
+
+
+def _steps() -> list:
+    """(모델 이름, 로드, 워밍업, 준비 후 처리) 목록. 모델 서버 모드면 로드는 서버 프로세스가 끝낼 때까지 대기"""
+    from .embedding_service import get_embedding_batcher
+    from .tts_preview import compute_conditioning_latents, synth_with_latents
+
+    rng = np.random.default_rng(0)
+    dummy = (0.05 * rng.standard_normal(16000 * 2)).astype(np.float32)  # 2초 16k 잡음
+
+    steps = []
+    if model_server.enabled():
+        pool = model_server.get_model_pool()
+        def wait_pool():
+            if not pool.ready.wait(timeout=settings.INFERENCE_TIMEOUT):
+                raise TimeoutError("model server did not finish loading")
+        steps.append(("ecapa", wait_pool, lambda: get_embedding_batcher().embed(dummy),
+                      lambda: readiness.set("ecapa", loadSeconds=pool.load_seconds)))
+    else:
+        from .audio import get_encoder
+        steps.append(("ecapa", get_encoder, lambda: get_embedding_batcher().embed(dummy)))
+
+    def warm_xtts():
+        import tempfile
+        from pathlib import Path
+        latents = compute_conditioning_latents(dummy)
+        if settings.WARMUP_SYNTH_TEXT:
+            with tempfile.TemporaryDirectory() as tmp:
+                synth_with_latents(latents, Path(tmp) / "warmup.wav", settings.WARMUP_SYNTH_TEXT,
+                                   lang=settings.PREVIEW_LANG)
+
+    if model_server.enabled():
+        steps.append(("xtts", lambda: None, warm_xtts,
+                      lambda: readiness.set("xtts", loadSeconds=model_server.get_model_pool().load_seconds)))
+    else:
+        from .tts_preview import get_tts
+        steps.append(("xtts", get_tts, warm_xtts))
+    return steps
+
+
+def _report_accel():
+    """가속 모드 적용 결과 (정확도 게이트 통과 여부, 모델 크기)"""
+    report = model_server.get_model_pool().accel_report if model_server.enabled() else accel.report
+    for name, entry in report.items():
+        readiness.set(name, accel=entry)
+
+
+def start_warmup():
+    """기동 직후 백그라운드에서 모델 로드 + 워밍업. 꺼져 있으면 준비된 것으로 간주 (지연 로드)"""
+    if not settings.WARMUP_ON_STARTUP:
+        for name in ModelReadiness.MODELS:
+            readiness.set(name, state="ready", lazy=True)
+        return
+    threading.Thread(target=_warm_up, name="model-warmup", daemon=True).start()
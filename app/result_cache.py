@@ -0,0 +1,117 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .core.config import settings
+
+
+def cache_key(audio_hashes: List[str], encoder: str, model_version: str, tts_model: str,
+              preview_text: str, preview_lang: str, artifact_quant: str, inference_mode: str) -> str:
+    """
+    학습 결과 캐시 키 = 원본 오디오 바이트 해시 + 인코더/모델 버전 + 프리뷰 설정
+    + 모델 파일 양자화(MODEL_ARTIFACT_QUANT) + 추론 가속 모드(INFERENCE_ACCEL / INFERENCE_COMPILE)
+    (인코더나 모델 포맷, 프리뷰 문구, 양자화/가속 설정이 바뀌면 자동으로 다른 키)
+    """
+    h = hashlib.sha256()
+    for part in (*audio_hashes, encoder, model_version, tts_model, preview_text, preview_lang,
+                 artifact_quant, inference_mode):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    콘텐츠 주소 기반 학습 결과 인덱스 (SQLite, LRU)
+
+    key -> 이미 업로드된 모델/프리뷰의 S3 위치와 sha256 + ECAPA 임베딩 (캐시 적중 때도 중복 검사/인덱스 추가용)
+    S3 위치는 voiceFileId 별 키라 다시 학습하면 덮어써지므로, 재사용 전에 sha256 으로 그대로인지 확인
+    max_entries 를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key           TEXT PRIMARY KEY,
+                voice_file_id TEXT NOT NULL,
+                model_bucket  TEXT NOT NULL,
+                model_key     TEXT NOT NULL,
+                preview_bucket TEXT NOT NULL,
+                preview_key   TEXT NOT NULL,
+                created_at    REAL NOT NULL,
+                last_used_at  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used_at);
+        """)
+        # 이전 버전 DB 마이그레이션: 임베딩이 없는 항목은 get 에서 None (재학습)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if "embedding" not in columns:
+            self._conn.execute("ALTER TABLE results ADD COLUMN embedding BLOB")
+        # sha256 이 없는 항목은 덮어써졌는지 확인할 수 없으므로 get 에서 None (재학습)
+        for column in ("model_sha256", "preview_sha256"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE results ADD COLUMN {column} TEXT")
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT voice_file_id, model_bucket, model_key, model_sha256, preview_bucket, preview_key, "
+                "preview_sha256, embedding FROM results "
+                "WHERE key = ? AND embedding IS NOT NULL AND model_sha256 IS NOT NULL AND preview_sha256 IS NOT NULL",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        entry = dict(zip(("voiceFileId", "modelBucket", "modelKey", "modelSha256",
+                          "previewBucket", "previewKey", "previewSha256"), row[:7]))
+        entry["embedding"] = np.frombuffer(row[7], dtype=np.float32).copy()
+        return entry
+
+    def put(self, key: str, voice_file_id: str, model_bucket: str, model_key: str, model_sha256: str,
+            preview_bucket: str, preview_key: str, preview_sha256: str, embedding: np.ndarray):
+        now = time.time()
+        blob = np.asarray(embedding, dtype=np.float32).reshape(-1).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, voice_file_id, model_bucket, model_key, model_sha256, "
+                "preview_bucket, preview_key, preview_sha256, created_at, last_used_at, embedding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, voice_file_id, model_bucket, model_key, model_sha256, preview_bucket, preview_key,
+                 preview_sha256, now, now, blob),
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "  SELECT key FROM results ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache() -> Optional[ResultCache]:
+    """RESULT_CACHE_ENABLED 가 꺼져 있으면 None"""
+    global _cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(Path(settings.RESULT_CACHE_PATH), settings.RESULT_CACHE_MAX_ENTRIES)
+    return _cache
@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from ..api import health
+
+router = APIRouter()
+router.include_router(health.router)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from ..api import synthesize
+
+router = APIRouter()
+router.include_router(synthesize.router)
\ No newline at end of file
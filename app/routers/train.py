@@ -1,5 +1,7 @@
 from fastapi import APIRouter
-from ..api import endpoints
+from ..api import batch, endpoints, events
 
 router = APIRouter()
-router.include_router(endpoints.router)
\ No newline at end of file
+router.include_router(endpoints.router)
+router.include_router(batch.router)
+router.include_router(events.router)
\ No newline at end of file
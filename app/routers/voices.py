@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from ..api import voices
+
+router = APIRouter()
+router.include_router(voices.router)
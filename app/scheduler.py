@@ -0,0 +1,243 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Set
+
+from .core.config import settings
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차서 작업을 더 받을 수 없음 (→ 429)"""
+
+
+class TrainingScheduler:
+    """
+    고정 크기 워커 풀 + 우선순위(FIFO) 대기열 기반 학습 스케줄러
+
+    - 요청마다 스레드를 만들지 않고, workers 개수만큼만 동시에 작업을 실행
+    - priority 값이 작을수록 먼저 실행, 같은 우선순위는 제출 순서(FIFO)
+    - 단계별 동시 실행 수 제한(stage): 다운로드는 넓게, 모델 추론은 좁게
+    - 대기열이 max_queue 를 넘으면 QueueFullError
+    - cancel: 대기 중인 작업을 대기열에서 뺌. release: 실행 중인 작업의 슬롯을 바로 반납
+      (그 스레드는 작업이 끝나면 종료하고, 대신 새 워커 스레드가 다음 작업을 맡음)
+      반납한 스레드가 잡고 있던 stage 슬롯도 함께 반납 (그 스레드는 이후 stage 제한을 받지 않음)
+      반납 후 아직 안 끝난 스레드는 max_abandoned 개까지만 (넘으면 반납하지 않고 원래 스레드가 이어서 처리)
+    """
+
+    def __init__(self, workers: int, max_queue: int, stage_limits: Optional[Dict[str, int]] = None,
+                 max_abandoned: int = 0):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_abandoned = max(0, max_abandoned)
+        self._heap: list = []  # (priority, seq, job_id, fn, args, kwargs)
+        self._seq = itertools.count()
+        self._reserved = 0  # reserve() 로 잡아 두고 아직 submit 하지 않은 대기열 자리
+        self._cond = threading.Condition()
+        self._running: Dict[str, float] = {}  # job_id -> 시작 시각
+        self._owners: Dict[str, threading.Thread] = {}  # job_id -> 실행 중인 워커 스레드
+        self._threads: list = []
+        self._abandoned: Set[threading.Thread] = set()  # 슬롯을 반납했지만 아직 작업이 안 끝난 스레드
+        self._stages = {name: threading.BoundedSemaphore(max(1, n)) for name, n in (stage_limits or {}).items()}
+        self._held: Dict[threading.Thread, list] = {}  # 스레드 -> 잡고 있는 stage 이름 (release 때 대신 반납)
+        # 최근 작업 소요 시간의 지수 이동 평균 (ETA 추정용)
+        self._avg_duration: Optional[float] = None
+
+    # --- 제출 / 조회 ---
+
+    def reserve(self):
+        """
+        대기열 자리를 미리 잡음 (가득 차면 QueueFullError)
+        Job 을 만들기 전에 받아 두면, 만든 뒤 submit 이 실패해 지워야 하는 일이 없음
+        잡은 자리는 submit(reserved=True) 로 쓰거나 unreserve() 로 돌려줌
+        """
+        with self._cond:
+            if len(self._heap) + self._reserved >= self.max_queue:
+                raise QueueFullError(f"training queue is full ({self.max_queue})")
+            self._reserved += 1
+
+    def unreserve(self):
+        with self._cond:
+            self._reserved = max(0, self._reserved - 1)
+
+    def submit(self, job_id: str, fn: Callable, *args, priority: int = 0, reserved: bool = False, **kwargs) -> int:
+        """작업을 대기열에 넣고 대기 순번(0 = 바로 다음)을 반환. reserved 면 reserve() 로 잡은 자리를 씀"""
+        with self._cond:
+            if reserved:
+                self._reserved = max(0, self._reserved - 1)
+            elif len(self._heap) + self._reserved >= self.max_queue:
+                raise QueueFullError(f"training queue is full ({self.max_queue})")
+            heapq.heappush(self._heap, (priority, next(self._seq), job_id, fn, args, kwargs))
+            self._ensure_workers()
+            self._cond.notify()
+            return self._position_locked(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """대기 중이면 앞에 있는 작업 수, 대기 중이 아니면 None"""
+        with self._cond:
+            return self._position_locked(job_id)
+
+    def eta(self, job_id: str) -> Optional[float]:
+        """대기 중인 작업이 시작되기까지 예상 시간(초)"""
+        with self._cond:
+            pos = self._position_locked(job_id)
+            if pos is None or self._avg_duration is None:
+                return None
+            # 앞선 작업 + 실행 중인 작업을 워커 수로 나눠 소화한다고 가정
+            ahead = pos + len(self._running)
+            return round(ahead / self.workers * self._avg_duration, 1)
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업을 대기열에서 뺌 (이미 시작했으면 False)"""
+        with self._cond:
+            for i, item in enumerate(self._heap):
+                if item[2] == job_id:
+                    self._heap.pop(i)
+                    heapq.heapify(self._heap)
+                    return True
+            return False
+
+    def release(self, job_id: str) -> bool:
+        """
+        실행 중인 작업의 워커 슬롯을 바로 반납 (취소/제한 시간 초과)
+        작업 스레드는 다음 checkpoint 까지 계속 돌 수 있으므로 대신 새 워커 스레드를 띄움
+        작업 스레드 자신이 호출하면 곧 끝나므로 아무것도 하지 않음
+        반납하지 않은 스레드가 이미 max_abandoned 개면 반납하지 않음 (스레드 수 상한)
+        """
+        with self._cond:
+            owner = self._owners.get(job_id)
+            if owner is None or owner is threading.current_thread():
+                return False
+            if len(self._abandoned) >= self.max_abandoned:
+                print(f"⚠️  Not releasing slot of job {job_id}: {len(self._abandoned)} abandoned workers still running")
+                return False
+            self._running.pop(job_id, None)
+            self._owners.pop(job_id, None)
+            self._abandoned.add(owner)
+            # 그 스레드가 잡고 있던 stage 슬롯도 반납 (다음 작업이 기다리지 않게)
+            for name in self._held.pop(owner, []):
+                self._stages[name].release()
+            self._ensure_workers()
+            self._cond.notify()
+            return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "abandoned": len(self._abandoned),
+                "queued": len(self._heap),
+                "maxQueue": self.max_queue,
+                "avgJobSeconds": round(self._avg_duration, 2) if self._avg_duration else None,
+            }
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        단계별 동시 실행 수 제한. 설정되지 않은 단계는 제한 없음
+        release 로 반납된 스레드는 제한을 받지 않음 (슬롯은 release 가 이미 돌려줌)
+        """
+        sem = self._stages.get(name)
+        me = threading.current_thread()
+        with self._cond:
+            abandoned = me in self._abandoned
+        if sem is None or abandoned:
+            yield
+            return
+        sem.acquire()
+        with self._cond:
+            if me in self._abandoned:
+                # 기다리는 동안 반납됨 -> 바로 돌려주고 제한 없이 진행
+                sem.release()
+                sem = None
+            else:
+                self._held.setdefault(me, []).append(name)
+        try:
+            yield
+        finally:
+            if sem is not None:
+                with self._cond:
+                    held = self._held.get(me, [])
+                    mine = name in held
+                    if mine:
+                        held.remove(name)
+                        if not held:
+                            self._held.pop(me, None)
+                if mine:
+                    sem.release()
+
+    # --- 내부 ---
+
+    def _position_locked(self, job_id: str) -> Optional[int]:
+        """힙을 정렬하지 않고 (priority, seq) 가 앞서는 항목 수를 셈 (O(n), 복사 없음)"""
+        entry = next((item[:2] for item in self._heap if item[2] == job_id), None)
+        if entry is None:
+            return None
+        return sum(1 for item in self._heap if item[:2] < entry)
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive() and t not in self._abandoned]
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker_loop, name=f"train-worker-{len(self._threads)}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job_id, fn, args, kwargs = heapq.heappop(self._heap)
+                self._running[job_id] = time.time()
+                self._owners[job_id] = threading.current_thread()
+
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"❌ Scheduled job {job_id} crashed: {e}")
+            finally:
+                with self._cond:
+                    me = threading.current_thread()
+                    abandoned = me in self._abandoned
+                    self._abandoned.discard(me)
+                    if not abandoned:
+                        self._owners.pop(job_id, None)
+                        self._record_duration(self._running.pop(job_id, None))
+            if abandoned:
+                return  # 슬롯은 이미 다른 워커 스레드가 이어받음
+
+    def _record_duration(self, started: Optional[float]):
+        if started is None:
+            return
+        elapsed = time.time() - started
+        if self._avg_duration is None:
+            self._avg_duration = elapsed
+        else:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+
+
+_scheduler = None
+
+def get_scheduler() -> TrainingScheduler:
+    """프로세스 단위 스케줄러 싱글톤"""
+    global _scheduler
+    if _scheduler is None:
+        inference = settings.STAGE_CONCURRENCY_INFERENCE
+        if settings.INFERENCE_MODE == "process":
+            # 모델 서버 워커 수만큼은 동시에 추론을 보낼 수 있음
+            inference = max(inference, settings.INFERENCE_WORKERS)
+        _scheduler = TrainingScheduler(
+            workers=settings.TRAIN_WORKERS,
+            max_queue=settings.TRAIN_QUEUE_MAX,
+            stage_limits={
+                "download": settings.STAGE_CONCURRENCY_DOWNLOAD,
+                "preprocess": settings.STAGE_CONCURRENCY_PREPROCESS,
+                "inference": inference,
+                "upload": settings.STAGE_CONCURRENCY_UPLOAD,
+                "synthesize": settings.STAGE_CONCURRENCY_SYNTH,
+            },
+            max_abandoned=settings.TRAIN_MAX_ABANDONED_WORKERS,
+        )
+    return _scheduler
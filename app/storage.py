@@ -1,21 +1,112 @@
-import os, mimetypes
+import os, mimetypes, hashlib, time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import boto3
+from typing import List, Optional, Tuple
+
+from .core.config import settings
+from . import cancellation
 
 _s3 = None
+_transfer_config = None
 
 def s3():
     global _s3
     if _s3 is None:
-        _s3 = boto3.client("s3")
+        import boto3
+        from botocore.config import Config
+        # 업로드 스레드들이 공유하는 커넥션 풀 (multipart 동시 전송 수만큼 확보)
+        config = Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={"max_attempts": 5, "mode": "adaptive"},
+        )
+        _s3 = boto3.client("s3", endpoint_url=settings.S3_ENDPOINT_URL or None, config=config)
     return _s3
 
-def upload_to_s3(local: Path, bucket: str, key: str, public: bool = True) -> str:
+def transfer_config():
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        mb = 1024 * 1024
+        _transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * mb,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * mb,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+    return _transfer_config
+
+def file_sha256(local: Path) -> str:
+    h = hashlib.sha256()
+    with open(local, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def remote_sha256(bucket: str, key: str) -> Optional[str]:
+    """객체 메타데이터에 기록해 둔 sha256 (없거나 객체가 없으면 None)"""
+    from botocore.exceptions import ClientError
+    try:
+        head = s3().head_object(Bucket=bucket, Key=key)
+    except ClientError:
+        return None
+    return head.get("Metadata", {}).get("sha256")
+
+def is_not_found(error: Exception) -> bool:
+    """S3 에 객체가 없다는 오류인지 (권한/네트워크/스로틀링 등 다른 오류와 구분)"""
+    from botocore.exceptions import ClientError
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+def upload_with_stats(local: Path, bucket: str, key: str, public: bool = True,
+                      control: Optional[cancellation.JobControl] = None) -> dict:
+    """
+    업로드 + 전송 통계. 같은 내용이 이미 올라가 있으면 (HEAD 의 sha256 메타데이터 비교) 건너뜀
+    multipart ETag 는 내용 해시가 아니므로 ETag 대신 sha256 메타데이터를 비교
+    control(Job) 이 주어지면 전송 청크마다 취소/제한 시간 확인 (취소되면 전송 중단)
+    """
+    started = time.time()
+    size = local.stat().st_size
+    digest = file_sha256(local)
+    uri = f"s3://{bucket}/{key}"
+
+    if settings.S3_SKIP_UNCHANGED and remote_sha256(bucket, key) == digest:
+        print(f"⏭️  Unchanged, skipped upload: {uri}")
+        return {"uri": uri, "key": key, "sha256": digest, "bytes": size, "skipped": True,
+                "seconds": round(time.time() - started, 3), "bytesPerSec": None}
+
     ct, _ = mimetypes.guess_type(str(local))
-    extra = {"ContentType": ct or "application/octet-stream"}
-    s3().upload_file(str(local), bucket, key, ExtraArgs=extra)
+    extra = {"ContentType": ct or "application/octet-stream", "Metadata": {"sha256": digest}}
+    cancellation.checkpoint(control)
+    progress = (lambda _: control.check()) if control is not None else None
+    upload_started = time.time()
+    s3().upload_file(str(local), bucket, key, ExtraArgs=extra, Config=transfer_config(), Callback=progress)
     # Note: ACL operations removed - bucket should have public read policy configured instead
-    return f"s3://{bucket}/{key}"
+    elapsed = time.time() - upload_started
+    return {"uri": uri, "key": key, "sha256": digest, "bytes": size, "skipped": False,
+            "seconds": round(time.time() - started, 3),
+            "bytesPerSec": int(size / elapsed) if elapsed > 0 else None}
+
+def upload_to_s3(local: Path, bucket: str, key: str, public: bool = True) -> str:
+    return upload_with_stats(local, bucket, key, public=public)["uri"]
+
+def upload_many(items: List[Tuple[Path, str, str, bool]]) -> List[dict]:
+    """(local, bucket, key, public) 들을 동시에 업로드. 결과는 입력 순서"""
+    control = cancellation.current()  # 업로드 스레드에는 Job 이 연결돼 있지 않으므로 넘겨줌
+    if len(items) <= 1:
+        return [upload_with_stats(*item, control=control) for item in items]
+    with ThreadPoolExecutor(max_workers=len(items)) as pool:
+        return list(pool.map(lambda item: upload_with_stats(*item, control=control), items))
+
+def download_from_s3(bucket: str, key: str, local: Path) -> Path:
+    local.parent.mkdir(parents=True, exist_ok=True)
+    s3().download_file(bucket, key, str(local), Config=transfer_config())
+    return local
+
+def copy_in_s3(src_bucket: str, src_key: str, dst_bucket: str, dst_key: str) -> str:
+    """서버 측 복사 (바이트를 다시 올리지 않음)"""
+    s3().copy({"Bucket": src_bucket, "Key": src_key}, dst_bucket, dst_key, Config=transfer_config())
+    return f"s3://{dst_bucket}/{dst_key}"
 
 def public_url(bucket: str, key: str) -> str:
     base = os.getenv("PUBLIC_BASE_URL")
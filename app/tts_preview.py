@@ -1,45 +1,260 @@
 import os
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from TTS.api import TTS
-import torch
-from TTS.tts.configs.xtts_config import XttsConfig
-# Import the classes that need to be allowlisted
-from TTS.tts.models.xtts import XttsAudioConfig, XttsArgs
-from TTS.config.shared_configs import BaseDatasetConfig
-try:
-    from TTS.tts.models.xtts import Xtts
-    from TTS.tts.layers.xtts.gpt import GPT
-    from TTS.tts.layers.xtts.hifigan_decoder import HifiDecoder
-    from TTS.vocoder.models.hifigan import HifiganConfig
-    xtts_classes = [Xtts, GPT, HifiDecoder, HifiganConfig]
-except ImportError:
-    xtts_classes = []
-
-# Add ALL necessary classes to the list of safe globals for torch.load
-torch.serialization.add_safe_globals([
-    XttsConfig,
-    XttsAudioConfig,
-    XttsArgs,
-    BaseDatasetConfig
-] + xtts_classes)
+from typing import Iterator, List, Optional, Tuple, Union
+import numpy as np
+import soundfile as sf
+
+from .core.config import settings
+from .audio import load_xtts_latents
+from . import accel, cancellation, model_server
 
 # Set the environment variable to agree to the Coqui TTS license
 os.environ["COQUI_TOS_AGREED"] = "1"
 
+def _allowlist_xtts_classes():
+    """torch.load 가 XTTS 체크포인트를 읽을 수 있도록 safe globals 등록 (모델 로드 직전에만 import)"""
+    import torch
+    from TTS.tts.configs.xtts_config import XttsConfig
+    # Import the classes that need to be allowlisted
+    from TTS.tts.models.xtts import XttsAudioConfig, XttsArgs
+    from TTS.config.shared_configs import BaseDatasetConfig
+    try:
+        from TTS.tts.models.xtts import Xtts
+        from TTS.tts.layers.xtts.gpt import GPT
+        from TTS.tts.layers.xtts.hifigan_decoder import HifiDecoder
+        from TTS.vocoder.models.hifigan import HifiganConfig
+        xtts_classes = [Xtts, GPT, HifiDecoder, HifiganConfig]
+    except ImportError:
+        xtts_classes = []
+
+    # Add ALL necessary classes to the list of safe globals for torch.load
+    torch.serialization.add_safe_globals([
+        XttsConfig,
+        XttsAudioConfig,
+        XttsArgs,
+        BaseDatasetConfig
+    ] + xtts_classes)
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+XTTS_OUTPUT_SAMPLE_RATE = 24000
+
 # 첫 로드가 무거우므로, 프로세스 단위로 1회만 로딩
 _tts_singleton = None
 
 def get_tts():
     global _tts_singleton
     if _tts_singleton is None:
+        from TTS.api import TTS
+        _allowlist_xtts_classes()
         # GPU 사용 안 하려면 gpu=False
-        _tts_singleton = TTS(model_name="tts_models/multilingual/multi-dataset/xtts_v2",
+        _tts_singleton = TTS(model_name=XTTS_MODEL_NAME,
                              progress_bar=False, gpu=False)
+        accel.accelerate_tts(_tts_singleton)
     return _tts_singleton
 
-def synth_preview(ref_wav: Path, out_wav: Path, text: str, lang: str = "ko"):
-    tts = get_tts()
+class LatentCache:
+    """
+    latent_key(voiceFileId, 모델 파일) -> (gpt_cond_latent, speaker_embedding) LRU 캐시
+    항목 개수가 아니라 배열 바이트 합계(max_bytes)로 크기를 제한
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, latents: Tuple[np.ndarray, np.ndarray]):
+        size = sum(a.nbytes for a in latents)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= sum(a.nbytes for a in old)
+            self._items[key] = latents
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= sum(a.nbytes for a in evicted)
+
+
+_latent_cache = None
+
+def get_latent_cache() -> LatentCache:
+    global _latent_cache
+    if _latent_cache is None:
+        _latent_cache = LatentCache(settings.XTTS_LATENT_CACHE_MB * 1024 * 1024)
+    return _latent_cache
+
+
+def compute_conditioning_latents(ref: Union[Path, np.ndarray], sr: int = 16000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    참조 음성(파일 경로 또는 sr 샘플레이트의 float32 버퍼)
+    -> XTTS 조건 잠재벡터(gpt_cond_latent, speaker_embedding)
+    학습 시 1회만 계산해 모델 파일에 저장하고, 이후 합성은 이 값을 재사용
+    """
+    if model_server.enabled():
+        return model_server.get_model_pool().conditioning_latents(ref, sr)
+    return _compute_conditioning_latents_local(ref, sr)
+
+
+def _compute_conditioning_latents_local(ref, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+    import torch
+    import librosa
+    model = get_tts().synthesizer.tts_model
+    cfg = model.config
+    if isinstance(ref, (str, Path)):
+        gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(
+            audio_path=[str(ref)],
+            gpt_cond_len=cfg.gpt_cond_len,
+            gpt_cond_chunk_len=cfg.gpt_cond_chunk_len,
+            max_ref_length=cfg.max_ref_len,
+            sound_norm_refs=cfg.sound_norm_refs,
+        )
+        return gpt_cond_latent.cpu().numpy(), speaker_embedding.cpu().numpy()
+
+    # 메모리 버퍼: Xtts.get_conditioning_latents 와 같은 처리를 파일 로드 없이 수행
+    load_sr = 22050
+    audio = librosa.resample(np.asarray(ref, dtype=np.float32), orig_sr=sr, target_sr=load_sr)
+    audio = torch.from_numpy(audio).unsqueeze(0)[:, : load_sr * cfg.max_ref_len]
+    if cfg.sound_norm_refs:
+        audio = (audio / torch.abs(audio).max()) * 0.75
+    with torch.inference_mode():
+        speaker_embedding = model.get_speaker_embedding(audio, load_sr)
+        gpt_cond_latent = model.get_gpt_cond_latents(
+            audio, load_sr, length=cfg.gpt_cond_len, chunk_length=cfg.gpt_cond_chunk_len
+        )
+    return gpt_cond_latent.cpu().numpy(), speaker_embedding.cpu().numpy()
+
+
+def latent_key(voice_file_id: str, model_path: Path) -> str:
+    """
+    잠재벡터 캐시 키: voiceFileId + 모델 파일의 mtime/크기
+    다시 학습해 모델 파일이 바뀌면 키가 달라지므로 이전 잠재벡터를 쓰지 않음
+    """
+    st = Path(model_path).stat()
+    return f"{voice_file_id}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def get_voice_latents(voice_file_id: str, model_path: Optional[Path] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """캐시 -> 로컬 모델 파일 순으로 저장된 조건 잠재벡터를 찾음 (캐시는 그 모델 파일 기준)"""
+    if model_path is None or not Path(model_path).exists():
+        return None
+    key = latent_key(voice_file_id, model_path)
+    cache = get_latent_cache()
+    latents = cache.get(key)
+    if latents is not None:
+        return latents
+    latents = load_xtts_latents(Path(model_path))
+    if latents is not None:
+        cache.put(key, latents)
+    return latents
+
+
+def synth_with_latents(latents: Tuple[np.ndarray, np.ndarray], out_wav: Path, text: str, lang: str = "ko") -> Path:
+    """
+    저장된 조건 잠재벡터로 합성 (참조 음성 재인코딩 없음)
+    문장 단위로 나눠 합성하고 이어 붙임 (XTTS 의 text splitting 과 같은 방식).
+    문장 사이마다 Job 취소/제한 시간 확인
+    """
+    parts = []
+    for sentence in split_sentences(text) or [text]:
+        cancellation.checkpoint()
+        if model_server.enabled():
+            parts.append(model_server.get_model_pool().call("synthesize", latents=latents, text=sentence, lang=lang))
+        else:
+            parts.append(_synthesize_local(latents, sentence, lang))
+    wav = np.concatenate(parts) if len(parts) > 1 else parts[0]
     out_wav.parent.mkdir(parents=True, exist_ok=True)
-    # speaker_wav 하나만 넘겨 빠르게 합성 (임베딩 직접 주입은 API 내부 처리)
-    tts.tts_to_file(text=text, speaker_wav=str(ref_wav), language=lang, file_path=str(out_wav))
-    return out_wav
\ No newline at end of file
+    sf.write(str(out_wav), wav, XTTS_OUTPUT_SAMPLE_RATE)
+    return out_wav
+
+
+def _synthesize_local(latents: Tuple[np.ndarray, np.ndarray], text: str, lang: str) -> np.ndarray:
+    import torch
+    model = get_tts().synthesizer.tts_model
+    cfg = model.config
+    gpt_cond_latent, speaker_embedding = (torch.from_numpy(a) for a in latents)
+    with torch.inference_mode():
+        out = model.inference(
+            text,
+            lang,
+            gpt_cond_latent,
+            speaker_embedding,
+            temperature=cfg.temperature,
+            length_penalty=cfg.length_penalty,
+            repetition_penalty=cfg.repetition_penalty,
+            top_k=cfg.top_k,
+            top_p=cfg.top_p,
+            enable_text_splitting=True,
+        )
+    return np.asarray(out["wav"], dtype=np.float32).squeeze()
+
+
+# 문장 단위 분할 (한국어/영어 종결부호 + 줄바꿈)
+_SENTENCE_RE = re.compile(r"[^.!?。！？\n]+[.!?。！？]*")
+
+def split_sentences(text: str, max_chars: int = 200) -> List[str]:
+    """긴 텍스트를 문장 단위로 자르고, 너무 긴 문장은 공백 기준으로 다시 자름"""
+    sentences = []
+    for m in _SENTENCE_RE.finditer(text):
+        sent = m.group().strip()
+        while len(sent) > max_chars:
+            cut = sent.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sent[:cut].strip())
+            sent = sent[cut:].strip()
+        if sent:
+            sentences.append(sent)
+    return sentences
+
+
+def synth_stream(latents: Tuple[np.ndarray, np.ndarray], text: str, lang: str = "ko",
+                 stream_chunk_size: int = 20) -> Iterator[np.ndarray]:
+    """
+    XTTS 스트리밍 추론. 문장 단위로 나눠 생성되는 대로 float32 오디오 청크를 yield
+    (샘플레이트는 output_sample_rate())
+    """
+    if model_server.enabled():
+        return model_server.get_model_pool().stream(
+            "synth_stream", latents=latents, text=text, lang=lang, stream_chunk_size=stream_chunk_size
+        )
+    return _synth_stream_local(latents, text, lang, stream_chunk_size)
+
+
+def _synth_stream_local(latents: Tuple[np.ndarray, np.ndarray], text: str, lang: str,
+                        stream_chunk_size: int) -> Iterator[np.ndarray]:
+    import torch
+    model = get_tts().synthesizer.tts_model
+    cfg = model.config
+    gpt_cond_latent, speaker_embedding = (torch.from_numpy(a) for a in latents)
+    for sentence in split_sentences(text):
+        chunks = model.inference_stream(
+            sentence,
+            lang,
+            gpt_cond_latent,
+            speaker_embedding,
+            stream_chunk_size=stream_chunk_size,
+            temperature=cfg.temperature,
+            length_penalty=cfg.length_penalty,
+            repetition_penalty=cfg.repetition_penalty,
+            top_k=cfg.top_k,
+            top_p=cfg.top_p,
+        )
+        for chunk in chunks:
+            yield chunk.cpu().numpy().astype(np.float32).reshape(-1)
+
+
+def output_sample_rate() -> int:
+    return XTTS_OUTPUT_SAMPLE_RATE
@@ -0,0 +1,75 @@
+"""
+에너지 기반 음성 구간 검출(VAD) + 고정 길이 윈도우 분할
+
+긴 녹음을 통째로 ECAPA 에 넣지 않고, 말소리 구간만 모아 일정 길이 윈도우로 잘라
+배치 단위로 임베딩한다 (audio.compute_speaker_embedding 의 윈도우 모드).
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+
+def energy_vad(audio: np.ndarray, sr: int = 16000, frame_ms: float = 30.0,
+               min_speech_ms: float = 250.0, hangover_ms: float = 200.0) -> List[Tuple[int, int]]:
+    """
+    프레임 RMS 에너지(dB)로 말소리 구간 [(start, end), ...] (샘플 단위)
+    - 임계값: 잡음 바닥(하위 10%) + 12dB 와 최대값 - 35dB 중 큰 값
+    - hangover 만큼 구간을 늘려 어미/자음이 잘리지 않게 하고, 너무 짧은 구간은 버림
+    """
+    frame = max(1, int(sr * frame_ms / 1000))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    db = 10 * np.log10(np.mean(frames.astype(np.float32) ** 2, axis=1) + 1e-10)
+    threshold = max(np.percentile(db, 10) + 12.0, db.max() - 35.0)
+    speech = db > threshold
+
+    # hangover: 말소리 프레임 앞뒤로 구간 확장 (1차원 팽창)
+    pad = int(hangover_ms / frame_ms)
+    if pad > 0 and speech.any():
+        kernel = np.ones(2 * pad + 1, dtype=np.int32)
+        speech = np.convolve(speech.astype(np.int32), kernel, mode="same") > 0
+
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    min_frames = max(1, int(min_speech_ms / frame_ms))
+    return [(int(s) * frame, min(len(audio), int(e) * frame))
+            for s, e in zip(starts, ends) if e - s >= min_frames]
+
+
+def speech_windows(signal: np.ndarray, sr: int, window_seconds: float) -> List[np.ndarray]:
+    """
+    말소리 구간만 이어 붙인 뒤 window_seconds 길이로 자른 윈도우 목록
+    (마지막 자투리는 윈도우 절반 이상일 때만 포함, 전체가 한 윈도우보다 짧으면 통째로 1개)
+    """
+    segments = energy_vad(signal, sr)
+    if not segments:
+        return []
+    speech = np.concatenate([signal[s:e] for s, e in segments])
+    win = int(window_seconds * sr)
+    if len(speech) <= win:
+        return [speech]
+    windows = [speech[i:i + win] for i in range(0, len(speech) - win + 1, win)]
+    tail = len(speech) % win
+    if tail >= win // 2:
+        windows.append(speech[-win:])  # 끝에서 한 윈도우 (고정 길이 유지, 일부 겹침)
+    return windows
+
+
+def spread_order(count: int) -> List[int]:
+    """
+    녹음 전체에 고르게 퍼지는 처리 순서 (0, 1/2, 1/4, 3/4, ... 지점)
+    조기 종료해도 앞부분에만 치우친 평균이 되지 않도록 함
+    """
+    order, seen = [], set()
+    step = 1.0
+    while len(order) < count:
+        for k in np.arange(0.0, 1.0, step):
+            i = min(count - 1, int(k * count))
+            if i not in seen:
+                seen.add(i)
+                order.append(i)
+        step /= 2
+    return order
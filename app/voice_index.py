@@ -0,0 +1,311 @@
+"""
+학습된 목소리 임베딩 유사도 인덱스 (중복/사칭 탐지)
+
+모든 ECAPA 임베딩(L2 정규화)을 하나의 연속 행렬 파일에 모아 두고 np.memmap 으로 읽는다.
+
+    {VOICE_INDEX_DIR}/
+        meta.json         dim, dtype, IVF 빌드 정보
+        vectors.bin       [N, dim] float32 | float16 (행 단위 append)
+        ids.txt           i 번째 줄 = i 번째 행의 voiceFileId
+        ivf_*.npy         (행이 많을 때) 거친 양자화기: centroid / 리스트별 행 번호 / 리스트 오프셋
+
+- 정규화된 벡터라 cosine 유사도 = 내적, top-k 는 행렬곱 한 번 + argpartition
+- 행 수가 VOICE_INDEX_IVF_THRESHOLD 이상이면 IVF: nprobe 개 리스트 + 빌드 이후 추가된 꼬리 행만 스캔
+- 여러 프로세스가 같은 디렉터리를 써도 쓰기는 flock 으로 직렬화, 읽기는 파일 크기로 변경 감지
+"""
+import fcntl
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .artifact import find_model_file, load_voice_model
+from .core.config import settings
+
+_SCAN_CHUNK_ROWS = 65536  # float16 행렬은 이 단위로 float32 로 올려 계산
+
+
+def _normalize(vec: np.ndarray) -> np.ndarray:
+    vec = np.asarray(vec, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+class VoiceIndex:
+    def __init__(self, root: Path, dtype: str = "float32", ivf_threshold: int = 1_000_000, nprobe: int = 16):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._vec_path = self.root / "vectors.bin"
+        self._ids_path = self.root / "ids.txt"
+        self._meta_path = self.root / "meta.json"
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._ids_offset = 0
+        self._mat: Optional[np.ndarray] = None
+        self._meta_mtime = None
+        self._ivf = None  # (centroids, order, offsets, built_rows)
+        self._building = False
+
+        if self._meta_path.exists():
+            self.meta = json.loads(self._meta_path.read_text())
+            if self.meta["dtype"] != dtype:
+                print(f"⚠️  Voice index at {self.root} is {self.meta['dtype']}; ignoring VOICE_INDEX_DTYPE={dtype}")
+        else:
+            self.meta = {"dim": None, "dtype": dtype, "ivfBuiltRows": 0}
+        self.dtype = np.dtype(self.meta["dtype"])
+
+    # --- 파일 동기화 ---
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.root / ".lock", "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _write_meta(self):
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.meta))
+        tmp.replace(self._meta_path)
+
+    def _refresh(self):
+        """다른 프로세스가 추가한 행/ID 와 새 IVF 빌드를 반영"""
+        if self._meta_path.exists():
+            mtime = self._meta_path.stat().st_mtime_ns
+            if mtime != self._meta_mtime:
+                self._meta_mtime = mtime
+                self.meta = json.loads(self._meta_path.read_text())
+                self._ivf = None
+        if self._ids_path.exists() and self._ids_path.stat().st_size > self._ids_offset:
+            with open(self._ids_path, "r", encoding="utf-8") as f:
+                f.seek(self._ids_offset)
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # 쓰는 중인 줄
+                    self._rows[line[:-1]] = len(self._ids)
+                    self._ids.append(line[:-1])
+                    self._ids_offset += len(line.encode("utf-8"))
+
+        dim = self.meta["dim"]
+        n = 0
+        if dim and self._vec_path.exists():
+            n = min(self._vec_path.stat().st_size // (dim * self.dtype.itemsize), len(self._ids))
+        if n == 0:
+            self._mat = None
+        elif self._mat is None or len(self._mat) != n:
+            self._mat = np.memmap(self._vec_path, dtype=self.dtype, mode="r", shape=(n, dim))
+
+        if self._ivf is None and self.meta.get("ivfBuiltRows"):
+            self._ivf = (
+                np.load(self.root / "ivf_centroids.npy"),
+                np.load(self.root / "ivf_order.npy", mmap_mode="r"),
+                np.load(self.root / "ivf_offsets.npy"),
+                self.meta["ivfBuiltRows"],
+            )
+
+    # --- 추가 / 조회 ---
+
+    def add(self, voice_file_id: str, embedding: np.ndarray):
+        """임베딩 추가. 같은 voiceFileId 를 다시 학습하면 해당 행을 덮어씀"""
+        emb = _normalize(embedding)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.meta["dim"] is None:
+                self.meta["dim"] = int(emb.shape[0])
+                self._write_meta()
+            dim = self.meta["dim"]
+            if emb.shape[0] != dim:
+                raise ValueError(f"embedding dim {emb.shape[0]} != index dim {dim}")
+            data = emb.astype(self.dtype)
+            row = self._rows.get(voice_file_id)
+            if row is not None:
+                # 기존 행 덮어쓰기 (IVF 리스트 배정은 다음 빌드 때 갱신)
+                mm = np.memmap(self._vec_path, dtype=self.dtype, mode="r+", offset=row * dim * self.dtype.itemsize,
+                               shape=(dim,))
+                mm[:] = data
+                mm.flush()
+                del mm
+            else:
+                row_bytes = dim * self.dtype.itemsize
+                with open(self._vec_path, "ab") as f:
+                    # ids 를 쓰기 전에 죽은 이전 append 가 남긴 행 정리
+                    f.truncate(len(self._ids) * row_bytes)
+                    f.write(data.tobytes())
+                with open(self._ids_path, "a", encoding="utf-8") as f:
+                    f.write(voice_file_id + "\n")
+            self._refresh()
+            self._maybe_rebuild_ivf()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return 0 if self._mat is None else len(self._mat)
+
+    def get(self, voice_file_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(voice_file_id)
+            if row is None or self._mat is None or row >= len(self._mat):
+                return None
+            return np.asarray(self._mat[row], dtype=np.float32)
+
+    def search(self, query: np.ndarray, k: int = 5, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """cosine 유사도 상위 k 개 (voiceFileId, score). exclude 는 결과에서 제외 (자기 자신)"""
+        q = _normalize(query)
+        with self._lock:
+            self._refresh()
+            mat, ids, ivf = self._mat, self._ids, self._ivf
+        if mat is None:
+            return []
+        if q.shape[0] != mat.shape[1]:
+            raise ValueError(f"query dim {q.shape[0]} != index dim {mat.shape[1]}")
+
+        if ivf is not None and len(mat) >= self.ivf_threshold:
+            rows = self._ivf_candidates(ivf, q, len(mat))
+            scores = self._scan(mat[rows], q)
+        else:
+            rows = None
+            scores = self._scan(mat, q)
+        if len(scores) == 0:
+            return []
+
+        want = min(len(scores), k + (1 if exclude else 0))
+        top = np.argpartition(-scores, want - 1)[:want]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for i in top:
+            voice_id = ids[int(rows[i] if rows is not None else i)]
+            if voice_id != exclude:
+                results.append((voice_id, float(scores[i])))
+        return results[:k]
+
+    def _scan(self, mat: np.ndarray, q: np.ndarray) -> np.ndarray:
+        if mat.dtype == np.float32:
+            return mat @ q  # BLAS 행렬-벡터 곱 한 번
+        out = np.empty(len(mat), dtype=np.float32)
+        for start in range(0, len(mat), _SCAN_CHUNK_ROWS):
+            out[start:start + _SCAN_CHUNK_ROWS] = mat[start:start + _SCAN_CHUNK_ROWS].astype(np.float32) @ q
+        return out
+
+    def _ivf_candidates(self, ivf, q: np.ndarray, n: int) -> np.ndarray:
+        centroids, order, offsets, built_rows = ivf
+        probe = np.argsort(-(centroids @ q))[: self.nprobe]
+        parts = [np.asarray(order[offsets[c]:offsets[c + 1]]) for c in probe]
+        parts.append(np.arange(built_rows, n))  # 빌드 이후 추가된 행은 전수 스캔
+        return np.sort(np.concatenate(parts))
+
+    # --- IVF (거친 양자화기) ---
+
+    def _maybe_rebuild_ivf(self):
+        n = 0 if self._mat is None else len(self._mat)
+        built = self.meta.get("ivfBuiltRows", 0)
+        if n < self.ivf_threshold or self._building:
+            return
+        if built and n - built < 0.1 * built:
+            return  # 꼬리가 10% 를 넘을 때만 다시 빌드
+        self._building = True
+        threading.Thread(target=self._build_ivf_safe, name="voice-index-ivf", daemon=True).start()
+
+    def _build_ivf_safe(self):
+        try:
+            self.build_ivf()
+        except Exception as e:
+            print(f"⚠️  Voice index IVF build failed: {e}")
+        finally:
+            self._building = False
+
+    def build_ivf(self, iterations: int = 10, seed: int = 0):
+        """구면 k-means 로 centroid 학습 후 전체 행을 리스트에 배정"""
+        with self._lock:
+            self._refresh()
+            mat = self._mat
+        if mat is None:
+            return
+        n = len(mat)
+        nlist = max(1, min(n, int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(mat[np.sort(rng.choice(n, size=min(n, nlist * 64), replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, _SCAN_CHUNK_ROWS):
+            block = np.asarray(mat[start:start + _SCAN_CHUNK_ROWS], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(nlist + 1)).astype(np.int64)
+
+        with self._lock, self._file_lock():
+            for name, arr in (("centroids", centroids), ("order", order), ("offsets", offsets)):
+                tmp = self.root / f"ivf_{name}.tmp.npy"
+                np.save(tmp, arr)
+                tmp.replace(self.root / f"ivf_{name}.npy")
+            self.meta = json.loads(self._meta_path.read_text())
+            self.meta.update(ivfBuiltRows=n, ivfLists=nlist)
+            self._write_meta()
+            self._ivf = None
+            self._refresh()
+        print(f"🗂️  Built voice index IVF: {n} rows, {nlist} lists")
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "voices": 0 if self._mat is None else len(self._mat),
+                "dim": self.meta["dim"],
+                "dtype": self.dtype.name,
+                "ivfBuiltRows": self.meta.get("ivfBuiltRows", 0),
+                "ivfLists": self.meta.get("ivfLists"),
+                "mode": "ivf" if self._ivf is not None and self._mat is not None
+                        and len(self._mat) >= self.ivf_threshold else "exact",
+            }
+
+
+def backfill(index: VoiceIndex, models_root: Path) -> int:
+    """기존 {models_root}/{voiceFileId}/model.avm|model.npz 들을 인덱스에 추가 (최초 도입 시 1회)"""
+    added = 0
+    for model_dir in sorted(p for p in Path(models_root).iterdir() if p.is_dir()):
+        model_path = find_model_file(model_dir)
+        if model_path is None:
+            continue
+        index.add(model_dir.name, load_voice_model(model_path).embedding)
+        added += 1
+    return added
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_voice_index() -> VoiceIndex:
+    """프로세스 단위 목소리 인덱스 싱글톤"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VoiceIndex(
+                    Path(settings.VOICE_INDEX_DIR),
+                    dtype=settings.VOICE_INDEX_DTYPE,
+                    ivf_threshold=settings.VOICE_INDEX_IVF_THRESHOLD,
+                    nprobe=settings.VOICE_INDEX_NPROBE,
+                )
+    return _index
+
+
+if __name__ == "__main__":
+    import sys
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("/data/models")
+    print(f"✅ Backfilled {backfill(get_voice_index(), root)} voices into {settings.VOICE_INDEX_DIR}")
@@ -0,0 +1,297 @@
+"""
+Job 작업 공간(scratch) + 로컬 모델 캐시 디스크 관리
+
+    {DATA_DIR}/
+        work/{job_id}/         Job 마다 하나. raw/ prep/ out/ (+ 잠금 파일 .lock)
+        models/{voiceFileId}/  업로드가 끝난 모델 파일 (로컬 캐시, S3 에 원본이 있음)
+        debug/{job_id}/        INGEST_PERSIST_DEBUG 일 때 끝난 작업 공간을 옮겨 둠
+
+- 작업 공간은 Job 이 끝나면 (성공/실패 모두) 바로 삭제
+- WORKSPACE_TMPFS 면 작업 공간을 tmpfs(/dev/shm) 에 만들어 I/O 지연을 줄임. WORKSPACE_TMPFS_MAX_MB 를
+  넘길 것 같으면 그 Job 은 디스크에 만듦
+- 로컬 모델 캐시 + 디스크 작업 공간이 WORKSPACE_QUOTA_MB 를 넘으면 오래 안 쓴 모델부터 삭제 (LRU,
+  디렉터리 mtime 기준. 합성 때 읽으면 touch). 지워진 모델은 필요할 때 S3 에서 다시 받음
+- 작업 공간은 살아 있는 동안 .lock 에 flock 을 잡고 있음. 기동 시 잠금을 잡을 수 있는(= 주인이 죽은)
+  작업 공간과 예전 레이아웃의 raw/ prep/ out/ 을 정리
+"""
+import fcntl
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core.config import settings
+
+_MB = 1024 * 1024
+_LEGACY_SCRATCH = ("raw", "prep", "out")
+
+
+def _du(path: Path) -> int:
+    """디렉터리 아래 파일 크기 합 (없으면 0)"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass  # 도중에 지워진 파일
+    return total
+
+
+class Workspace:
+    """Job 하나의 작업 공간"""
+
+    def __init__(self, job_id: str, path: Path, on_tmpfs: bool):
+        self.job_id = job_id
+        self.path = path
+        self.on_tmpfs = on_tmpfs
+        self.raw = path / "raw"
+        self.prep = path / "prep"
+        self.out = path / "out"
+        self.model = path / "model"
+        self._lock_file = None
+
+    def _open(self):
+        for d in (self.raw, self.prep, self.out, self.model):
+            d.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.path / ".lock", "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _close(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # flock 도 함께 풀림
+            self._lock_file = None
+
+
+class WorkspaceManager:
+    # 디스크 사용량 전체 스캔 주기 (그 사이에는 추가/삭제분만 반영)
+    scan_interval = 60.0
+    # 방금 쓰거나 읽은 모델은 축출하지 않음 (다른 프로세스가 사용 중일 수 있음)
+    min_idle_seconds = 60.0
+
+    def __init__(self, data_root: Path, quota_bytes: int, tmpfs_root: Optional[Path] = None,
+                 tmpfs_max_bytes: int = 0, job_reserve_bytes: int = 0):
+        self.data_root = Path(data_root)
+        self.models_root = self.data_root / "models"
+        self.disk_root = self.data_root / "work"
+        self.debug_root = self.data_root / "debug"
+        self.tmpfs_root = Path(tmpfs_root) if tmpfs_root else None
+        self.quota_bytes = quota_bytes
+        self.tmpfs_max_bytes = tmpfs_max_bytes
+        self.job_reserve_bytes = job_reserve_bytes
+        for d in (self.models_root, self.disk_root):
+            d.mkdir(parents=True, exist_ok=True)
+        if self.tmpfs_root is not None:
+            try:
+                self.tmpfs_root.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️  tmpfs workspace {self.tmpfs_root} unavailable, using disk: {e}")
+                self.tmpfs_root = None
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._models_bytes = 0
+        self._model_count = 0
+        self._scanned_at = 0.0
+        self.evictions = 0
+        self.swept = 0
+
+    # --- 작업 공간 ---
+
+    def _choose_root(self) -> Tuple[Path, bool]:
+        if self.tmpfs_root is not None:
+            used = _du(self.tmpfs_root)
+            # 컨테이너의 /dev/shm 자체가 작을 수 있음 (docker 기본 64MB, --shm-size 로 조절)
+            free = shutil.disk_usage(self.tmpfs_root).free
+            if used + self.job_reserve_bytes <= self.tmpfs_max_bytes and free >= self.job_reserve_bytes:
+                return self.tmpfs_root, True
+            print(f"⚠️  tmpfs workspace full ({used // _MB}MB), using disk")
+        return self.disk_root, False
+
+    @contextmanager
+    def workspace(self, job_id: str, keep: bool = False):
+        """Job 작업 공간. 블록이 끝나면 (예외여도) 삭제. keep 이면 debug/ 로 옮겨 둠"""
+        root, on_tmpfs = self._choose_root()
+        ws = Workspace(job_id, root / job_id, on_tmpfs)
+        ws._open()
+        try:
+            yield ws
+        finally:
+            ws._close()
+            try:
+                if keep:
+                    self.debug_root.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(ws.path), str(self.debug_root / job_id))
+                else:
+                    shutil.rmtree(ws.path, ignore_errors=True)
+            except Exception as e:
+                print(f"⚠️  Failed to clean up workspace {ws.path}: {e}")
+
+    # --- 로컬 모델 캐시 ---
+
+    def model_dir(self, voice_file_id: str) -> Path:
+        return self.models_root / voice_file_id
+
+    def touch(self, voice_file_id: str):
+        """모델을 읽었음을 기록 (LRU)"""
+        try:
+            os.utime(self.model_dir(voice_file_id))
+        except OSError:
+            pass
+
+    def keep_model(self, voice_file_id: str, model_file: Path) -> Path:
+        """업로드가 끝난 모델 파일을 작업 공간에서 로컬 모델 캐시로 옮기고 할당량 확인"""
+        target_dir = self.model_dir(voice_file_id)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / model_file.name
+        size = model_file.stat().st_size
+        # tmpfs -> 디스크는 다른 파일시스템이라 복사 후 rename (읽는 쪽이 반쯤 쓰인 파일을 보지 않게)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        shutil.copyfile(model_file, tmp)
+        tmp.replace(target)
+        self.touch(voice_file_id)
+        self.added(size)
+        return target
+
+    def added(self, num_bytes: int):
+        """모델 캐시에 파일이 추가됨 (S3 에서 다시 받은 경우 포함). 할당량을 넘으면 축출"""
+        with self._lock:
+            self._models_bytes += num_bytes
+        self.enforce_quota()
+
+    def _scan_models(self) -> List[tuple]:
+        """(mtime, bytes, dir) 목록"""
+        entries = []
+        try:
+            dirs = list(os.scandir(self.models_root))
+        except FileNotFoundError:
+            return entries
+        for entry in dirs:
+            if not entry.is_dir():
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, _du(Path(entry.path)), Path(entry.path)))
+            except OSError:
+                continue
+        return entries
+
+    def _refresh(self, force: bool = False) -> Optional[List[tuple]]:
+        if not force and time.time() - self._scanned_at < self.scan_interval:
+            return None
+        entries = self._scan_models()
+        with self._lock:
+            self._models_bytes = sum(size for _, size, _ in entries)
+            self._model_count = len(entries)
+            self._scanned_at = time.time()
+        return entries
+
+    def enforce_quota(self) -> int:
+        """모델 캐시 + 디스크 작업 공간이 할당량을 넘으면 90% 아래로 내려갈 때까지 LRU 축출"""
+        if not self.quota_bytes:
+            return 0
+        # 다른 스레드가 이미 축출 중이면 맡김
+        if not self._evict_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self._evict_over_quota()
+        finally:
+            self._evict_lock.release()
+
+    def _evict_over_quota(self) -> int:
+        self._refresh()
+        if self._models_bytes + _du(self.disk_root) <= self.quota_bytes:
+            return 0
+        entries = sorted(self._refresh(force=True))
+        target = int(self.quota_bytes * 0.9) - _du(self.disk_root)
+        cutoff = time.time() - self.min_idle_seconds
+        evicted = 0
+        for mtime, size, path in entries:
+            if self._models_bytes <= target:
+                break
+            if mtime > cutoff:
+                break  # 이후는 모두 최근에 쓰인 모델
+            shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._models_bytes -= size
+                self._model_count -= 1
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            print(f"🧹 Evicted {evicted} local voice models over quota "
+                  f"({self._models_bytes // _MB}MB / {self.quota_bytes // _MB}MB)")
+        return evicted
+
+    # --- 기동 시 정리 ---
+
+    def sweep_orphans(self) -> int:
+        """주인 프로세스가 죽은 작업 공간 + 예전 레이아웃의 scratch 디렉터리 삭제"""
+        removed = 0
+        roots = [self.disk_root] + ([self.tmpfs_root] if self.tmpfs_root is not None else [])
+        for root in roots:
+            for entry in list(os.scandir(root)):
+                if entry.is_dir() and self._is_orphan(Path(entry.path)):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+        for name in _LEGACY_SCRATCH:
+            legacy = self.data_root / name
+            if legacy.is_dir():
+                removed += sum(1 for _ in os.scandir(legacy))
+                shutil.rmtree(legacy, ignore_errors=True)
+        self.swept += removed
+        if removed:
+            print(f"🧹 Removed {removed} orphaned workspaces")
+        self.enforce_quota()
+        return removed
+
+    def _is_orphan(self, path: Path) -> bool:
+        lock_path = path / ".lock"
+        if not lock_path.exists():
+            # 막 만들어지는 중일 수 있으니 오래된 것만
+            try:
+                return time.time() - path.stat().st_mtime > self.min_idle_seconds
+            except OSError:
+                return False
+        with open(lock_path, "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False  # 살아 있는 Job 이 사용 중
+            fcntl.flock(f, fcntl.LOCK_UN)
+            return True
+
+    # --- 조회 ---
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        self._refresh()
+        disk = shutil.disk_usage(self.data_root)
+        return {
+            "modelsBytes": self._models_bytes,
+            "modelCount": self._model_count,
+            "scratchBytes": _du(self.disk_root),
+            "tmpfsBytes": _du(self.tmpfs_root) if self.tmpfs_root is not None else None,
+            "quotaBytes": self.quota_bytes or None,
+            "diskFreeBytes": disk.free,
+            "evictions": self.evictions,
+            "sweptWorkspaces": self.swept,
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_workspace_manager() -> WorkspaceManager:
+    """프로세스 단위 작업 공간 관리자 싱글톤"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = WorkspaceManager(
+                    Path(settings.DATA_DIR),
+                    quota_bytes=settings.WORKSPACE_QUOTA_MB * _MB,
+                    tmpfs_root=Path(settings.WORKSPACE_TMPFS_DIR) if settings.WORKSPACE_TMPFS else None,
+                    tmpfs_max_bytes=settings.WORKSPACE_TMPFS_MAX_MB * _MB,
+                    job_reserve_bytes=settings.WORKSPACE_JOB_RESERVE_MB * _MB,
+                )
+    return _manager
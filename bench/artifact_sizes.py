@@ -0,0 +1,155 @@
+"""
+목소리 모델 파일 크기 / 로드 시간 비교 (.npz -> .avm)
+
+    python -m bench.artifact_sizes --out bench/results/artifact-$(git rev-parse --short HEAD).json
+    python -m bench.artifact_sizes --models-root /data/models --limit 200   # 실제 모델로 측정
+
+기존 형식(1.1.0, savez_compressed)의 model.npz 를 만들거나 실제 model.npz 를 임시 디렉터리로 복사한 뒤
+양자화 방식(float32 / float16 / int8)마다 model.avm 으로 변환해
+모델당 크기, 로드(+ embedding / XTTS 잠재벡터 접근) 시간 중앙값, 최대 역양자화 오차를 JSON 으로 저장한다.
+
+- 합성 모델: ECAPA 임베딩(192) + XTTS gpt_cond_latent(1x32x1024) + speaker_embedding(1x512x1), 정규분포 난수
+  (실제 잠재벡터도 zip 으로 거의 줄지 않는 float 라 크기 비교에는 충분. 실제 분포는 --models-root 로 확인)
+- 원본 model.npz 는 건드리지 않음 (복사본만 변환)
+- 로드 시간은 같은 파일을 반복해서 읽으므로 페이지 캐시에 올라간 상태 기준
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+QUANTS = ("float32", "float16", "int8")
+LEGACY_VERSION = "1.1.0"
+ENCODER = "speechbrain/spkrec-ecapa-voxceleb"
+TENSORS = ("embedding", "xtts_gpt_cond_latent", "xtts_speaker_embedding")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _write_legacy_npz(path: Path, rng: np.random.Generator):
+    """기존 save_model_npz 와 같은 키/형태의 model.npz"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    embedding = rng.standard_normal(192).astype(np.float32)
+    embedding /= np.linalg.norm(embedding)
+    np.savez_compressed(
+        path,
+        embedding=embedding,
+        embedding_size=len(embedding),
+        model_version=LEGACY_VERSION,
+        encoder=ENCODER,
+        xtts_gpt_cond_latent=rng.standard_normal((1, 32, 1024)).astype(np.float32),
+        xtts_speaker_embedding=rng.standard_normal((1, 512, 1)).astype(np.float32),
+    )
+
+
+def _median_load_ms(path: Path, repeats: int) -> float:
+    from app.artifact import load_voice_model
+
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model = load_voice_model(path)
+        model.embedding
+        model.xtts_latents
+        times.append((time.perf_counter() - started) * 1000)
+    return float(np.median(times))
+
+
+def _measure(npz_paths: List[Path], quant: str, repeats: int) -> Dict[str, float]:
+    from app.artifact import convert_npz, load_voice_model
+
+    npz_bytes, avm_bytes, npz_ms, avm_ms, max_err = [], [], [], [], 0.0
+    for npz_path in npz_paths:
+        avm_path = convert_npz(npz_path, quant=quant)
+        old, new = load_voice_model(npz_path), load_voice_model(avm_path)
+        for name in TENSORS:
+            if old.has(name) and old.raw(name).size:
+                max_err = max(max_err, float(np.max(np.abs(old.tensor(name) - new.tensor(name)))))
+        npz_bytes.append(npz_path.stat().st_size)
+        avm_bytes.append(avm_path.stat().st_size)
+        npz_ms.append(_median_load_ms(npz_path, repeats))
+        avm_ms.append(_median_load_ms(avm_path, repeats))
+        avm_path.unlink()
+    return {
+        "models": len(npz_paths),
+        "npzBytesPerModel": round(float(np.mean(npz_bytes)), 1),
+        "avmBytesPerModel": round(float(np.mean(avm_bytes)), 1),
+        "sizeReduction": round(1 - float(np.sum(avm_bytes)) / float(np.sum(npz_bytes)), 4),
+        "npzLoadMs": round(float(np.median(npz_ms)), 4),
+        "avmLoadMs": round(float(np.median(avm_ms)), 4),
+        "loadSpeedup": round(float(np.median(npz_ms)) / max(float(np.median(avm_ms)), 1e-9), 2),
+        "maxAbsError": max_err,
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Measure voice model size and load time, .npz vs .avm")
+    p.add_argument("--models-root", type=Path,
+                   help="measure real models/{id}/model.npz files (copied, not modified)")
+    p.add_argument("--limit", type=int, default=200, help="max real models to measure")
+    p.add_argument("--count", type=int, default=50, help="synthetic models when --models-root is not given")
+    p.add_argument("--repeats", type=int, default=20, help="loads per file when timing")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", type=Path, default=Path("bench/results/artifact-latest.json"))
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        if args.models_root:
+            sources = sorted(args.models_root.glob("*/model.npz"))[:args.limit]
+            if not sources:
+                raise SystemExit(f"No model.npz files under {args.models_root}")
+            npz_paths = []
+            for src in sources:
+                dst = work / src.parent.name / src.name
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(src, dst)
+                npz_paths.append(dst)
+        else:
+            rng = np.random.default_rng(args.seed)
+            npz_paths = [work / f"voice_{i:04d}" / "model.npz" for i in range(args.count)]
+            for path in npz_paths:
+                _write_legacy_npz(path, rng)
+
+        results = {}
+        for quant in QUANTS:
+            results[quant] = r = _measure(npz_paths, quant, args.repeats)
+            print(f"⏱️  {quant:7s} size {r['npzBytesPerModel'] / 1024:7.1f} KiB -> "
+                  f"{r['avmBytesPerModel'] / 1024:6.1f} KiB ({r['sizeReduction']:.0%} smaller), "
+                  f"load {r['npzLoadMs']:.3f} ms -> {r['avmLoadMs']:.3f} ms (x{r['loadSpeedup']}), "
+                  f"max abs error {r['maxAbsError']:.2e}")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+            "source": str(args.models_root) if args.models_root else "synthetic",
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        },
+        "quant": results,
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"💾 Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+두 벤치마크 결과(JSON) 비교
+
+    python -m bench.compare bench/results/old.json bench/results/new.json [--threshold 0.1]
+
+동시성 수준별 처리량, 종단/단계별 p95, 최대 RSS 를 나란히 출력하고
+threshold 이상 나빠진 항목이 있으면 종료 코드 1 (CI 에서 회귀 감지용)
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _delta(old, new) -> str:
+    if old in (None, 0) or new is None:
+        return ""
+    return f"{(new - old) / old:+.1%}"
+
+
+def _row(label: str, old, new, higher_is_better: bool, threshold: float, regressions: list):
+    flag = ""
+    if old not in (None, 0) and new is not None:
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > threshold:
+            flag = "  ⚠️  regression"
+            regressions.append(label)
+    print(f"  {label:<28} {str(old):>10} -> {str(new):<10} {_delta(old, new):>8}{flag}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Compare two bench.run results")
+    p.add_argument("baseline", type=Path)
+    p.add_argument("candidate", type=Path)
+    p.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    args = p.parse_args(argv)
+
+    base = json.loads(args.baseline.read_text())
+    cand = json.loads(args.candidate.read_text())
+    print(f"baseline  {base['meta'].get('commit')}  ({base['meta'].get('timestamp')})")
+    print(f"candidate {cand['meta'].get('commit')}  ({cand['meta'].get('timestamp')})")
+
+    regressions: list = []
+    base_levels = {lv["concurrency"]: lv for lv in base["levels"]}
+    for new in cand["levels"]:
+        old = base_levels.get(new["concurrency"])
+        if old is None:
+            continue
+        print(f"\nconcurrency={new['concurrency']}")
+        prefix = f"c{new['concurrency']} "
+        _row(prefix + "jobs/min", old["jobsPerMinute"], new["jobsPerMinute"], True, args.threshold, regressions)
+        for stage in sorted(set(old["latency"]) | set(new["latency"])):
+            _row(prefix + f"{stage} p95 (s)", old["latency"].get(stage, {}).get("p95"),
+                 new["latency"].get(stage, {}).get("p95"), False, args.threshold, regressions)
+        _row(prefix + "peak RSS (MB)", old["peakRssMb"], new["peakRssMb"], False, args.threshold, regressions)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
+    print("\n✅ no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+ECAPA 마이크로 배치 정확도 확인
+
+    python -m bench.embed_parity [--count 12] [--min-cosine 0.999] [--models real|fake]
+
+길이가 다른 합성 음성 신호를 하나씩(batch=1) 임베딩한 결과와, EmbeddingBatcher 로 한 번에 묶어
+(0 패딩 + wav_lens 마스킹) 임베딩한 결과를 신호별 cosine 으로 비교한다.
+하나라도 --min-cosine 미만이면 종료 코드 1 (CI / 인코더 교체 시 회귀 감지용)
+
+- 신호 길이는 --min-seconds ~ --max-seconds 사이로 고르게 퍼뜨림 (패딩 비율이 큰 짧은 신호 포함)
+- --models fake 는 bench.fakes 의 가짜 인코더 (배처 경로만 확인, 수치 비교 의미 없음)
+- INFERENCE_ACCEL / INFERENCE_COMPILE 환경 변수를 주면 가속된 인코더로 같은 비교
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# 실제 모델 기준 허용 오차 (EmbeddingBatcher 문서에 적힌 값)
+DEFAULT_MIN_COSINE = 0.999
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    a, b = np.asarray(a, dtype=np.float32).ravel(), np.asarray(b, dtype=np.float32).ravel()
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Check batched ECAPA embeddings against batch-of-one results")
+    p.add_argument("--count", type=int, default=12, help="number of signals in the batch")
+    p.add_argument("--min-seconds", type=float, default=1.5)
+    p.add_argument("--max-seconds", type=float, default=12.0)
+    p.add_argument("--min-cosine", type=float, default=DEFAULT_MIN_COSINE)
+    p.add_argument("--models", choices=("real", "fake"), default="real")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    # settings 는 import 시점에 필수 환경 변수를 읽으므로, 실행에 쓰이지 않는 값은 자리만 채움
+    for name, value in (("X_AUTH_SHARED_SECRET", "bench-secret"), ("SPRING_CALLBACK_URL", ""),
+                        ("AWS_DEFAULT_REGION", "us-east-1"), ("S3_BUCKET_MODELS", "bench-models"),
+                        ("S3_BUCKET_PREVIEW", "bench-preview"), ("INFERENCE_MODE", "inprocess")):
+        os.environ.setdefault(name, value)
+
+    from app import audio
+    from app.embedding_service import EmbeddingBatcher, encode_padded
+    from .synthetic import synth_speech
+
+    if args.models == "fake":
+        from . import fakes
+        fakes.install(0.0, 0.0, 0.0)
+
+    sr = 16000
+    lengths = np.linspace(args.min_seconds, args.max_seconds, args.count)
+    signals = [synth_speech(float(s), sr=sr, seed=args.seed + i).astype(np.float32) for i, s in enumerate(lengths)]
+    encoder = audio.get_encoder()  # fakes.install 뒤에 찾아야 가짜 인코더로 바뀜
+
+    singles = [encode_padded(encoder, [s])[0] for s in signals]
+    # 실제 서비스 경로와 같게 배처를 거치되, 모든 신호가 한 배치에 들어가도록 대기 시간을 넉넉히
+    batcher = EmbeddingBatcher(lambda batch: encode_padded(encoder, batch),
+                               max_batch=len(signals), max_wait_ms=1000.0)
+    batched = batcher.embed_many(signals)
+
+    worst = 1.0
+    for seconds, single, together in zip(lengths, singles, batched):
+        cos = _cosine(single, together)
+        worst = min(worst, cos)
+        flag = "" if cos >= args.min_cosine else "  ⚠️  below tolerance"
+        print(f"  {seconds:6.2f}s  cosine={cos:.6f}  max|Δ|={float(np.max(np.abs(single - together))):.2e}{flag}")
+
+    if worst < args.min_cosine:
+        print(f"❌ batched embeddings differ from batch-of-one (min cosine {worst:.6f} < {args.min_cosine})")
+        sys.exit(1)
+    print(f"✅ batched embeddings match batch-of-one (min cosine {worst:.6f} >= {args.min_cosine})")
+
+
+if __name__ == "__main__":
+    main()
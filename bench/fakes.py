@@ -0,0 +1,100 @@
+"""
+ECAPA / XTTS 가짜 모델
+
+실제 모델과 같은 인터페이스(encode_batch, get_conditioning_latents, inference, inference_stream)와
+출력 shape 을 흉내 내고, 연산 비용은 sleep 으로 흉내 낸다.
+학습 파이프라인의 나머지 코드(패딩, 리샘플, 저장, 업로드, 콜백)는 그대로 실행된다.
+"""
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+ECAPA_DIM = 192
+XTTS_GPT_LATENT_SHAPE = (1, 32, 1024)
+XTTS_SPEAKER_SHAPE = (1, 512, 1)
+
+
+class FakeEncoder:
+    """SpeechBrain EncoderClassifier 대역. 스펙트럼 평균을 고정 랜덤 사영한 값을 임베딩으로 돌려줌"""
+
+    def __init__(self, ms_per_audio_second: float, sr: int = 16000):
+        self.ms_per_audio_second = ms_per_audio_second
+        self.sr = sr
+        self._proj = np.random.default_rng(1234).standard_normal((257, ECAPA_DIM)).astype(np.float32)
+
+    def encode_batch(self, wavs, wav_lens=None):
+        import torch
+        batch = wavs.numpy()
+        lens = (wav_lens.numpy() if wav_lens is not None else np.ones(len(batch))) * batch.shape[1]
+        out = []
+        for row, n in zip(batch, lens.astype(int)):
+            frames = row[: max(512, n // 512 * 512)].reshape(-1, 512)
+            spectrum = np.log1p(np.abs(np.fft.rfft(frames, axis=1)).mean(axis=0))
+            out.append(spectrum @ self._proj)
+        time.sleep(self.ms_per_audio_second * float(lens.sum()) / self.sr / 1000)
+        return torch.from_numpy(np.stack(out).astype(np.float32)[:, None, :])
+
+
+class FakeXtts:
+    """Xtts 대역. 조건 잠재벡터는 참조 음성에서 결정적으로 만들고, 합성은 텍스트 길이만큼 톤을 생성"""
+
+    SAMPLE_RATE = 24000
+    SECONDS_PER_CHAR = 0.07
+
+    def __init__(self, latent_ms: float, rtf: float):
+        self.latent_ms = latent_ms
+        self.rtf = rtf
+        self.config = SimpleNamespace(
+            gpt_cond_len=30, gpt_cond_chunk_len=4, max_ref_len=30, sound_norm_refs=False,
+            temperature=0.75, length_penalty=1.0, repetition_penalty=10.0, top_k=50, top_p=0.85,
+        )
+
+    def _seeded(self, audio, shape):
+        import torch
+        seed = int(abs(float(audio.sum())) * 1e3) % (2 ** 32)
+        return torch.from_numpy(np.random.default_rng(seed).standard_normal(shape).astype(np.float32))
+
+    def get_speaker_embedding(self, audio, sr):
+        time.sleep(self.latent_ms / 2000)
+        return self._seeded(audio, XTTS_SPEAKER_SHAPE)
+
+    def get_gpt_cond_latents(self, audio, sr, length=30, chunk_length=4):
+        time.sleep(self.latent_ms / 2000)
+        return self._seeded(audio, XTTS_GPT_LATENT_SHAPE)
+
+    def get_conditioning_latents(self, audio_path, **kwargs):
+        import soundfile as sf
+        import torch
+        audio, sr = sf.read(audio_path[0], dtype="float32")
+        audio = torch.from_numpy(audio)
+        return self.get_gpt_cond_latents(audio, sr), self.get_speaker_embedding(audio, sr)
+
+    def _tone(self, text: str) -> np.ndarray:
+        seconds = max(0.2, len(text) * self.SECONDS_PER_CHAR)
+        t = np.arange(int(seconds * self.SAMPLE_RATE)) / self.SAMPLE_RATE
+        return (0.2 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        wav = self._tone(text)
+        time.sleep(self.rtf * len(wav) / self.SAMPLE_RATE)
+        return {"wav": wav}
+
+    def inference_stream(self, text, language, gpt_cond_latent, speaker_embedding, stream_chunk_size=20, **kwargs):
+        import torch
+        wav = self._tone(text)
+        step = stream_chunk_size * 1024  # XTTS 토큰 1개 ≈ 1024 샘플
+        for start in range(0, len(wav), step):
+            chunk = wav[start:start + step]
+            time.sleep(self.rtf * len(chunk) / self.SAMPLE_RATE)
+            yield torch.from_numpy(chunk)
+
+
+def install(embed_ms_per_audio_second: float, latent_ms: float, rtf: float):
+    """app.audio.get_encoder / app.tts_preview.get_tts 를 가짜 모델로 교체 (inprocess 모드 전용)"""
+    from app import audio, tts_preview
+
+    encoder = FakeEncoder(embed_ms_per_audio_second)
+    tts = SimpleNamespace(synthesizer=SimpleNamespace(tts_model=FakeXtts(latent_ms, rtf)))
+    audio.get_encoder = lambda: encoder
+    tts_preview.get_tts = lambda: tts
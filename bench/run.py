@@ -0,0 +1,243 @@
+"""
+End-to-end 학습 벤치마크
+
+/train -> _train_worker -> S3 업로드 -> Spring 콜백 전체 경로를 로컬 대역으로 실행하고
+동시성 수준별 처리량 / 단계별 지연 백분위 / 최대 RSS / CPU 사용률을 JSON 으로 저장한다.
+
+    pip install -r requirements.txt -r bench/requirements.txt
+    python -m bench.run --jobs 20 --concurrency 1,2,4 --out bench/results/$(git rev-parse --short HEAD).json
+    python -m bench.compare bench/results/<이전>.json bench/results/<현재>.json
+    python -m bench.embed_parity   # 배치 임베딩 == batch=1 임베딩 (허용 오차 내) 확인
+    python -m bench.artifact_sizes # 모델 파일 .npz -> .avm 크기 / 로드 시간 (결과 JSON 저장)
+
+- 음성: 화자(시드)마다 다른 합성 음성 WAV 를 로컬 HTTP 서버로 제공 (결과 캐시 미적중)
+- S3: moto 서버 (S3_ENDPOINT_URL), 콜백: 로컬 수신기 (수신 시각 = 종단 완료 시각)
+- 모델: --models fake (sleep 으로 비용을 흉내 낸 가짜 모델) / real (실제 ECAPA, XTTS)
+- 배치 모드: --mode batch 로 같은 코퍼스를 /train/batch 한 번으로 제출 (--mode single 결과와 비교)
+- 가속 모드: --models real --accel int8 [--compile compile] 결과를 --accel off 결과와 bench.compare 로 비교
+- 동시성 수준마다 별도 프로세스로 실행해 최대 RSS 가 서로 섞이지 않게 함
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+REGION = "us-east-1"
+BUCKET_MODELS = "bench-models"
+BUCKET_PREVIEW = "bench-preview"
+SECRET = "bench-secret"
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+            "mean": round(float(np.mean(values)), 3), "n": len(values)}
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_level(args, concurrency: int) -> dict:
+    """동시성 수준 하나를 현재 프로세스에서 실행"""
+    from .servers import CallbackReceiver, LocalS3, StaticFileServer
+    from .synthetic import write_corpus
+
+    workdir = Path(tempfile.mkdtemp(prefix="audion-bench-"))
+    corpus = write_corpus(workdir / "corpus", args.jobs, args.clip_seconds, args.sample_rate, seed=args.seed)
+    files = StaticFileServer(workdir / "corpus")
+    callbacks = CallbackReceiver()
+    s3 = LocalS3([BUCKET_MODELS, BUCKET_PREVIEW], REGION)
+
+    # settings 는 import 시점에 환경 변수를 읽으므로 app 을 import 하기 전에 설정
+    os.environ.update({
+        "X_AUTH_SHARED_SECRET": SECRET,
+        "SPRING_CALLBACK_URL": callbacks.url,
+        "AWS_DEFAULT_REGION": REGION,
+        "AWS_ACCESS_KEY_ID": s3.access_key,
+        "AWS_SECRET_ACCESS_KEY": s3.secret_key,
+        "S3_BUCKET_MODELS": BUCKET_MODELS,
+        "S3_BUCKET_PREVIEW": BUCKET_PREVIEW,
+        "S3_ENDPOINT_URL": s3.endpoint_url,
+        "DATA_DIR": str(workdir / "data"),
+        "JOB_STORE_PATH": str(workdir / "jobs.db"),
+        "CALLBACK_OUTBOX_PATH": str(workdir / "callbacks.db"),
+        "CALLBACK_POLL_SECONDS": "0.2",
+        "RESULT_CACHE_ENABLED": "false",
+        "TRAIN_WORKERS": str(concurrency),
+        "TRAIN_QUEUE_MAX": str(max(100, args.jobs)),
+        "INFERENCE_MODE": "inprocess" if args.models == "fake" else args.inference_mode,
+        "WARMUP_ON_STARTUP": "true",
+        "INFERENCE_ACCEL": args.accel,
+        "INFERENCE_COMPILE": args.compile,
+    })
+
+    from fastapi.testclient import TestClient
+    from app.main import create_app
+
+    if args.models == "fake":
+        from . import fakes
+        fakes.install(args.fake_embed_ms, args.fake_latent_ms, args.fake_rtf)
+
+    headers = {"X-AUTH": SECRET}
+    started_at = time.time()
+    with TestClient(create_app()) as client:
+        while client.get("/ready").status_code != 200:
+            if time.time() - started_at > args.timeout:
+                raise RuntimeError("models did not become ready")
+            time.sleep(0.2)
+        warmup_seconds = time.time() - started_at
+        models = client.get("/ready").json().get("models", {})
+
+        cpu_before = _cpu_seconds()
+        t0 = time.time()
+        submitted: Dict[str, float] = {}
+        items = [{
+            "voiceFileId": f"bench-{concurrency}-{i:04d}",
+            "voiceFileUrl": files.url(path.name),
+            "userId": "bench-user",
+            "walletAddress": "0x0",
+        } for i, path in enumerate(corpus)]
+        if args.mode == "batch":
+            # 전체를 /train/batch 한 번으로 (항목별 콜백으로 종단 시간 측정)
+            resp = client.post("/train/batch", headers=headers, json={"items": items})
+            resp.raise_for_status()
+            submitted = {job["jobId"]: time.time() for job in resp.json()["jobs"]}
+        else:
+            for item in items:
+                resp = client.post("/train", headers=headers, json=item)
+                resp.raise_for_status()
+                submitted[resp.json()["jobId"]] = time.time()
+
+        finished = callbacks.wait_for(list(submitted), timeout=args.timeout)
+        wall = max((callbacks.received[j]["at"] for j in submitted if j in callbacks.received), default=time.time()) - t0
+        cpu = _cpu_seconds() - cpu_before
+        statuses = {job_id: client.get(f"/status/{job_id}", headers=headers).json() for job_id in submitted}
+
+    files.close()
+    callbacks.close()
+    s3.close()
+
+    done = [j for j, st in statuses.items() if st.get("status") == "DONE"]
+    stages: Dict[str, List[float]] = {}
+    waits: Dict[str, List[float]] = {}
+    for job_id in done:
+        timings = statuses[job_id].get("timings") or {}
+        for name, seconds in timings.get("stages", {}).items():
+            stages.setdefault(name, []).append(seconds)
+        for name, seconds in timings.get("waits", {}).items():
+            waits.setdefault(name, []).append(seconds)
+    end_to_end = [callbacks.received[j]["at"] - submitted[j] for j in done if j in callbacks.received]
+
+    return {
+        "concurrency": concurrency,
+        "mode": args.mode,
+        "jobs": args.jobs,
+        "completed": len(done),
+        "errors": len(submitted) - len(done),
+        "timedOut": not finished,
+        "warmupSeconds": round(warmup_seconds, 2),
+        # 모델별 로드/워밍업 시간과 가속 모드 적용 결과 (정확도 게이트, 모델 크기)
+        "models": models,
+        "wallSeconds": round(wall, 2),
+        "jobsPerMinute": round(len(done) / wall * 60, 2) if wall > 0 else None,
+        "latency": {"endToEnd": _percentiles(end_to_end), **{k: _percentiles(v) for k, v in stages.items()}},
+        "stageWaits": {k: _percentiles(v) for k, v in waits.items()},
+        # 모델 서버(process 모드) 자식 프로세스는 포함되지 않음
+        "peakRssMb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "cpuSeconds": round(cpu, 2),
+        "cpuUtilization": round(cpu / wall / (os.cpu_count() or 1), 3) if wall > 0 else None,
+    }
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description="AudIon training end-to-end benchmark")
+    p.add_argument("--jobs", type=int, default=20, help="jobs per concurrency level")
+    p.add_argument("--concurrency", default="1,2,4", help="comma separated TRAIN_WORKERS levels")
+    p.add_argument("--clip-seconds", type=float, default=10.0)
+    p.add_argument("--sample-rate", type=int, default=44100)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--models", choices=("fake", "real"), default="fake")
+    p.add_argument("--mode", choices=("single", "batch"), default="single",
+                   help="submit one /train per file or all files as one /train/batch")
+    p.add_argument("--inference-mode", choices=("inprocess", "process"), default="inprocess",
+                   help="INFERENCE_MODE for --models real")
+    p.add_argument("--accel", choices=("off", "int8"), default="off", help="INFERENCE_ACCEL (real models only)")
+    p.add_argument("--compile", choices=("off", "compile", "torchscript"), default="off",
+                   help="INFERENCE_COMPILE (real models only)")
+    p.add_argument("--fake-embed-ms", type=float, default=20.0, help="fake ECAPA cost per audio second")
+    p.add_argument("--fake-latent-ms", type=float, default=200.0, help="fake XTTS conditioning cost")
+    p.add_argument("--fake-rtf", type=float, default=0.3, help="fake XTTS real-time factor")
+    p.add_argument("--timeout", type=float, default=1800.0)
+    p.add_argument("--out", type=Path, default=Path("bench/results/latest.json"))
+    p.add_argument("--level", type=int, help=argparse.SUPPRESS)        # 내부용: 한 수준만 실행
+    p.add_argument("--level-out", type=Path, help=argparse.SUPPRESS)   # 내부용: 수준별 결과 파일
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.level is not None:
+        # 자식 프로세스: 결과를 --level-out 파일로 (stdout 은 서버 로그와 섞임)
+        args.level_out.write_text(json.dumps(run_level(args, args.level)))
+        return
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    child_argv = list(argv if argv is not None else sys.argv[1:])
+    results = []
+    for level in levels:
+        print(f"⏱️  concurrency={level} ({args.jobs} jobs, {args.models} models)")
+        with tempfile.TemporaryDirectory() as tmp:
+            level_out = Path(tmp) / "level.json"
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.run", *child_argv, "--level", str(level), "--level-out", str(level_out)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0 or not level_out.exists():
+                print(proc.stdout[-4000:], proc.stderr[-4000:], sep="\n", file=sys.stderr)
+                raise SystemExit(f"benchmark level {level} failed")
+            result = json.loads(level_out.read_text())
+        results.append(result)
+        e2e = result["latency"].get("endToEnd", {})
+        print(f"   {result['jobsPerMinute']} jobs/min, e2e p50={e2e.get('p50')}s p95={e2e.get('p95')}s, "
+              f"peak RSS {result['peakRssMb']}MB, CPU {result['cpuUtilization']}")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpuCount": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                     if k not in ("level", "level_out")},
+        },
+        "levels": results,
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"💾 Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""벤치마크용 로컬 대역: 정적 파일 서버, Spring 콜백 수신기, S3 (moto)"""
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _QuietFileHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class StaticFileServer:
+    """합성 WAV 를 voiceFileUrl 로 내려주는 HTTP 서버"""
+
+    def __init__(self, root: Path):
+        self.port = free_port()
+        handler = partial(_QuietFileHandler, directory=str(root))
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), handler)
+        threading.Thread(target=self._server.serve_forever, name="bench-files", daemon=True).start()
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{name}"
+
+    def close(self):
+        self._server.shutdown()
+
+
+class CallbackReceiver:
+    """Spring 콜백 대역. 받은 payload 와 수신 시각을 jobId 별로 기록 (/batch 는 묶음 콜백)"""
+
+    def __init__(self):
+        self.port = free_port()
+        self.received: Dict[str, dict] = {}
+        self._cond = threading.Condition()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                now = time.time()
+                payloads = body.get("callbacks", [body]) if self.path.endswith("/batch") else [body]
+                with receiver._cond:
+                    for payload in payloads:
+                        receiver.received[payload.get("jobId")] = {"payload": payload, "at": now}
+                    receiver._cond.notify_all()
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="bench-callbacks", daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/callback"
+
+    def wait_for(self, job_ids: List[str], timeout: float) -> bool:
+        deadline = time.time() + timeout
+        with self._cond:
+            while not all(j in self.received for j in job_ids):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self):
+        self._server.shutdown()
+
+
+class LocalS3:
+    """
+    moto 서버로 띄운 S3 대역 (S3_ENDPOINT_URL 로 연결)
+    별도 프로세스로 띄워 벤치마크 프로세스의 RSS/CPU 측정에 섞이지 않게 함
+    """
+
+    access_key = "bench"
+    secret_key = "bench"
+
+    def __init__(self, buckets: List[str], region: str):
+        import boto3
+
+        self.port = free_port()
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(self.port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                break
+            except OSError:
+                if time.time() > deadline or self._proc.poll() is not None:
+                    self.close()
+                    raise RuntimeError("moto server did not start (pip install 'moto[server]')")
+                time.sleep(0.1)
+        # moto 는 아무 자격 증명이나 받음. 명시하지 않으면 자격 증명이 없는 머신에서 NoCredentialsError
+        client = boto3.client("s3", endpoint_url=self.endpoint_url, region_name=region,
+                              aws_access_key_id=self.access_key, aws_secret_access_key=self.secret_key)
+        for bucket in buckets:
+            if region == "us-east-1":
+                client.create_bucket(Bucket=bucket)
+            else:
+                client.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": region})
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def close(self):
+        self._proc.terminate()
+        self._proc.wait(timeout=10)
@@ -0,0 +1,71 @@
+"""합성 음성 유사 WAV 생성 (성문 펄스열 + 포먼트 필터 + 음절 단위 포락선)"""
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import lfilter
+
+# 모음별 (F1, F2, F3) 포먼트 주파수 (Hz)
+_VOWELS = [
+    (730, 1090, 2440),  # a
+    (270, 2290, 3010),  # i
+    (300, 870, 2240),   # u
+    (530, 1840, 2480),  # e
+    (570, 840, 2410),   # o
+]
+
+
+def _resonator(x: np.ndarray, freq: float, bandwidth: float, sr: int) -> np.ndarray:
+    """2차 IIR 공진기 (포먼트 하나)"""
+    r = np.exp(-np.pi * bandwidth / sr)
+    theta = 2 * np.pi * freq / sr
+    a = [1.0, -2 * r * np.cos(theta), r * r]
+    return lfilter([1.0 - r], a, x)
+
+
+def synth_speech(seconds: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    말소리처럼 들리는 float32 신호
+    - 100~220Hz 사이에서 천천히 움직이는 F0 + 지터
+    - 음절(약 4~5/초)마다 모음 포먼트가 바뀌고, 단어 사이에 짧은 쉼
+    - 전처리(top_db=20 무음 제거) 후에도 대부분 남도록 쉼은 짧게 유지
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    out = np.zeros(n, dtype=np.float64)
+    base_f0 = rng.uniform(100, 220)
+
+    pos = 0
+    while pos < n:
+        syl_len = int(rng.uniform(0.15, 0.3) * sr)
+        seg = min(syl_len, n - pos)
+        t = np.arange(seg) / sr
+        f0 = base_f0 * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t)) * (1 + 0.01 * rng.standard_normal())
+        phase = np.cumsum(f0 / sr)
+        # 성문 펄스열 (위상이 한 주기를 넘을 때마다 펄스) + 약간의 기식음
+        source = np.diff(np.floor(phase), prepend=0.0) + 0.02 * rng.standard_normal(seg)
+        f1, f2, f3 = _VOWELS[rng.integers(len(_VOWELS))]
+        voiced = (_resonator(source, f1, 80, sr)
+                  + 0.6 * _resonator(source, f2, 120, sr)
+                  + 0.3 * _resonator(source, f3, 160, sr))
+        envelope = np.sin(np.pi * np.arange(seg) / max(seg, 1)) ** 0.5
+        out[pos:pos + seg] = voiced * envelope
+        pos += seg
+        if rng.random() < 0.25:
+            pos += int(rng.uniform(0.05, 0.15) * sr)  # 단어 사이 쉼
+
+    out += 10 ** (-50 / 20) * rng.standard_normal(n)  # -50dB 잡음 바닥
+    peak = np.max(np.abs(out)) or 1.0
+    return (0.8 * out / peak).astype(np.float32)
+
+
+def write_corpus(out_dir: Path, count: int, seconds: float, sr: int, seed: int = 0) -> List[Path]:
+    """서로 다른 화자(시드)의 PCM16 WAV 를 count 개 생성. 결과 캐시에 걸리지 않도록 모두 다른 내용"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = out_dir / f"voice_{i:04d}.wav"
+        sf.write(str(path), synth_speech(seconds, sr, seed=seed + i), sr, subtype="PCM_16")
+        paths.append(path)
+    return paths